@@ -3,13 +3,21 @@ from django.urls import path
 from rest_framework.routers import DefaultRouter, SimpleRouter
 
 from library_management.library.api.views import (
+    AsyncAuthorListView,
+    AsyncBookListView,
+    AsyncLibraryListView,
     AuthorListView,
+    BookExportView,
     BookListView,
     BorrowBookView,
+    CatalogueImportView,
+    CatalogueIngestView,
+    ChangeFeedView,
     LibraryListView,
     ReturnBookView,
 )
 from library_management.users.api.views import (
+    AsyncRegisterView,
     PasswordResetView,
     RegisterView,
     UserViewSet,
@@ -25,6 +33,8 @@ app_name = "api"
 urlpatterns = [
     # User registration endpoint
     path("users/register/", RegisterView.as_view(), name="register"),
+    # Hashes the password off the event loop when served over ASGI
+    path("users/register/async/", AsyncRegisterView.as_view(), name="register-async"),
     # Password reset endpoint
     path(
         "users/reset-password/",
@@ -35,6 +45,27 @@ urlpatterns = [
     path("libraries/", LibraryListView.as_view(), name="library-list"),
     path("authors/", AuthorListView.as_view(), name="authors-list"),
     path("books/", BookListView.as_view(), name="books-list"),
+    # Async ORM variants of the catalogue lists
+    path("libraries/async/", AsyncLibraryListView.as_view(), name="library-list-async"),
+    path("authors/async/", AsyncAuthorListView.as_view(), name="authors-list-async"),
+    path("books/async/", AsyncBookListView.as_view(), name="books-list-async"),
+    # Full or incremental catalogue dumps, books.ndjson or books.csv
+    path(
+        "books/export.<str:export_format>",
+        BookExportView.as_view(),
+        name="books-export",
+    ),
+    path(
+        "libraries/<int:library_id>/catalogue/",
+        CatalogueIngestView.as_view(),
+        name="library-catalogue-ingest",
+    ),
+    path(
+        "libraries/<int:library_id>/catalogue/<int:pk>/",
+        CatalogueImportView.as_view(),
+        name="library-catalogue-import",
+    ),
+    path("changes/", ChangeFeedView.as_view(), name="catalogue-changes"),
     path("borrow/<book_id>", BorrowBookView.as_view(), name="borrow-book"),
     path("return/<book_id>", ReturnBookView.as_view(), name="return-book"),
     *router.urls,
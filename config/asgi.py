@@ -36,3 +36,8 @@ application = ProtocolTypeRouter(
         ),
     }
 )
+
+# Share this process's metrics with the /metrics/ endpoint of every worker.
+from library_management.core.worker_metrics import PUBLISHER
+
+PUBLISHER.ensure_started()
@@ -1,7 +1,7 @@
 import os
 
 from celery import Celery
-from celery.signals import setup_logging
+from celery.signals import before_task_publish, setup_logging, task_postrun, task_prerun
 
 # set the default Django settings module for the 'celery' program.
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.local")
@@ -24,6 +24,27 @@ def config_loggers(*args, **kwargs):
     dictConfig(settings.LOGGING)
 
 
+@before_task_publish.connect
+def inject_task_headers(*args, **kwargs):
+    from library_management.core import tracing  # noqa: PLC0415
+
+    tracing.inject_task_headers(**kwargs)
+
+
+@task_prerun.connect
+def start_task_span(*args, **kwargs):
+    from library_management.core import tracing  # noqa: PLC0415
+
+    tracing.start_task_span(**kwargs)
+
+
+@task_postrun.connect
+def end_task_span(*args, **kwargs):
+    from library_management.core import tracing  # noqa: PLC0415
+
+    tracing.end_task_span(**kwargs)
+
+
 # Load task modules from all registered Django app configs.
 app.autodiscover_tasks()
 
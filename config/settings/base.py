@@ -58,7 +58,26 @@ db_config = dj_database_url.config(default=env("DATABASE_URL"))
 DATABASES = {"default": db_config}
 # DATABASES = {"default": env.db("DATABASE_URL")}
 DATABASES["default"]["ENGINE"] = "django.contrib.gis.db.backends.postgis"
+# Views that write run in a request-long transaction; read-only views opt out
+# with library_management.core.api.mixins.NonAtomicRequestsMixin
 DATABASES["default"]["ATOMIC_REQUESTS"] = True
+# Streaming replicas of default, one URL each. Catalogue reads go to them,
+# see library_management.core.routers
+DATABASE_REPLICAS = []
+for index, url in enumerate(env.list("REPLICA_DATABASE_URLS", default=[]), 1):
+    DATABASES[f"replica_{index}"] = {
+        **dj_database_url.parse(url),
+        "ENGINE": "django.contrib.gis.db.backends.postgis",
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_REPLICAS.append(f"replica_{index}")
+DATABASE_ROUTERS = ["library_management.core.routers.ReplicaRouter"]
+# Seconds a client that borrowed or returned a book keeps reading the primary
+REPLICA_PIN_SECONDS = env.int("REPLICA_PIN_SECONDS", default=10)
+REPLICA_PIN_COOKIE = "pin_primary"
+# Replicas further behind than this many seconds get no reads
+REPLICA_MAX_LAG = env.float("REPLICA_MAX_LAG", default=2.0)
+REPLICA_LAG_CHECK_INTERVAL = env.float("REPLICA_LAG_CHECK_INTERVAL", default=5.0)
 # https://docs.djangoproject.com/en/stable/ref/settings/#std:setting-DEFAULT_AUTO_FIELD
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
@@ -129,11 +148,18 @@ LOGIN_URL = "account_login"
 # https://docs.djangoproject.com/en/dev/ref/settings/#password-hashers
 PASSWORD_HASHERS = [
     # https://docs.djangoproject.com/en/dev/topics/auth/passwords/#using-argon2-with-django
-    "django.contrib.auth.hashers.Argon2PasswordHasher",
+    "library_management.users.hashers.Argon2PasswordHasher",
     "django.contrib.auth.hashers.PBKDF2PasswordHasher",
     "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
     "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
 ]
+# Argon2 cost, see library_management.users.hashers. Django's defaults; lower
+# them where a hash takes too long on the web workers' CPUs.
+ARGON2_TIME_COST = env.int("ARGON2_TIME_COST", default=2)
+ARGON2_MEMORY_COST = env.int("ARGON2_MEMORY_COST", default=102400)  # KiB
+ARGON2_PARALLELISM = env.int("ARGON2_PARALLELISM", default=8)
+# Threads hashing passwords for async views, per process
+PASSWORD_HASH_WORKERS = env.int("PASSWORD_HASH_WORKERS", default=2)
 # https://docs.djangoproject.com/en/dev/ref/settings/#auth-password-validators
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -148,6 +174,8 @@ AUTH_PASSWORD_VALIDATORS = [
 # ------------------------------------------------------------------------------
 # https://docs.djangoproject.com/en/dev/ref/settings/#middleware
 MIDDLEWARE = [
+    "library_management.core.middleware.RequestIDMiddleware",
+    "library_management.core.middleware.InstrumentationMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -158,6 +186,7 @@ MIDDLEWARE = [
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "allauth.account.middleware.AccountMiddleware",
+    "library_management.core.middleware.ReplicaPinningMiddleware",
 ]
 
 # STATIC
@@ -239,6 +268,11 @@ EMAIL_BACKEND = env(
 )
 # https://docs.djangoproject.com/en/dev/ref/settings/#email-timeout
 EMAIL_TIMEOUT = 5
+# Outgoing emails are queued in users.EmailOutbox and sent in batches
+EMAIL_OUTBOX_BATCH_SIZE = env.int("EMAIL_OUTBOX_BATCH_SIZE", default=50)
+EMAIL_OUTBOX_MAX_ATTEMPTS = env.int("EMAIL_OUTBOX_MAX_ATTEMPTS", default=5)
+# Base delay in seconds, doubled on every failed attempt
+EMAIL_OUTBOX_RETRY_BACKOFF = env.int("EMAIL_OUTBOX_RETRY_BACKOFF", default=60)
 
 # ADMIN
 # ------------------------------------------------------------------------------
@@ -260,15 +294,19 @@ DJANGO_ADMIN_FORCE_ALLAUTH = env.bool("DJANGO_ADMIN_FORCE_ALLAUTH", default=Fals
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
+    "filters": {
+        "request_id": {"()": "library_management.core.tracing.RequestIDLogFilter"},
+    },
     "formatters": {
         "verbose": {
-            "format": "%(levelname)s %(asctime)s %(module)s %(process)d %(thread)d %(message)s",
+            "format": "%(levelname)s %(asctime)s %(module)s %(process)d %(thread)d [%(request_id)s] %(message)s",
         },
     },
     "handlers": {
         "console": {
             "level": "DEBUG",
             "class": "logging.StreamHandler",
+            "filters": ["request_id"],
             "formatter": "verbose",
         },
     },
@@ -343,7 +381,7 @@ SOCIALACCOUNT_FORMS = {"signup": "library_management.users.forms.UserSocialSignu
 # django-rest-framework - https://www.django-rest-framework.org/api-guide/settings/
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "library_management.users.authentication.CachedJWTAuthentication",
         "rest_framework.authentication.TokenAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": ("rest_framework.permissions.IsAuthenticated",),
@@ -354,14 +392,37 @@ REST_FRAMEWORK = {
     ],
     "EXCEPTION_HANDLER": "library_management.core.api.exceptions.custom_exception_handler",
     "DEFAULT_THROTTLE_CLASSES": [
-        "rest_framework.throttling.UserRateThrottle",
-        "rest_framework.throttling.AnonRateThrottle",
+        "library_management.core.api.throttling.TokenBucketThrottle",
     ],
     "DEFAULT_THROTTLE_RATES": {
         "user": "100/day",  # Authenticated users: 100 requests/day
         "anon": "20/hour",  # Anonymous users: 20 requests/hour
+        "catalogue": "600/minute",  # Book, author and library lists
+        "borrow": "30/hour",  # Borrowing and returning books
+        "password_reset": "5/hour",  # Reset emails per address
+        "export": "10/hour",  # Full catalogue dumps
     },
 }
+# Largest catalogue file the ingestion API accepts; import_catalogue has no limit
+CATALOGUE_UPLOAD_MAX_SIZE = env.int(
+    "CATALOGUE_UPLOAD_MAX_SIZE", default=512 * 1024 * 1024
+)
+# Rows fetched per round trip by the catalogue export's server-side cursor
+CATALOGUE_EXPORT_CHUNK_SIZE = env.int("CATALOGUE_EXPORT_CHUNK_SIZE", default=5000)
+# Change feed (/api/changes/): entries are served once they're this many
+# seconds old, longer than transactions take to commit and replicas to catch
+# up; tombstones of deleted rows are kept this many days.
+CHANGE_FEED_SETTLE_SECONDS = env.float("CHANGE_FEED_SETTLE_SECONDS", default=5.0)
+CHANGE_FEED_RETENTION_DAYS = env.int("CHANGE_FEED_RETENTION_DAYS", default=90)
+# Seconds users authenticated by JWT stay cached, in the default cache and in
+# each process, see library_management.users.authentication
+USER_CACHE_TTL = env.int("USER_CACHE_TTL", default=300)
+USER_CACHE_LOCAL_TTL = env.float("USER_CACHE_LOCAL_TTL", default=10.0)
+USER_CACHE_LOCAL_SIZE = env.int("USER_CACHE_LOCAL_SIZE", default=10_000)
+# Redis holding the throttle buckets; empty keeps them per process
+THROTTLE_REDIS_URL = env("THROTTLE_REDIS_URL", default=REDIS_URL)
+# Seconds to wait on Redis before falling back to per-process buckets
+THROTTLE_REDIS_TIMEOUT = env.float("THROTTLE_REDIS_TIMEOUT", default=0.25)
 
 # django-cors-headers - https://github.com/adamchainz/django-cors-headers#setup
 CORS_URLS_REGEX = r"^/api/.*$"
@@ -377,16 +438,96 @@ SPECTACULAR_SETTINGS = {
 }
 # Your stuff...
 # ------------------------------------------------------------------------------
+# Bearer token for the /metrics/ Prometheus endpoint, which is off when empty
+METRICS_TOKEN = env("METRICS_TOKEN", default="")
+# Redis the worker processes share their metrics through, so one scrape sees
+# them all (see core.worker_metrics); empty to serve each process's own
+METRICS_REDIS_URL = env("METRICS_REDIS_URL", default=REDIS_URL)
+METRICS_REDIS_TIMEOUT = env.float("METRICS_REDIS_TIMEOUT", default=0.5)
+# Seconds between the snapshots each worker publishes
+METRICS_PUBLISH_INTERVAL = env.float("METRICS_PUBLISH_INTERVAL", default=15.0)
+# Per-view query count and latency histograms, see core.instrumentation
+REQUEST_METRICS_ENABLED = env.bool("REQUEST_METRICS_ENABLED", default=True)
+# Requests with this header get a Server-Timing header and timings in the
+# response metadata; empty to never expose them
+REQUEST_TIMINGS_HEADER = env("REQUEST_TIMINGS_HEADER", default="X-Debug-Timings")
+# Header value that shows the timings to any client; without it staff only
+REQUEST_TIMINGS_SECRET = env("REQUEST_TIMINGS_SECRET", default="")
+# Inbound and outbound header carrying the request id, see core.tracing
+REQUEST_ID_HEADER = env("REQUEST_ID_HEADER", default="X-Request-ID")
+# File that finished spans are appended to as OTLP/JSON, off when empty
+TRACING_EXPORT_PATH = env("TRACING_EXPORT_PATH", default="")
+TRACING_SERVICE_NAME = env("TRACING_SERVICE_NAME", default="library_management")
 
 # Channels
 # ------------------------------------------------------------------------------
 ASGI_APPLICATION = "config.asgi.application"
 
+# Keep channel layers off the Celery/cache Redis in production. Listing several
+# URLs shards channels and groups across them by consistent hashing, so every
+# process must be given the same list in the same order.
+CHANNEL_REDIS_URLS = env.list("CHANNEL_REDIS_URLS", default=[REDIS_URL])
+CHANNEL_LAYER_BACKENDS = {
+    "core": "channels_redis.core.RedisChannelLayer",
+    "pubsub": "channels_redis.pubsub.RedisPubSubChannelLayer",
+}
+# https://channels.readthedocs.io/en/stable/topics/channel_layers.html
 CHANNEL_LAYERS = {
     "default": {
-        "BACKEND": "channels_redis.core.RedisChannelLayer",
+        "BACKEND": CHANNEL_LAYER_BACKENDS["core"],
         "CONFIG": {
-            "hosts": [env("REDIS_URL", default="redis://redis:6379/0")],
+            "hosts": CHANNEL_REDIS_URLS,
+            # Messages per channel before sends to it raise ChannelFull
+            "capacity": env.int("CHANNEL_LAYER_CAPACITY", default=1500),
+            # Seconds an undelivered message lives
+            "expiry": env.int("CHANNEL_LAYER_EXPIRY", default=10),
+            # Seconds a group membership lives, longer than any connection
+            "group_expiry": env.int("CHANNEL_LAYER_GROUP_EXPIRY", default=86400),
         },
     },
 }
+# Availability groups are broadcast-only: pub/sub delivers straight to
+# subscribed processes without per-channel lists or group sorted sets.
+# Set BOOK_AVAILABILITY_CHANNEL_LAYER_BACKEND=core to share the default layer.
+BOOK_AVAILABILITY_CHANNEL_LAYER_BACKEND = env(
+    "BOOK_AVAILABILITY_CHANNEL_LAYER_BACKEND", default="pubsub"
+)
+CHANNEL_LAYERS["availability"] = (
+    CHANNEL_LAYERS["default"]
+    if BOOK_AVAILABILITY_CHANNEL_LAYER_BACKEND == "core"
+    else {
+        "BACKEND": CHANNEL_LAYER_BACKENDS.get(
+            BOOK_AVAILABILITY_CHANNEL_LAYER_BACKEND,
+            BOOK_AVAILABILITY_CHANNEL_LAYER_BACKEND,
+        ),
+        "CONFIG": {"hosts": CHANNEL_REDIS_URLS},
+    }
+)
+# Book availability broadcasts are batched in-process and flushed by a
+# background thread, see library_management.library.broadcasts
+BOOK_AVAILABILITY_BROADCAST_INTERVAL = env.float(
+    "BOOK_AVAILABILITY_BROADCAST_INTERVAL", default=0.2
+)
+BOOK_AVAILABILITY_BROADCAST_QUEUE_SIZE = env.int(
+    "BOOK_AVAILABILITY_BROADCAST_QUEUE_SIZE", default=10_000
+)
+# Capped Redis stream that reconnecting availability clients resume from
+BOOK_AVAILABILITY_STREAM_URL = env("BOOK_AVAILABILITY_STREAM_URL", default=REDIS_URL)
+BOOK_AVAILABILITY_STREAM_MAXLEN = env.int(
+    "BOOK_AVAILABILITY_STREAM_MAXLEN", default=10_000
+)
+# Seconds to wait on the stream's Redis before giving up on an append or read
+BOOK_AVAILABILITY_STREAM_TIMEOUT = env.float(
+    "BOOK_AVAILABILITY_STREAM_TIMEOUT", default=0.5
+)
+# Clients further behind than this get a snapshot marker instead of a delta
+BOOK_AVAILABILITY_STREAM_MAX_DELTA = env.int(
+    "BOOK_AVAILABILITY_STREAM_MAX_DELTA", default=500
+)
+# Per-connection outbound queue limits, see BookAvailabilityConsumer
+WEBSOCKET_MAX_QUEUE_DEPTH = env.int("WEBSOCKET_MAX_QUEUE_DEPTH", default=256)
+WEBSOCKET_MAX_RESYNCS = env.int("WEBSOCKET_MAX_RESYNCS", default=3)
+WEBSOCKET_SEND_TIMEOUT = env.float("WEBSOCKET_SEND_TIMEOUT", default=5.0)
+# Server heartbeats and idle-connection reaping
+WEBSOCKET_HEARTBEAT_INTERVAL = env.float("WEBSOCKET_HEARTBEAT_INTERVAL", default=20.0)
+WEBSOCKET_IDLE_TIMEOUT = env.float("WEBSOCKET_IDLE_TIMEOUT", default=60.0)
@@ -11,7 +11,34 @@ ALLOWED_HOSTS = env.list("DJANGO_ALLOWED_HOSTS", default=["managelibrary.com"])
 
 # DATABASES
 # ------------------------------------------------------------------------------
-DATABASES["default"]["CONN_MAX_AGE"] = env.int("CONN_MAX_AGE", default=60)
+# https://docs.djangoproject.com/en/dev/ref/databases/#connection-pool
+if env.bool("DJANGO_DB_POOL", default=True):
+    # Every worker process opens its own pool per database, so split the
+    # connections this service may hold on each server between the workers
+    # gunicorn starts.
+    WEB_CONCURRENCY = env.int("WEB_CONCURRENCY", default=1)
+    DB_POOL_BUDGET = env.int("DJANGO_DB_POOL_BUDGET", default=80)
+    DB_POOL_MAX_SIZE = max(2, DB_POOL_BUDGET // WEB_CONCURRENCY)
+    for alias, database in DATABASES.items():
+        database["CONN_MAX_AGE"] = 0  # the pool keeps connections instead
+        # Hand out only connections that pass ConnectionPool.check_connection
+        database["CONN_HEALTH_CHECKS"] = True
+        database.setdefault("OPTIONS", {})["pool"] = {
+            "min_size": min(
+                env.int("DJANGO_DB_POOL_MIN_SIZE", default=2), DB_POOL_MAX_SIZE
+            ),
+            "max_size": DB_POOL_MAX_SIZE,
+            # Seconds a request waits for a free connection before failing
+            "timeout": env.float("DJANGO_DB_POOL_TIMEOUT", default=10.0),
+            # Shrink back to min_size after connections sit idle this long
+            "max_idle": env.float("DJANGO_DB_POOL_MAX_IDLE", default=300.0),
+            # Recycle connections periodically, e.g. across PgBouncer/failover
+            "max_lifetime": env.float("DJANGO_DB_POOL_MAX_LIFETIME", default=1800.0),
+            "name": alias,
+        }
+else:
+    for database in DATABASES.values():
+        database["CONN_MAX_AGE"] = env.int("CONN_MAX_AGE", default=60)
 
 # CACHES
 # ------------------------------------------------------------------------------
@@ -153,10 +180,13 @@ INSTALLED_APPS = ["collectfasta", *INSTALLED_APPS]
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
-    "filters": {"require_debug_false": {"()": "django.utils.log.RequireDebugFalse"}},
+    "filters": {
+        "require_debug_false": {"()": "django.utils.log.RequireDebugFalse"},
+        "request_id": {"()": "library_management.core.tracing.RequestIDLogFilter"},
+    },
     "formatters": {
         "verbose": {
-            "format": "%(levelname)s %(asctime)s %(module)s %(process)d %(thread)d %(message)s",
+            "format": "%(levelname)s %(asctime)s %(module)s %(process)d %(thread)d [%(request_id)s] %(message)s",
         },
     },
     "handlers": {
@@ -168,6 +198,7 @@ LOGGING = {
         "console": {
             "level": "DEBUG",
             "class": "logging.StreamHandler",
+            "filters": ["request_id"],
             "formatter": "verbose",
         },
     },
@@ -3,7 +3,7 @@ With these settings, tests run faster.
 """
 
 from .base import *  # noqa: F403
-from .base import TEMPLATES, env
+from .base import DATABASES, TEMPLATES, env
 
 # GENERAL
 # ------------------------------------------------------------------------------
@@ -15,6 +15,13 @@ SECRET_KEY = env(
 # https://docs.djangoproject.com/en/dev/ref/settings/#test-runner
 TEST_RUNNER = "django.test.runner.DiscoverRunner"
 
+# DATABASES
+# ------------------------------------------------------------------------------
+# A second connection to the test database stands in for a read replica.
+# Tests reading from it need transaction=True to see committed rows.
+DATABASES["replica"] = {**DATABASES["default"], "TEST": {"MIRROR": "default"}}
+DATABASE_REPLICAS = ["replica"]
+
 # PASSWORDS
 # ------------------------------------------------------------------------------
 # https://docs.djangoproject.com/en/dev/ref/settings/#password-hashers
@@ -35,3 +42,14 @@ TEMPLATES[0]["OPTIONS"]["debug"] = True  # type: ignore[index]
 MEDIA_URL = "http://media.testserver/"
 # Your stuff...
 # ------------------------------------------------------------------------------
+# https://channels.readthedocs.io/en/stable/topics/channel_layers.html#in-memory-channel-layer
+CHANNEL_LAYERS = {
+    "default": {"BACKEND": "channels.layers.InMemoryChannelLayer"},
+    "availability": {"BACKEND": "channels.layers.InMemoryChannelLayer"},
+}
+# No Redis in tests: availability clients always get a snapshot marker
+BOOK_AVAILABILITY_STREAM_URL = ""
+# Per-process throttle buckets
+THROTTLE_REDIS_URL = ""
+# Metrics of the test process only
+METRICS_REDIS_URL = ""
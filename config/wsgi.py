@@ -35,6 +35,12 @@ os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.production")
 # file. This includes Django's development server, if the WSGI_APPLICATION
 # setting points here.
 application = get_wsgi_application()
+
+# Share this process's metrics with the /metrics/ endpoint of every worker.
+from library_management.core.worker_metrics import PUBLISHER
+
+PUBLISHER.ensure_started()
+
 # Apply WSGI middleware here.
 # from helloworld.wsgi import HelloWorldApplication
 # application = HelloWorldApplication(application)
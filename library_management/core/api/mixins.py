@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.db import transaction
+
+
+class NonAtomicRequestsMixin:
+    """
+    Opt a view out of ``ATOMIC_REQUESTS`` on every database that enables it.
+
+    For read-only views: their queries run in autocommit instead of inside a
+    request-long ``BEGIN``/``COMMIT``. Views that write keep the
+    request-level transaction, and their services are atomic regardless.
+    """
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        for alias, database in settings.DATABASES.items():
+            if database.get("ATOMIC_REQUESTS"):
+                view = transaction.non_atomic_requests(using=alias)(view)
+        return view
@@ -1,3 +1,4 @@
+import time
 from typing import Any, Optional
 from uuid import uuid4
 
@@ -6,6 +7,8 @@ from django.utils import timezone
 from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 
+from library_management.core.instrumentation import request_timings
+
 
 class APISettings:
     """DRF-compatible API settings using Django's settings system."""
@@ -30,6 +33,18 @@ class StandardAPIRenderer(JSONRenderer):
 
     def render(
         self, data: Any, accepted_media_type=None, renderer_context=None
+    ) -> bytes:
+        timings = request_timings.get()
+        if timings is None:
+            return self._render(data, accepted_media_type, renderer_context)
+        started = time.perf_counter()
+        try:
+            return self._render(data, accepted_media_type, renderer_context)
+        finally:
+            timings.render += time.perf_counter() - started
+
+    def _render(
+        self, data: Any, accepted_media_type=None, renderer_context=None
     ) -> bytes:
         if renderer_context is None:
             renderer_context = {}
@@ -74,6 +89,10 @@ class StandardAPIRenderer(JSONRenderer):
             },
         }
 
+        timings = request_timings.get()
+        if timings is not None and timings.shown_to(getattr(request, "user", None)):
+            wrapped_data["metadata"]["timings"] = timings.as_dict()
+
         return super().render(wrapped_data, accepted_media_type, renderer_context)
 
     def _get_pagination_data(self, data: Any, view) -> Optional[dict]:
@@ -82,12 +101,16 @@ class StandardAPIRenderer(JSONRenderer):
             return None
 
         if all(k in data for k in ("count", "results")):
-            return {
+            pagination = {
                 "total_count": data.get("count"),
                 "next_page": data.get("next"),
                 "previous_page": data.get("previous"),
-                "page_size": self._get_page_size(view),
+                "page_size": data.get("page_size") or self._get_page_size(view),
             }
+            # Cursor pages don't know the total, only whether more follow.
+            if "has_more" in data:
+                pagination["has_more"] = data["has_more"]
+            return pagination
         return None
 
     def _get_page_size(self, view) -> Optional[int]:
@@ -0,0 +1,206 @@
+"""
+Token-bucket throttling shared by every process through Redis.
+
+Each ``<scope>:<user or IP>`` pair has a bucket holding up to N tokens that
+refills at N per period, for a rate of ``"N/period"`` in
+``DEFAULT_THROTTLE_RATES``. A request takes one token. The refill and the
+take happen in one Lua script, so a request costs a single Redis round trip
+and concurrent workers never race on the count.
+
+When Redis says no, it also says when the next token will be there. The
+process remembers that and rejects the caller locally until then without
+asking Redis again. Other processes only ever take tokens, so the bucket
+can't refill any sooner and no request Redis would allow is rejected.
+
+Without ``THROTTLE_REDIS_URL``, or while Redis is unreachable, buckets are
+kept per process.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+import redis
+from django.conf import settings
+from rest_framework.settings import api_settings
+from rest_framework.throttling import SimpleRateThrottle
+
+logger = logging.getLogger(__name__)
+
+# Buckets and rejections remembered per process, least recently used first out
+LOCAL_MAX_KEYS = 10_000
+# Seconds to stay on local buckets after Redis fails
+REDIS_RETRY_INTERVAL = 5
+
+# KEYS[1]: bucket; ARGV: capacity, tokens per millisecond.
+# Returns {allowed, milliseconds until the next token}.
+TOKEN_BUCKET_LUA = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local time = redis.call("TIME")
+local now = time[1] * 1000 + math.floor(time[2] / 1000)
+local bucket = redis.call("HMGET", KEYS[1], "tokens", "ts")
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed, wait = 0, 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    wait = math.ceil((1 - tokens) / rate)
+end
+redis.call("HSET", KEYS[1], "tokens", tostring(tokens), "ts", now)
+redis.call("PEXPIRE", KEYS[1], math.ceil(capacity / rate))
+return {allowed, wait}
+"""
+
+
+class LocalBuckets:
+    """In-process token buckets, the fallback when Redis isn't used."""
+
+    def __init__(self, maxsize=LOCAL_MAX_KEYS):
+        self.maxsize = maxsize
+        self._buckets = OrderedDict()  # key -> (tokens, updated at)
+        self._lock = threading.Lock()
+
+    def take(self, key, capacity, rate):
+        """Take a token; return seconds until the next one, 0 if allowed."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / rate
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.maxsize:
+                self._buckets.popitem(last=False)
+        return wait
+
+
+class Rejections:
+    """Callers known to be out of tokens, and until when."""
+
+    def __init__(self, maxsize=LOCAL_MAX_KEYS):
+        self.maxsize = maxsize
+        self._until = OrderedDict()  # key -> monotonic deadline
+        self._lock = threading.Lock()
+
+    def wait(self, key):
+        """Seconds ``key`` still has to wait, 0 when it may ask Redis."""
+        now = time.monotonic()
+        with self._lock:
+            until = self._until.get(key)
+            if until is None:
+                return 0.0
+            if until <= now:
+                del self._until[key]
+                return 0.0
+            return until - now
+
+    def reject(self, key, wait):
+        with self._lock:
+            self._until[key] = time.monotonic() + wait
+            self._until.move_to_end(key)
+            if len(self._until) > self.maxsize:
+                self._until.popitem(last=False)
+
+
+class RedisBuckets:
+    def __init__(self):
+        self._script = None
+        self._url = None
+        self._retry_at = 0.0
+
+    def available(self):
+        return bool(settings.THROTTLE_REDIS_URL) and time.monotonic() >= self._retry_at
+
+    def take(self, key, capacity, rate):
+        """Take a token; return seconds until the next one, 0 if allowed."""
+        try:
+            return self._take(key, capacity, rate)
+        except redis.RedisError:
+            self._retry_at = time.monotonic() + REDIS_RETRY_INTERVAL
+            raise
+
+    def _take(self, key, capacity, rate):
+        if self._script is None or self._url != settings.THROTTLE_REDIS_URL:
+            self._url = settings.THROTTLE_REDIS_URL
+            client = redis.Redis.from_url(
+                self._url,
+                socket_timeout=settings.THROTTLE_REDIS_TIMEOUT,
+                socket_connect_timeout=settings.THROTTLE_REDIS_TIMEOUT,
+            )
+            self._script = client.register_script(TOKEN_BUCKET_LUA)
+        allowed, wait_ms = self._script(keys=[key], args=[capacity, rate / 1000])
+        return 0.0 if allowed else wait_ms / 1000
+
+
+local_buckets = LocalBuckets()
+redis_buckets = RedisBuckets()
+rejections = Rejections()
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """
+    Throttles by ``throttle_scope`` of the view when it sets one, otherwise by
+    the ``user`` or ``anon`` scope. Scopes without a rate, and requests
+    without a cache key, aren't throttled.
+    """
+
+    cache_format = "throttle:%(scope)s:%(ident)s"
+
+    def __init__(self):
+        # The scope, and so the rate, depends on the view and the user.
+        self._wait = None
+
+    @property
+    def THROTTLE_RATES(self):  # noqa: N802
+        return api_settings.DEFAULT_THROTTLE_RATES
+
+    def allow_request(self, request, view):
+        self.scope = self.get_scope(request, view)
+        self.rate = self.THROTTLE_RATES.get(self.scope)
+        if self.rate is None:
+            return True
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        key = self.get_cache_key(request, view)
+        if key is None:
+            return True
+
+        self._wait = rejections.wait(key)
+        if self._wait:
+            return False
+        capacity, rate = self.num_requests, self.num_requests / self.duration
+        self._wait = None
+        if redis_buckets.available():
+            try:
+                self._wait = redis_buckets.take(key, capacity, rate)
+            except redis.RedisError:
+                logger.warning("Throttling falls back to local buckets", exc_info=True)
+        if self._wait is None:
+            self._wait = local_buckets.take(key, capacity, rate)
+        if self._wait:
+            rejections.reject(key, self._wait)
+            return False
+        return True
+
+    def get_scope(self, request, view):
+        authenticated = bool(request.user and request.user.is_authenticated)
+        return getattr(view, "throttle_scope", None) or (
+            "user" if authenticated else "anon"
+        )
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            ident = request.user.pk
+        else:
+            ident = self.get_ident(request)
+        return self.cache_format % {"scope": self.scope, "ident": ident}
+
+    def wait(self):
+        return self._wait
@@ -0,0 +1,88 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from rest_framework import generics
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .mixins import NonAtomicRequestsMixin
+
+
+class AsyncAPIView(NonAtomicRequestsMixin, APIView):
+    """
+    APIView whose handlers run on the event loop under ASGI.
+
+    Authentication, permissions and throttling still run in DRF's sync
+    ``initial()`` (one hop to the sync thread); the handler and rendering run
+    in the event loop. Handlers may be coroutines.
+
+    Django can't wrap async views in ``ATOMIC_REQUESTS``, so these views are
+    always non-atomic.
+    """
+
+    view_is_async = True
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(
+                    self, request.method.lower(), self.http_method_not_allowed
+                )
+            else:
+                handler = self.http_method_not_allowed
+            response = handler(request, *args, **kwargs)
+            if asyncio.iscoroutine(response):
+                response = await response
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        # Render here: Django would otherwise render a deferred response in
+        # the sync thread.
+        self.response.render()
+        return HttpResponse(
+            self.response.content,
+            status=self.response.status_code,
+            headers=self.response.headers,
+        )
+
+
+class AsyncListAPIView(AsyncAPIView, generics.ListAPIView):
+    """
+    ListAPIView whose GET handler runs on the event loop under ASGI.
+
+    The list query streams through ``QuerySet.aiterator()`` and serialization
+    happens in the event loop. Only the database round trips leave the loop.
+
+    Serializers must only touch fields loaded by the queryset (annotations,
+    ``select_related`` and ``prefetch_related``); lazy loads raise
+    ``SynchronousOnlyOperation``.
+    """
+
+    # Rows fetched per round trip, and per prefetch batch.
+    chunk_size = 2000
+
+    async def get(self, request, *args, **kwargs):
+        return await self.alist(request, *args, **kwargs)
+
+    async def alist(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+
+        if self.paginator is not None:
+            # DRF paginators are sync-only.
+            page = await sync_to_async(self.paginate_queryset)(queryset)
+            if page is not None:
+                serializer = self.get_serializer(page, many=True)
+                return self.get_paginated_response(serializer.data)
+
+        objects = [obj async for obj in queryset.aiterator(chunk_size=self.chunk_size)]
+        serializer = self.get_serializer(objects, many=True)
+        return Response(serializer.data)
@@ -0,0 +1,10 @@
+"""Helpers shared by the ``benchmark_*`` management commands."""
+
+
+def percentile(values, pct):
+    """The ``pct`` percentile of ``values`` (nearest rank), NaN when empty."""
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+    return ordered[index]
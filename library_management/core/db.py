@@ -0,0 +1,115 @@
+"""
+Prometheus metrics for Django's psycopg connection pools.
+
+The pool keeps its own statistics (``ConnectionPool.get_stats()``);
+:func:`collect_pool_stats` copies them into :data:`~.metrics.REGISTRY` right
+before the registry is rendered or published, labelled with the database alias.
+"""
+
+from django.db import connections
+
+from .metrics import Counter, Gauge
+
+# psycopg_pool statistic -> metric. Statistics never recorded are missing.
+POOL_GAUGES = {
+    "pool_min": Gauge("db_pool_min_size", "Pool min_size.", ["alias"]),
+    "pool_max": Gauge("db_pool_max_size", "Pool max_size.", ["alias"]),
+    "pool_size": Gauge(
+        "db_pool_size", "Connections held by the pool, in use or not.", ["alias"]
+    ),
+    "pool_available": Gauge(
+        "db_pool_available", "Idle connections ready to be handed out.", ["alias"]
+    ),
+    "requests_waiting": Gauge(
+        "db_pool_requests_waiting", "Requests waiting for a connection.", ["alias"]
+    ),
+}
+# psycopg_pool statistic -> (metric, scale to the metric's unit)
+POOL_COUNTERS = {
+    "connections_num": (
+        Counter(
+            "db_pool_connections_opened_total",
+            "Connections the pool opened to the server.",
+            ["alias"],
+        ),
+        1,
+    ),
+    "connections_ms": (
+        Counter(
+            "db_pool_connection_seconds_total",
+            "Time spent opening connections to the server.",
+            ["alias"],
+        ),
+        0.001,
+    ),
+    "connections_errors": (
+        Counter(
+            "db_pool_connection_errors_total",
+            "Failed attempts to open a connection.",
+            ["alias"],
+        ),
+        1,
+    ),
+    "connections_lost": (
+        Counter(
+            "db_pool_connections_lost_total",
+            "Connections found broken by the health check.",
+            ["alias"],
+        ),
+        1,
+    ),
+    "requests_num": (
+        Counter(
+            "db_pool_requests_total", "Connections requested from the pool.", ["alias"]
+        ),
+        1,
+    ),
+    "requests_queued": (
+        Counter(
+            "db_pool_requests_queued_total",
+            "Requests that had to wait for a connection.",
+            ["alias"],
+        ),
+        1,
+    ),
+    "requests_wait_ms": (
+        Counter(
+            "db_pool_request_wait_seconds_total",
+            "Time requests spent waiting for a connection.",
+            ["alias"],
+        ),
+        0.001,
+    ),
+    "requests_errors": (
+        Counter(
+            "db_pool_request_errors_total",
+            "Requests that timed out or failed waiting for a connection.",
+            ["alias"],
+        ),
+        1,
+    ),
+    "returns_bad": (
+        Counter(
+            "db_pool_returns_bad_total",
+            "Connections returned to the pool in a bad state.",
+            ["alias"],
+        ),
+        1,
+    ),
+}
+
+
+def pools():
+    """``(alias, pool)`` of every database configured with a pool."""
+    for alias in connections:
+        if connections.settings[alias].get("OPTIONS", {}).get("pool"):
+            yield alias, connections[alias].pool
+
+
+def collect_pool_stats():
+    for alias, pool in pools():
+        stats = pool.get_stats()
+        for name, gauge in POOL_GAUGES.items():
+            gauge.set(stats.get(name, 0), alias=alias)
+        for name, (counter, scale) in POOL_COUNTERS.items():
+            counter.set(stats.get(name, 0) * scale, alias=alias)
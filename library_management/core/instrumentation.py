@@ -0,0 +1,84 @@
+"""
+Per-request query counts and timings.
+
+:class:`~library_management.core.middleware.InstrumentationMiddleware` sets a
+:class:`RequestTimings` in :data:`request_timings` for every request. While
+one is set, :func:`record_query`, an execute wrapper on every database
+connection, counts the request's queries and their time, and
+``StandardAPIRenderer`` adds its rendering time. The middleware observes
+the totals in the histograms below, labelled with the URL name.
+"""
+
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from .metrics import Histogram
+
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "Time to serve a request.", ["view"]
+)
+REQUEST_QUERIES = Histogram(
+    "http_request_db_queries",
+    "SQL queries run by a request.",
+    ["view"],
+    buckets=QUERY_BUCKETS,
+)
+REQUEST_DB_SECONDS = Histogram(
+    "http_request_db_duration_seconds",
+    "Time a request spent waiting on SQL queries.",
+    ["view"],
+)
+REQUEST_RENDER_SECONDS = Histogram(
+    "http_request_render_duration_seconds",
+    "Time a request spent rendering its API response.",
+    ["view"],
+)
+
+
+@dataclass
+class RequestTimings:
+    queries: int = 0
+    db: float = 0.0
+    render: float = 0.0
+    # Set when the client asked to see the timings.
+    debug: bool = False
+    # Set when it asked with REQUEST_TIMINGS_SECRET as the header's value.
+    trusted: bool = False
+
+    def shown_to(self, user):
+        """Whether to return the timings: asked for by staff or with the secret."""
+        if not self.debug:
+            return False
+        return self.trusted or bool(getattr(user, "is_staff", False))
+
+    def as_dict(self):
+        return {
+            "queries": self.queries,
+            "db_ms": round(self.db * 1000, 2),
+            "render_ms": round(self.render * 1000, 2),
+        }
+
+
+# Set per request by InstrumentationMiddleware
+request_timings = ContextVar("request_timings", default=None)
+
+
+def record_query(execute, sql, params, many, context):
+    timings = request_timings.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.queries += 1
+        timings.db += time.perf_counter() - started
+
+
+def install_query_recorder(connection):
+    """Add :func:`record_query` to ``connection``, once."""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
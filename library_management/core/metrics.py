@@ -0,0 +1,164 @@
+"""
+Minimal in-process metrics rendered in the Prometheus text exposition format.
+
+Metrics are module-level objects registered in :data:`REGISTRY` on creation::
+
+    REQUESTS = Counter("app_requests_total", "Requests served.", ["view"])
+    REQUESTS.inc(view="books-list")
+
+Every process has its own registry; see :mod:`.worker_metrics` for
+scraping all the workers of a server at once.
+"""
+
+import math
+import threading
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                msg = f"Metric {metric.name} is already registered"
+                raise ValueError(msg)
+            self._metrics[metric.name] = metric
+
+    def get(self, name):
+        return self._metrics.get(name)
+
+    def snapshot(self, **labels):
+        """Sample lines of every metric by name, ``labels`` added to each."""
+        return {
+            metric.name: metric.samples(extra=labels.items())
+            for metric in list(self._metrics.values())
+        }
+
+    def render(self, snapshots=None):
+        """
+        Render every registered metric as Prometheus exposition text, with the
+        samples of this process or those of ``snapshots`` taken elsewhere.
+        """
+        if snapshots is None:
+            snapshots = [self.snapshot()]
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for snapshot in snapshots:
+                lines.extend(snapshot.get(metric.name, ()))
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+class _Metric:
+    type = "untyped"
+
+    def __init__(self, name, documentation, labelnames=(), registry=REGISTRY):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        registry.register(self)
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            msg = f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}"
+            raise ValueError(msg)
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _format_labels(self, key, extra=()):
+        pairs = [*zip(self.labelnames, key, strict=True), *extra]
+        if not pairs:
+            return ""
+        escaped = (
+            (name, value.replace("\\", "\\\\").replace('"', '\\"'))
+            for name, value in pairs
+        )
+        return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+    def samples(self, extra=()):
+        with self._lock:
+            items = list(self._values.items())
+        return [
+            f"{self.name}{self._format_labels(key, extra)} {value}"
+            for key, value in items
+        ]
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def set(self, value, **labels):
+        """Mirror a running total kept elsewhere, e.g. connection pool stats."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Gauge(_Metric):
+    type = "gauge"
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name,
+        documentation,
+        labelnames=(),
+        buckets=DEFAULT_BUCKETS,
+        registry=REGISTRY,
+    ):
+        self.buckets = (*sorted(buckets), math.inf)
+        super().__init__(name, documentation, labelnames, registry)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * len(self.buckets), 0))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            self._values[key] = (counts, total + value)
+
+    def samples(self, extra=()):
+        extra = list(extra)
+        with self._lock:
+            items = [(key, (list(c), t)) for key, (c, t) in self._values.items()]
+        lines = []
+        for key, (counts, total) in items:
+            for bound, count in zip(self.buckets, counts, strict=True):
+                le = "+Inf" if bound == math.inf else repr(float(bound))
+                labels = self._format_labels(key, [*extra, ("le", le)])
+                lines.append(f"{self.name}_bucket{labels} {count}")
+            labels = self._format_labels(key, extra)
+            lines.append(f"{self.name}_sum{labels} {total}")
+            lines.append(f"{self.name}_count{labels} {counts[-1]}")
+        return lines
@@ -0,0 +1,216 @@
+import hmac
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from .instrumentation import (
+    REQUEST_DB_SECONDS,
+    REQUEST_QUERIES,
+    REQUEST_RENDER_SECONDS,
+    REQUEST_SECONDS,
+    RequestTimings,
+    install_query_recorder,
+    request_timings,
+)
+from .routers import PinState, pin_state
+from .tracing import STATUS_ERROR, Span, clean_request_id, new_request_id, request_id
+
+
+class RequestIDMiddleware:
+    """
+    Gives every request an id, see ``core.tracing``, and times it as a span.
+
+    The id comes from the client's ``REQUEST_ID_HEADER`` when it looks like
+    one, so a request can be followed from the load balancer or the caller.
+    It is set as ``request.request_id`` and returned in the same header.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token, span = self.start(request)
+        try:
+            response = self.get_response(request)
+        except BaseException as exc:
+            span.end(exc)
+            raise
+        finally:
+            request_id.reset(token)
+        return self.finish(request, response, span)
+
+    async def __acall__(self, request):
+        token, span = self.start(request)
+        try:
+            response = await self.get_response(request)
+        except BaseException as exc:
+            span.end(exc)
+            raise
+        finally:
+            request_id.reset(token)
+        return self.finish(request, response, span)
+
+    def start(self, request):
+        inbound = request.headers.get(settings.REQUEST_ID_HEADER)
+        request.request_id = clean_request_id(inbound) or new_request_id()
+        token = request_id.set(request.request_id)
+        span = Span(
+            f"HTTP {request.method}",
+            {"http.method": request.method, "http.target": request.path},
+        ).start()
+        return token, span
+
+    def finish(self, request, response, span):
+        match = getattr(request, "resolver_match", None)
+        if match and match.url_name:
+            span.name = f"HTTP {request.method} {match.url_name}"
+        span.set_attribute("http.status_code", response.status_code)
+        if response.status_code >= 500:  # noqa: PLR2004
+            span.status = STATUS_ERROR
+        span.end()
+        response.headers[settings.REQUEST_ID_HEADER] = request.request_id
+        return response
+
+
+class ReplicaPinningMiddleware:
+    """Pins clients that recently wrote to the primary, with a cookie."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = pin_state.set(
+            PinState(pinned=settings.REPLICA_PIN_COOKIE in request.COOKIES)
+        )
+        try:
+            response = self.get_response(request)
+            return self.process_response(response)
+        finally:
+            pin_state.reset(token)
+
+    async def __acall__(self, request):
+        token = pin_state.set(
+            PinState(pinned=settings.REPLICA_PIN_COOKIE in request.COOKIES)
+        )
+        try:
+            response = await self.get_response(request)
+            return self.process_response(response)
+        finally:
+            pin_state.reset(token)
+
+    def process_response(self, response):
+        if pin_state.get().wrote:
+            response.set_cookie(
+                settings.REPLICA_PIN_COOKIE,
+                "1",
+                max_age=settings.REPLICA_PIN_SECONDS,
+                secure=settings.SESSION_COOKIE_SECURE,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
+
+
+def _install_query_recorder(sender, connection, **kwargs):
+    install_query_recorder(connection)
+
+
+class InstrumentationMiddleware:
+    """
+    Records each request's SQL query count, database time, rendering time and
+    total time in histograms per URL name, see ``core.instrumentation``.
+
+    Staff users sending the ``REQUEST_TIMINGS_HEADER``, and clients sending
+    ``REQUEST_TIMINGS_SECRET`` as its value, get the numbers back in a
+    ``Server-Timing`` header, and in the API response's ``metadata``. With
+    ``REQUEST_METRICS_ENABLED`` off the middleware removes itself and no
+    connection gets the execute wrapper.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+        connection_created.connect(
+            _install_query_recorder, dispatch_uid="instrumentation_query_recorder"
+        )
+        for connection in connections.all(initialized_only=True):
+            install_query_recorder(connection)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timings, token = self.start(request)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+            return self.finish(request, response, timings, started)
+        finally:
+            request_timings.reset(token)
+
+    async def __acall__(self, request):
+        timings, token = self.start(request)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+            return self.finish(request, response, timings, started)
+        finally:
+            request_timings.reset(token)
+
+    def start(self, request):
+        header = settings.REQUEST_TIMINGS_HEADER
+        value = request.headers.get(header) if header else None
+        secret = settings.REQUEST_TIMINGS_SECRET
+        timings = RequestTimings(
+            debug=value is not None,
+            trusted=bool(
+                value
+                and secret
+                and hmac.compare_digest(value.encode(), secret.encode())
+            ),
+        )
+        return timings, request_timings.set(timings)
+
+    def finish(self, request, response, timings, started):
+        total = time.perf_counter() - started
+        match = getattr(request, "resolver_match", None)
+        view = (match and match.url_name) or "unresolved"
+        REQUEST_SECONDS.observe(total, view=view)
+        REQUEST_QUERIES.observe(timings.queries, view=view)
+        REQUEST_DB_SECONDS.observe(timings.db, view=view)
+        REQUEST_RENDER_SECONDS.observe(timings.render, view=view)
+        # DRF sets the user it authenticated on the request too.
+        if timings.shown_to(getattr(request, "user", None)):
+            # The rest is middleware, authentication, the view's own work and
+            # serialization.
+            app = max(0.0, total - timings.db - timings.render)
+            response.headers["Server-Timing"] = (
+                f'db;dur={timings.db * 1000:.2f};desc="{timings.queries} queries", '
+                f"render;dur={timings.render * 1000:.2f}, "
+                f"app;dur={app * 1000:.2f}, "
+                f"total;dur={total * 1000:.2f}"
+            )
+        return response
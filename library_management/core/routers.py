@@ -0,0 +1,162 @@
+"""
+Read-replica routing for the catalogue.
+
+Reads of catalogue models (libraries, authors, categories, books and their
+tombstones) go to
+a healthy replica from ``DATABASE_REPLICAS``, everything else to
+``default``. Reads stay on the primary when:
+
+* they run inside a transaction on ``default``, e.g. the lookups
+  ``borrow_a_book`` does before writing;
+* the client is pinned to the primary. :func:`pin_to_primary`, called
+  after borrowing or returning a book, pins the rest of the request and,
+  through a cookie set by
+  :class:`~library_management.core.middleware.ReplicaPinningMiddleware`,
+  the client's next ``REPLICA_PIN_SECONDS`` seconds, so it reads its own
+  writes;
+* no replica is within ``REPLICA_MAX_LAG`` seconds of the primary. Lag is
+  measured at most every ``REPLICA_LAG_CHECK_INTERVAL`` seconds per process.
+"""
+
+import logging
+import random
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.exceptions import SynchronousOnlyOperation
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+CATALOGUE_MODELS = {
+    ("library", "library"),
+    ("library", "author"),
+    ("library", "category"),
+    ("library", "book"),
+    ("library", "cataloguetombstone"),
+}
+
+# Seconds the replica's last replayed transaction is behind the primary,
+# 0 when it has replayed everything it received or isn't in recovery at all.
+LAG_SQL = """
+SELECT CASE
+    WHEN NOT pg_is_in_recovery() THEN 0
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+END
+"""
+
+
+@dataclass
+class PinState:
+    pinned: bool = False
+    # Set when this request wrote, so the middleware renews the cookie.
+    wrote: bool = False
+
+
+# Set per request by ReplicaPinningMiddleware
+pin_state = ContextVar("replica_pin_state", default=None)
+
+
+def pin_to_primary():
+    """Read from the primary for the rest of the request and the pin period."""
+    state = pin_state.get()
+    if state is not None:
+        state.pinned = True
+        state.wrote = True
+
+
+def is_pinned():
+    state = pin_state.get()
+    return state is not None and state.pinned
+
+
+class ReplicaLagMonitor:
+    """Per-process cache of which replicas are within ``REPLICA_MAX_LAG``."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._healthy = {}  # alias -> (checked at, healthy)
+
+    def is_healthy(self, alias):
+        now = time.monotonic()
+        with self._lock:
+            previous = self._healthy.get(alias)
+            if previous and now - previous[0] < settings.REPLICA_LAG_CHECK_INTERVAL:
+                return previous[1]
+            # Claim the check; meanwhile other threads use the last answer.
+            self._healthy[alias] = (now, previous[1] if previous else False)
+        try:
+            lag = self.measure(alias)
+        except SynchronousOnlyOperation:
+            # Routed from the event loop, e.g. by QuerySet.aiterator(). Leave
+            # the measurement to the next read from a sync thread.
+            with self._lock:
+                if previous:
+                    self._healthy[alias] = previous
+                else:
+                    del self._healthy[alias]
+            return previous[1] if previous else False
+        except DatabaseError:
+            logger.warning("Replica %s is unreachable", alias, exc_info=True)
+            healthy = False
+        else:
+            healthy = lag <= settings.REPLICA_MAX_LAG
+            if not healthy:
+                logger.warning("Replica %s is %.1fs behind", alias, lag)
+        with self._lock:
+            self._healthy[alias] = (now, healthy)
+        return healthy
+
+    def measure(self, alias):
+        """Replication lag of ``alias`` in seconds."""
+        connection = connections[alias]
+        if connection.vendor != "postgresql":
+            return 0.0
+        with connection.cursor() as cursor:
+            cursor.execute(LAG_SQL)
+            (lag,) = cursor.fetchone()
+        return float(lag or 0)
+
+    def reset(self):
+        with self._lock:
+            self._healthy.clear()
+
+
+lag_monitor = ReplicaLagMonitor()
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if (model._meta.app_label, model._meta.model_name) not in CATALOGUE_MODELS:
+            return None
+        if "instance" in hints:
+            # Related lookups follow the database the instance came from.
+            return None
+        if is_pinned() or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        replicas = [
+            alias
+            for alias in settings.DATABASE_REPLICAS
+            if lag_monitor.is_healthy(alias)
+        ]
+        return random.choice(replicas) if replicas else None  # noqa: S311
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary.
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get their schema through replication.
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
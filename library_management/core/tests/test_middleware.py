@@ -0,0 +1,79 @@
+import json
+
+import pytest
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.urls import ResolverMatch
+from rest_framework.response import Response
+
+from library_management.core.api.renderers import StandardAPIRenderer
+from library_management.core.instrumentation import REQUEST_QUERIES
+from library_management.core.middleware import InstrumentationMiddleware
+
+
+def view(request):
+    with connection.cursor() as cursor:
+        for _ in range(3):
+            cursor.execute("SELECT 1")
+    response = Response({"message": "ok"})
+    response.accepted_renderer = StandardAPIRenderer()
+    response.accepted_media_type = "application/json"
+    response.renderer_context = {"response": response, "request": request}
+    return response.render()
+
+
+@pytest.mark.django_db
+def test_timings_are_returned_on_request(rf, settings):
+    settings.REQUEST_TIMINGS_SECRET = "s3cret"
+    request = rf.get("/books/", headers={"X-Debug-Timings": "s3cret"})
+
+    response = InstrumentationMiddleware(view)(request)
+
+    assert response["Server-Timing"].startswith("db;dur=")
+    assert '"3 queries"' in response["Server-Timing"]
+    timings = json.loads(response.content)["metadata"]["timings"]
+    assert timings["queries"] == 3  # noqa: PLR2004
+
+
+@pytest.mark.django_db
+def test_timings_are_returned_to_staff(rf, admin_user):
+    request = rf.get("/books/", headers={"X-Debug-Timings": "1"})
+    request.user = admin_user
+
+    response = InstrumentationMiddleware(view)(request)
+
+    assert "Server-Timing" in response
+    assert "timings" in json.loads(response.content)["metadata"]
+
+
+@pytest.mark.django_db
+def test_timings_are_not_returned_to_other_clients(rf, user, settings):
+    settings.REQUEST_TIMINGS_SECRET = "s3cret"
+    request = rf.get("/books/", headers={"X-Debug-Timings": "guess"})
+    request.user = user
+
+    response = InstrumentationMiddleware(view)(request)
+
+    assert "Server-Timing" not in response
+    assert "timings" not in json.loads(response.content)["metadata"]
+
+
+@pytest.mark.django_db
+def test_timings_are_only_recorded_by_default(rf):
+    request = rf.get("/books/")
+    request.resolver_match = ResolverMatch(view, (), {}, url_name="test-view")
+
+    response = InstrumentationMiddleware(view)(request)
+
+    assert "Server-Timing" not in response
+    assert "timings" not in json.loads(response.content)["metadata"]
+    assert 'http_request_db_queries_sum{view="test-view"} 3' in (
+        REQUEST_QUERIES.samples()
+    )
+
+
+def test_middleware_is_removed_when_disabled(settings):
+    settings.REQUEST_METRICS_ENABLED = False
+
+    with pytest.raises(MiddlewareNotUsed):
+        InstrumentationMiddleware(view)
@@ -0,0 +1,95 @@
+from unittest import mock
+
+import pytest
+from django.db import DatabaseError
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from library_management.core import routers
+from library_management.core.middleware import ReplicaPinningMiddleware
+from library_management.core.routers import ReplicaLagMonitor, ReplicaRouter
+from library_management.library.models import Book, BorrowedBook
+
+
+@pytest.fixture
+def healthy_replicas():
+    with mock.patch.object(routers.lag_monitor, "is_healthy", return_value=True):
+        yield
+
+
+@pytest.mark.usefixtures("healthy_replicas")
+def test_catalogue_reads_go_to_a_replica():
+    assert ReplicaRouter().db_for_read(Book) == "replica"
+
+
+@pytest.mark.usefixtures("healthy_replicas")
+def test_other_reads_stay_on_the_primary():
+    assert ReplicaRouter().db_for_read(BorrowedBook) is None
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures("healthy_replicas")
+def test_reads_in_a_transaction_stay_on_the_primary():
+    # pytest-django runs this test inside a transaction.
+    assert ReplicaRouter().db_for_read(Book) is None
+
+
+def test_lagging_replicas_are_skipped():
+    with mock.patch.object(routers.lag_monitor, "is_healthy", return_value=False):
+        assert ReplicaRouter().db_for_read(Book) is None
+
+
+def test_writes_go_to_the_primary():
+    assert ReplicaRouter().db_for_write(Book, instance=Book()) == "default"
+
+
+def test_replicas_are_not_migrated():
+    assert ReplicaRouter().allow_migrate("replica", "library") is False
+    assert ReplicaRouter().allow_migrate("default", "library") is None
+
+
+def test_lag_monitor_caches_measurements(settings):
+    settings.REPLICA_MAX_LAG = 2
+    settings.REPLICA_LAG_CHECK_INTERVAL = 60
+    monitor = ReplicaLagMonitor()
+
+    with mock.patch.object(monitor, "measure", return_value=5.0) as measure:
+        assert monitor.is_healthy("replica") is False
+        assert monitor.is_healthy("replica") is False
+    measure.assert_called_once_with("replica")
+
+    monitor.reset()
+    with mock.patch.object(monitor, "measure", return_value=0.5):
+        assert monitor.is_healthy("replica") is True
+
+
+def test_unreachable_replica_is_unhealthy():
+    monitor = ReplicaLagMonitor()
+
+    with mock.patch.object(monitor, "measure", side_effect=DatabaseError):
+        assert monitor.is_healthy("replica") is False
+
+
+def test_writes_pin_the_client_to_the_primary(settings):
+    def view(request):
+        routers.pin_to_primary()
+        return HttpResponse()
+
+    response = ReplicaPinningMiddleware(view)(RequestFactory().get("/"))
+
+    cookie = response.cookies[settings.REPLICA_PIN_COOKIE]
+    assert cookie["max-age"] == settings.REPLICA_PIN_SECONDS
+
+
+@pytest.mark.usefixtures("healthy_replicas")
+def test_pinned_client_reads_from_the_primary(settings):
+    request = RequestFactory().get("/")
+    request.COOKIES[settings.REPLICA_PIN_COOKIE] = "1"
+
+    def view(request):
+        return HttpResponse(ReplicaRouter().db_for_read(Book) or "default")
+
+    response = ReplicaPinningMiddleware(view)(request)
+
+    assert response.content == b"default"
+    assert settings.REPLICA_PIN_COOKIE not in response.cookies
@@ -0,0 +1,74 @@
+from unittest import mock
+
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from library_management.core.api import throttling
+from library_management.core.api.throttling import LocalBuckets, TokenBucketThrottle
+
+
+class CatalogueView:
+    throttle_scope = "catalogue"
+
+
+@pytest.fixture(autouse=True)
+def _fresh_buckets(settings):
+    settings.THROTTLE_REDIS_URL = ""
+    settings.REST_FRAMEWORK = {
+        **settings.REST_FRAMEWORK,
+        "DEFAULT_THROTTLE_RATES": {"catalogue": "3/min", "anon": "1/min"},
+    }
+    with (
+        mock.patch.object(throttling, "local_buckets", LocalBuckets()),
+        mock.patch.object(throttling, "rejections", throttling.Rejections()),
+    ):
+        yield
+
+
+def throttle(view):
+    request = Request(APIRequestFactory().get("/"))
+    request.user = AnonymousUser()
+    throttle = TokenBucketThrottle()
+    return throttle.allow_request(request, view), throttle.wait()
+
+
+def test_bucket_allows_a_burst_of_its_capacity():
+    results = [throttle(CatalogueView())[0] for _ in range(4)]
+
+    assert results == [True, True, True, False]
+
+
+def test_rejection_reports_the_wait_for_the_next_token():
+    for _ in range(3):
+        throttle(CatalogueView())
+
+    allowed, wait = throttle(CatalogueView())
+
+    assert not allowed
+    assert 19 < wait <= 20
+
+
+def test_rejected_callers_are_shed_locally():
+    for _ in range(4):
+        throttle(CatalogueView())
+
+    with mock.patch.object(throttling.local_buckets, "take") as take:
+        allowed, _ = throttle(CatalogueView())
+
+    assert not allowed
+    take.assert_not_called()
+
+
+def test_views_without_a_scope_use_the_anon_rate():
+    assert [throttle(object())[0] for _ in range(2)] == [True, False]
+
+
+def test_scopes_without_a_rate_are_not_throttled(settings):
+    settings.REST_FRAMEWORK = {
+        **settings.REST_FRAMEWORK,
+        "DEFAULT_THROTTLE_RATES": {},
+    }
+
+    assert all(throttle(CatalogueView())[0] for _ in range(10))
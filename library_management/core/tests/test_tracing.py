@@ -0,0 +1,120 @@
+import json
+import logging
+from types import SimpleNamespace
+
+import pytest
+from django.http import HttpResponse
+
+from library_management.core.middleware import RequestIDMiddleware
+from library_management.core.tracing import (
+    RequestIDLogFilter,
+    bind_request_id,
+    end_task_span,
+    get_request_id,
+    inject_task_headers,
+    span,
+    start_task_span,
+)
+
+
+@pytest.fixture
+def exported(settings, tmp_path):
+    path = tmp_path / "spans.jsonl"
+    settings.TRACING_EXPORT_PATH = str(path)
+
+    def read():
+        lines = path.read_text().splitlines()
+        return [
+            json.loads(line)["resourceSpans"][0]["scopeSpans"][0]["spans"][0]
+            for line in lines
+        ]
+
+    return read
+
+
+def view(request):
+    with span("work"):
+        return HttpResponse(get_request_id())
+
+
+def test_inbound_request_id_is_kept(rf):
+    request = rf.get("/books/", headers={"X-Request-ID": "lb-1234"})
+
+    response = RequestIDMiddleware(view)(request)
+
+    assert request.request_id == "lb-1234"
+    assert response["X-Request-ID"] == "lb-1234"
+    assert response.content == b"lb-1234"
+    assert get_request_id() is None
+
+
+@pytest.mark.parametrize("header", [{}, {"X-Request-ID": "no spaces allowed"}])
+def test_missing_or_invalid_request_id_is_replaced(rf, header):
+    request = rf.get("/books/", headers=header)
+
+    response = RequestIDMiddleware(view)(request)
+
+    assert len(response["X-Request-ID"]) == 32  # noqa: PLR2004
+    assert response["X-Request-ID"] != header.get("X-Request-ID")
+
+
+def test_spans_are_exported_as_otlp(rf, exported):
+    request = rf.get("/books/", headers={"X-Request-ID": "a" * 32})
+
+    RequestIDMiddleware(view)(request)
+
+    child, root = exported()
+    assert child["name"] == "work"
+    assert root["name"] == "HTTP GET"
+    assert child["traceId"] == root["traceId"] == "a" * 32
+    assert child["parentSpanId"] == root["spanId"]
+    assert "parentSpanId" not in root
+    assert {"key": "request.id", "value": {"stringValue": "a" * 32}} in (
+        root["attributes"]
+    )
+
+
+def test_failed_span_is_marked(exported):
+    with pytest.raises(ValueError), span("work"):
+        raise ValueError
+
+    (failed,) = exported()
+    assert failed["status"] == {"code": 2}
+
+
+def test_log_records_carry_request_id():
+    record = logging.makeLogRecord({})
+
+    with bind_request_id("req-1"):
+        RequestIDLogFilter().filter(record)
+
+    assert record.request_id == "req-1"
+
+
+def test_task_continues_the_publishers_trace(exported):
+    headers = {}
+    with bind_request_id("req-1"), span("publish") as publisher:
+        inject_task_headers(headers=headers)
+    task = SimpleNamespace(
+        name="send_outbox_emails", request=SimpleNamespace(**headers)
+    )
+
+    start_task_span(task_id="task-1", task=task)
+    assert get_request_id() == "req-1"
+    end_task_span(task_id="task-1", state="SUCCESS")
+
+    assert get_request_id() is None
+    _, task_span = exported()
+    assert task_span["parentSpanId"] == publisher.span_id
+    assert task_span["traceId"] == publisher.trace_id
+
+
+def test_task_without_headers_gets_a_request_id():
+    task = SimpleNamespace(name="send_due_soon_reminders", request=SimpleNamespace())
+
+    start_task_span(task_id="task-2", task=task)
+    assigned = get_request_id()
+    end_task_span(task_id="task-2", state="SUCCESS")
+
+    assert assigned is not None
+    assert get_request_id() is None
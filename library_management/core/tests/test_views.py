@@ -0,0 +1,55 @@
+import pytest
+from django.http import Http404
+
+from library_management.core import worker_metrics
+from library_management.core.metrics import Gauge, Registry
+from library_management.core.views import metrics
+
+
+def test_metrics_are_off_without_a_token(rf, settings):
+    settings.METRICS_TOKEN = ""
+
+    with pytest.raises(Http404):
+        metrics(rf.get("/metrics/"))
+
+
+def test_metrics_require_the_token(rf, settings):
+    settings.METRICS_TOKEN = "secret"  # noqa: S105
+
+    response = metrics(rf.get("/metrics/", headers={"Authorization": "Bearer no"}))
+
+    assert response.status_code == 401
+
+
+def test_metrics_render_the_registry(rf, settings):
+    settings.METRICS_TOKEN = "secret"  # noqa: S105
+
+    response = metrics(rf.get("/metrics/", headers={"Authorization": "Bearer secret"}))
+
+    assert response.status_code == 200
+    assert response["Content-Type"].startswith("text/plain")
+    assert b"# TYPE db_pool_size gauge" in response.content
+
+
+def test_metrics_render_every_worker(rf, settings, monkeypatch):
+    settings.METRICS_TOKEN = "secret"  # noqa: S105
+    settings.METRICS_REDIS_URL = "redis://metrics"
+    registry = Registry()
+    other = Gauge("test_worker_gauge", "Set in one worker.", registry=registry)
+    other.set(1)
+    snapshots = [
+        {"test_worker_gauge": other.samples(extra=[("worker", "a:1")])},
+        {"test_worker_gauge": other.samples(extra=[("worker", "b:2")])},
+    ]
+    monkeypatch.setattr(worker_metrics.PUBLISHER, "publish", lambda: None)
+    monkeypatch.setattr(worker_metrics.PUBLISHER, "snapshots", lambda: snapshots)
+    monkeypatch.setattr(worker_metrics, "REGISTRY", registry)
+
+    response = metrics(rf.get("/metrics/", headers={"Authorization": "Bearer secret"}))
+
+    assert response.content.decode().splitlines() == [
+        "# HELP test_worker_gauge Set in one worker.",
+        "# TYPE test_worker_gauge gauge",
+        'test_worker_gauge{worker="a:1"} 1',
+        'test_worker_gauge{worker="b:2"} 1',
+    ]
@@ -0,0 +1,278 @@
+"""
+Request ids and spans that follow a request across processes.
+
+:class:`~library_management.core.middleware.RequestIDMiddleware` takes the id
+from the client's ``REQUEST_ID_HEADER`` when it looks sane, or makes a new
+one, and sets it in :data:`request_id` for the rest of the request. From
+there it travels with the work the request starts:
+
+* log records, through :class:`RequestIDLogFilter` (``%(request_id)s``);
+* Celery tasks, as a message header added by :func:`inject_task_headers`
+  and restored in the worker by :func:`start_task_span`;
+* outbox emails, stored on the row and restored while the email is sent;
+* availability broadcasts, as ``request_ids`` on the channel-layer message.
+
+:func:`span` times a block of work. Spans of one request id share a trace
+id, and spans started inside another span are its children, so a slow
+borrow can be followed from the request through its task and emails. Every
+finished span is observed in ``span_duration_seconds`` and, when
+``TRACING_EXPORT_PATH`` is set, appended to that file as one OTLP/JSON
+``ExportTraceServiceRequest`` per line, the format of the OpenTelemetry
+Collector's file exporter.
+"""
+
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from contextvars import ContextVar
+from uuid import uuid4
+
+from django.conf import settings
+
+from .metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+# Ids taken from clients; anything else is replaced, not echoed back
+REQUEST_ID_PATTERN = re.compile(r"[A-Za-z0-9._:-]{1,128}")
+# Celery message headers carrying the context to the worker
+REQUEST_ID_TASK_HEADER = "request_id"
+PARENT_SPAN_TASK_HEADER = "parent_span_id"
+
+# OTLP status codes
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+SPAN_SECONDS = Histogram(
+    "span_duration_seconds", "Time taken by traced operations.", ["name"]
+)
+
+# Set per request by RequestIDMiddleware and per task by start_task_span
+request_id = ContextVar("request_id", default=None)
+current_span = ContextVar("current_span", default=None)
+
+
+def new_request_id():
+    return uuid4().hex
+
+
+def clean_request_id(value):
+    """``value`` if it is usable as a request id, otherwise ``None``."""
+    if value and REQUEST_ID_PATTERN.fullmatch(value):
+        return value
+    return None
+
+
+def get_request_id():
+    return request_id.get()
+
+
+@contextlib.contextmanager
+def bind_request_id(value):
+    """Run the block with ``value`` as the current request id."""
+    token = request_id.set(value or None)
+    try:
+        yield
+    finally:
+        request_id.reset(token)
+
+
+def trace_id_for(value):
+    """The 32 hex digit trace id of request id ``value``."""
+    if re.fullmatch(r"[0-9a-f]{32}", value):
+        return value
+    return hashlib.sha256(value.encode()).hexdigest()[:32]
+
+
+class RequestIDLogFilter(logging.Filter):
+    """Adds ``request_id`` to log records, ``-`` outside of a request."""
+
+    def filter(self, record):
+        record.request_id = request_id.get() or "-"
+        return True
+
+
+class Span:
+    def __init__(self, name, attributes=None, parent_id=None):
+        self.name = name
+        self.attributes = dict(attributes or {})
+        self.request_id = request_id.get()
+        parent = current_span.get()
+        self.parent_id = parent_id or (parent.span_id if parent else None)
+        self.trace_id = (
+            trace_id_for(self.request_id)
+            if self.request_id
+            else (parent.trace_id if parent else uuid4().hex)
+        )
+        self.span_id = os.urandom(8).hex()
+        self.status = STATUS_OK
+        self.start_ns = None
+        self.end_ns = None
+        self._started = None
+        self._token = None
+
+    @property
+    def duration(self):
+        return (self.end_ns - self.start_ns) / 1e9
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def start(self):
+        self.start_ns = time.time_ns()
+        self._started = time.perf_counter_ns()
+        self._token = current_span.set(self)
+        return self
+
+    def end(self, exc=None):
+        # The monotonic clock for the duration, the wall clock for the start.
+        self.end_ns = self.start_ns + time.perf_counter_ns() - self._started
+        if exc is not None:
+            self.status = STATUS_ERROR
+            self.attributes["exception.type"] = type(exc).__name__
+        current_span.reset(self._token)
+        SPAN_SECONDS.observe(self.duration, name=self.name)
+        exporter = get_exporter()
+        if exporter is not None:
+            exporter.export(self)
+
+    def as_otlp(self):
+        attributes = dict(self.attributes)
+        if self.request_id:
+            attributes["request.id"] = self.request_id
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [
+                {"key": key, "value": otlp_value(value)}
+                for key, value in attributes.items()
+            ],
+            "status": {"code": self.status},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+@contextlib.contextmanager
+def span(name, **attributes):
+    """Time the block as a span named ``name``; yields the :class:`Span`."""
+    current = Span(name, attributes).start()
+    try:
+        yield current
+    except BaseException as exc:
+        current.end(exc)
+        raise
+    current.end()
+
+
+def otlp_value(value):
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    if isinstance(value, list | tuple):
+        return {"arrayValue": {"values": [otlp_value(item) for item in value]}}
+    return {"stringValue": str(value)}
+
+
+class FileSpanExporter:
+    """Appends finished spans to ``path``, one OTLP/JSON request per line."""
+
+    def __init__(self, path, service_name):
+        self.path = path
+        self.resource = {
+            "attributes": [
+                {"key": "service.name", "value": {"stringValue": service_name}}
+            ]
+        }
+        self._lock = threading.Lock()
+
+    def export(self, finished):
+        line = json.dumps(
+            {
+                "resourceSpans": [
+                    {
+                        "resource": self.resource,
+                        "scopeSpans": [
+                            {
+                                "scope": {"name": __name__},
+                                "spans": [finished.as_otlp()],
+                            }
+                        ],
+                    }
+                ]
+            },
+            separators=(",", ":"),
+        )
+        try:
+            with self._lock, open(self.path, "a") as f:  # noqa: PTH123
+                f.write(line + "\n")
+        except OSError:
+            logger.warning("Failed to export span %s", finished.name, exc_info=True)
+
+
+_exporter = None
+
+
+def get_exporter():
+    """The exporter for ``TRACING_EXPORT_PATH``, ``None`` when it's empty."""
+    global _exporter  # noqa: PLW0603
+    path = settings.TRACING_EXPORT_PATH
+    if not path:
+        return None
+    if _exporter is None or _exporter.path != path:
+        _exporter = FileSpanExporter(path, settings.TRACING_SERVICE_NAME)
+    return _exporter
+
+
+# Celery signal handlers, connected in config.celery_app.
+
+_task_spans = {}  # task id -> (span, request id token)
+
+
+def inject_task_headers(headers=None, **kwargs):
+    """``before_task_publish``: send the request id along with the task."""
+    if headers is None:
+        return
+    if (value := request_id.get()) is not None:
+        headers.setdefault(REQUEST_ID_TASK_HEADER, value)
+    if (parent := current_span.get()) is not None:
+        headers.setdefault(PARENT_SPAN_TASK_HEADER, parent.span_id)
+
+
+def start_task_span(task_id=None, task=None, **kwargs):
+    """``task_prerun``: restore the publisher's request id, or make one."""
+    headers = task.request
+    value = clean_request_id(getattr(headers, REQUEST_ID_TASK_HEADER, None))
+    token = request_id.set(value or new_request_id())
+    task_span = Span(
+        f"celery.task {task.name}",
+        {"celery.task_id": task_id},
+        parent_id=getattr(headers, PARENT_SPAN_TASK_HEADER, None),
+    ).start()
+    _task_spans[task_id] = (task_span, token)
+
+
+def end_task_span(task_id=None, state=None, **kwargs):
+    """``task_postrun``: finish the span ``start_task_span`` started."""
+    task_span, token = _task_spans.pop(task_id, (None, None))
+    if task_span is None:
+        return
+    if state is not None:
+        task_span.set_attribute("celery.state", state)
+    if state == "FAILURE":
+        task_span.status = STATUS_ERROR
+    task_span.end()
+    request_id.reset(token)
@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.db import transaction
+from django.http import Http404, HttpResponse
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.http import require_GET
+
+from . import worker_metrics
+
+
+@require_GET
+@transaction.non_atomic_requests
+def metrics(request):
+    """
+    Prometheus scrape endpoint for the metrics of every worker process, or of
+    the serving one without ``METRICS_REDIS_URL``.
+
+    Disabled unless ``METRICS_TOKEN`` is set; scrapers send it as a bearer
+    token.
+    """
+    if not settings.METRICS_TOKEN:
+        raise Http404
+    authorization = request.headers.get("Authorization", "")
+    if not constant_time_compare(authorization, f"Bearer {settings.METRICS_TOKEN}"):
+        return HttpResponse(status=401)
+    return HttpResponse(
+        worker_metrics.render(), content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
@@ -0,0 +1,117 @@
+"""
+Metrics of every worker process of a server, shared through Redis.
+
+Each process keeps its own :data:`~.metrics.REGISTRY`, so behind gunicorn
+with ``WEB_CONCURRENCY`` workers, or several ASGI processes, a scrape would
+only see the worker that answered it. With ``METRICS_REDIS_URL`` set every
+process publishes a snapshot of its samples, labelled
+``worker="<host>:<pid>"``, every ``METRICS_PUBLISH_INTERVAL`` seconds and
+right before it answers a scrape, and ``/metrics/`` renders the snapshots of
+all live workers. Snapshots expire after three intervals, so workers that
+exited drop out.
+
+Aggregate across workers in queries, e.g.
+``sum without (worker) (rate(http_request_duration_seconds_count[5m]))``.
+A replaced worker starts its counters from zero under a new ``worker``
+label, which ``rate()`` and ``increase()`` handle. Pool gauges are per
+worker as well, since each worker has its own connection pools.
+"""
+
+import json
+import logging
+import os
+import socket
+import threading
+import time
+
+import redis
+from django.conf import settings
+
+from .db import collect_pool_stats
+from .metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "metrics:worker:"
+# Snapshot lifetime, in publish intervals
+EXPIRE_INTERVALS = 3
+
+
+def worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class Publisher:
+    def __init__(self):
+        self._pid = None
+        self._client = None
+        self._url = None
+        self._lock = threading.Lock()
+
+    def ensure_started(self):
+        """Publish from a daemon thread of this process, once per process."""
+        if not settings.METRICS_REDIS_URL or self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            threading.Thread(
+                target=self._run, name="metrics-publisher", daemon=True
+            ).start()
+
+    def _run(self):
+        while True:
+            try:
+                self.publish()
+            except redis.RedisError:
+                logger.warning("Could not publish the metrics", exc_info=True)
+            time.sleep(settings.METRICS_PUBLISH_INTERVAL)
+
+    def client(self):
+        if self._client is None or self._url != settings.METRICS_REDIS_URL:
+            self._url = settings.METRICS_REDIS_URL
+            self._client = redis.Redis.from_url(
+                self._url,
+                socket_timeout=settings.METRICS_REDIS_TIMEOUT,
+                socket_connect_timeout=settings.METRICS_REDIS_TIMEOUT,
+            )
+        return self._client
+
+    def publish(self):
+        collect_pool_stats()
+        self.client().set(
+            KEY_PREFIX + worker_id(),
+            json.dumps(REGISTRY.snapshot(worker=worker_id())),
+            ex=round(settings.METRICS_PUBLISH_INTERVAL * EXPIRE_INTERVALS),
+        )
+
+    def snapshots(self):
+        client = self.client()
+        keys = sorted(client.scan_iter(match=KEY_PREFIX + "*"))
+        if not keys:
+            return []
+        return [json.loads(value) for value in client.mget(keys) if value]
+
+    def _forked(self):
+        # Threads don't survive fork(); gunicorn --preload workers restart it.
+        self._pid = None
+        self._client = None
+        if settings.configured:
+            self.ensure_started()
+
+
+PUBLISHER = Publisher()
+os.register_at_fork(after_in_child=PUBLISHER._forked)
+
+
+def render():
+    """Exposition text of every live worker, or of this one without Redis."""
+    collect_pool_stats()
+    if settings.METRICS_REDIS_URL:
+        try:
+            PUBLISHER.publish()
+            return REGISTRY.render(PUBLISHER.snapshots())
+        except redis.RedisError:
+            logger.warning("Could not read the metrics of other workers", exc_info=True)
+    return REGISTRY.render([REGISTRY.snapshot(worker=worker_id())])
@@ -1,6 +1,15 @@
+from django.conf import settings
+from django.template.defaultfilters import filesizeformat
 from rest_framework import serializers
 
-from library_management.library.models import Author, Book, Category, Library
+from library_management.library.ingestion import FORMATS
+from library_management.library.models import (
+    Author,
+    Book,
+    CatalogueImport,
+    Category,
+    Library,
+)
 
 
 class LibrarySerializer(serializers.ModelSerializer):
@@ -79,3 +88,41 @@ class BookListSerializer(serializers.ModelSerializer):
             "created",
             "modified",
         )
+
+
+class CatalogueUploadSerializer(serializers.Serializer):
+    file = serializers.FileField()
+    format = serializers.ChoiceField(choices=FORMATS, required=False)
+
+    def validate_file(self, value):
+        if value.size > settings.CATALOGUE_UPLOAD_MAX_SIZE:
+            limit = filesizeformat(settings.CATALOGUE_UPLOAD_MAX_SIZE)
+            msg = f"Catalogue files are limited to {limit}, use import_catalogue."
+            raise serializers.ValidationError(msg)
+        return value
+
+    def validate(self, attrs):
+        if "format" not in attrs:
+            extension = attrs["file"].name.rsplit(".", 1)[-1].lower()
+            if extension not in FORMATS:
+                raise serializers.ValidationError(
+                    {"format": f"Pass one of {', '.join(FORMATS)}."}
+                )
+            attrs["format"] = extension
+        return attrs
+
+
+class CatalogueImportSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = CatalogueImport
+        fields = (
+            "id",
+            "library",
+            "format",
+            "status",
+            "counts",
+            "rejections",
+            "error",
+            "created",
+            "modified",
+        )
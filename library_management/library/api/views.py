@@ -1,23 +1,51 @@
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
 from django.db.models import Q
+from django.http import StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils.cache import patch_vary_headers
+from django.utils.dateparse import parse_datetime
 from rest_framework import generics
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
 
+from library_management.core.api.mixins import NonAtomicRequestsMixin
+from library_management.core.api.views import AsyncListAPIView
+from library_management.library import changes, exports
 from library_management.library.filters import AuthorFilter, BookFilter, LibraryFilter
+from library_management.library.models import CatalogueImport, Library
 from library_management.library.services import (
     AuthorService,
     BookService,
     LibraryService,
 )
+from library_management.library.tasks import ingest_catalogue
 
-from .serializers import AuthorListSerializer, BookListSerializer, LibrarySerializer
+from .serializers import (
+    AuthorListSerializer,
+    BookListSerializer,
+    CatalogueImportSerializer,
+    CatalogueUploadSerializer,
+    LibrarySerializer,
+)
+
+# Catalogue lists only need to know the caller is logged in, so JWTs are
+# trusted without loading the user.
+CATALOGUE_AUTHENTICATION = [JWTStatelessUserAuthentication, TokenAuthentication]
 
 
-class LibraryListView(generics.ListAPIView):
+class LibraryListView(NonAtomicRequestsMixin, generics.ListAPIView):
     """API view to list libraries with optional filtering by book category and author."""  # noqa: E501
 
     serializer_class = LibrarySerializer
     filterset_class = LibraryFilter
+    throttle_scope = "catalogue"
+    authentication_classes = CATALOGUE_AUTHENTICATION
 
     def get_queryset(self):
         """
@@ -35,11 +63,13 @@ class LibraryListView(generics.ListAPIView):
         return super().get_queryset()
 
 
-class AuthorListView(generics.ListAPIView):
+class AuthorListView(NonAtomicRequestsMixin, generics.ListAPIView):
     """API view to list authors with optional filtering by book category and author."""  # noqa: E501
 
     serializer_class = AuthorListSerializer
     filterset_class = AuthorFilter
+    throttle_scope = "catalogue"
+    authentication_classes = CATALOGUE_AUTHENTICATION
 
     def get_queryset(self):
         """
@@ -59,18 +89,34 @@ class AuthorListView(generics.ListAPIView):
         return AuthorService.get_authors(filters=filter_q if filter_q else None)
 
 
-class BookListView(generics.ListAPIView):
+class BookListView(NonAtomicRequestsMixin, generics.ListAPIView):
     """API view to list books with optional filtering by category and author."""
 
     # Assuming BookService and BookFilter are defined elsewhere
     queryset = BookService.get_books()
     serializer_class = BookListSerializer  # Assuming BookSerializer is defined
     filterset_class = BookFilter  # Assuming BookFilter is defined
+    throttle_scope = "catalogue"
+    authentication_classes = CATALOGUE_AUTHENTICATION
+
+
+class AsyncLibraryListView(AsyncListAPIView, LibraryListView):
+    """Async ORM variant of LibraryListView."""
+
+
+class AsyncAuthorListView(AsyncListAPIView, AuthorListView):
+    """Async ORM variant of AuthorListView."""
+
+
+class AsyncBookListView(AsyncListAPIView, BookListView):
+    """Async ORM variant of BookListView."""
 
 
 class BorrowBookView(APIView):
     """API view to handle borrowing books."""
 
+    throttle_scope = "borrow"
+
     def post(self, request, book_id, *args, **kwargs):
         """Handle borrowing books.
         Expects a list of book IDs in the request data.
@@ -87,6 +133,8 @@ class BorrowBookView(APIView):
 class ReturnBookView(APIView):
     """API view to handle borrowing books."""
 
+    throttle_scope = "borrow"
+
     def post(self, request, book_id, *args, **kwargs):
         """Handle borrowing books.
         Expects a list of book IDs in the request data.
@@ -99,3 +147,126 @@ class ReturnBookView(APIView):
         return Response(
             {"message": "Books returned successfully", "penalty": penalty}, status=200
         )
+
+
+class CatalogueIngestView(APIView):
+    """
+    API view to upload a catalogue file into a library.
+    The file is stored and loaded by the ``ingest_catalogue`` task; the
+    response is the import, whose status CatalogueImportView reports.
+    """
+
+    permission_classes = [IsAdminUser]
+    parser_classes = [MultiPartParser]
+
+    def post(self, request, library_id, *args, **kwargs):
+        serializer = CatalogueUploadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        library = get_object_or_404(Library, pk=library_id)
+
+        catalogue_import = CatalogueImport.objects.create(
+            library=library,
+            created_by=request.user,
+            file=serializer.validated_data["file"],
+            format=serializer.validated_data["format"],
+        )
+        transaction.on_commit(lambda: ingest_catalogue.delay(catalogue_import.pk))
+        return Response(CatalogueImportSerializer(catalogue_import).data, status=202)
+
+
+class CatalogueImportView(generics.RetrieveAPIView):
+    """API view reporting the progress and outcome of a catalogue import."""
+
+    permission_classes = [IsAdminUser]
+    serializer_class = CatalogueImportSerializer
+
+    def get_queryset(self):
+        return CatalogueImport.objects.filter(library_id=self.kwargs["library_id"])
+
+
+class BookExportView(NonAtomicRequestsMixin, APIView):
+    """
+    API view streaming every book as NDJSON or CSV.
+    ``modified_after`` (ISO 8601) limits the export to books changed since.
+    Gzipped when the client accepts it.
+    """
+
+    throttle_scope = "export"
+    authentication_classes = CATALOGUE_AUTHENTICATION
+
+    def perform_content_negotiation(self, request, force=False):
+        # The response isn't rendered, so don't turn away "Accept: text/csv".
+        return super().perform_content_negotiation(request, force=True)
+
+    def get(self, request, export_format, *args, **kwargs):
+        if export_format not in exports.FORMATS:
+            raise NotFound
+        modified_after = request.query_params.get("modified_after")
+        if modified_after is not None:
+            try:
+                modified_after = parse_datetime(modified_after)
+            except ValueError:
+                modified_after = None
+            if modified_after is None:
+                raise ValidationError({"modified_after": "Expected ISO 8601."})
+
+        chunks = exports.encode(exports.export_rows(modified_after), export_format)
+        gzipped = exports.accepts_gzip(request.headers.get("Accept-Encoding", ""))
+        if gzipped:
+            chunks = exports.gzip_chunks(chunks)
+        if isinstance(request._request, ASGIRequest):
+            # A sync iterator would be read into a list by the ASGI handler.
+            chunks = exports.iterate_async(chunks)
+        response = StreamingHttpResponse(
+            chunks, content_type=exports.FORMATS[export_format]
+        )
+        if gzipped:
+            response.headers["Content-Encoding"] = "gzip"
+        patch_vary_headers(response, ["Accept-Encoding"])
+        response.headers["Content-Disposition"] = (
+            f'attachment; filename="books.{export_format}"'
+        )
+        return response
+
+
+class ChangeFeedView(NonAtomicRequestsMixin, APIView):
+    """
+    API view listing catalogue changes (upserts and deletions) in order.
+    Pass the returned ``metadata.pagination.next_page`` cursor as ``since``
+    to get the following ones; ``has_more`` says whether they're there yet.
+    """
+
+    throttle_scope = "catalogue"
+    authentication_classes = CATALOGUE_AUTHENTICATION
+    default_limit = 500
+    max_limit = 5000
+
+    def get(self, request, *args, **kwargs):
+        try:
+            limit = int(request.query_params.get("limit", self.default_limit))
+        except ValueError:
+            limit = 0
+        if not 0 < limit <= self.max_limit:
+            raise ValidationError({"limit": f"Expected 1 to {self.max_limit}."})
+
+        since = request.query_params.get("since") or None
+        try:
+            entries, cursor = changes.changes(since=since, limit=limit)
+        except changes.CursorExpired as exc:
+            return Response({"error": str(exc)}, status=410)
+        except changes.CursorError as exc:
+            raise ValidationError({"since": str(exc)}) from exc
+
+        # Paginator-style keys: the renderer moves everything but the entries
+        # into metadata.pagination, with the cursor as next_page.
+        return Response(
+            {
+                "count": len(entries),
+                "next": cursor,
+                "previous": None,
+                "page_size": limit,
+                "has_more": len(entries) == limit,
+                "results": entries,
+            },
+            status=200,
+        )
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class LibraryConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "library_management.library"
+
+    def ready(self):
+        import library_management.library.checks  # noqa: F401, PLC0415
@@ -0,0 +1,238 @@
+"""
+Channel-layer broadcasts of book availability.
+
+Broadcasts never run on the request path: the post-commit handler only puts
+messages on an in-process queue, and a background thread flushes that queue
+to the channel layer. Events queued within the same flush interval are
+grouped so every group receives a single ``group_send`` per interval.
+
+Every event is serialized once per flush, as JSON text and as msgpack bytes,
+and consumers assemble their frames from those pre-encoded pieces instead of
+re-encoding per connection (see :func:`build_frame`). A frame is
+``{"events": [...]}`` where every event carries ``book_id``, ``library_id``,
+``author_id``, ``available_count`` (books of the library not on loan), ``ts``
+(milliseconds since the epoch) and ``seq``, its id in the availability stream
+that clients resume from (see :mod:`library_management.library.streams`).
+``available_count`` is counted by the post-commit handler, one query per
+committed batch, so the write transaction doesn't scan the library.
+
+Channel-layer messages also carry ``request_ids``, the ids of the requests
+whose commits produced the events (see :mod:`library_management.core.tracing`),
+and each flush is traced as a span. Frames sent to clients don't include them.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from collections import defaultdict
+
+import msgpack
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.db import router
+from django.db.models import Count, Exists, OuterRef
+
+from library_management.core.tracing import get_request_id, span
+
+from .dispatch import side_effect
+from .streams import availability_stream
+
+logger = logging.getLogger(__name__)
+
+BOOK_AVAILABLE = "book_available"
+# CHANNEL_LAYERS alias of the availability groups, a pub/sub layer by default
+AVAILABILITY_CHANNEL_LAYER = "availability"
+
+
+def availability_group(kind, pk):
+    """Channel-layer group of the ``<kind>:<pk>`` topic, e.g. ``book.42``."""
+    # Group names only allow alphanumerics, hyphens, underscores and periods.
+    return f"{kind}.{pk}"
+
+
+class BroadcastQueue:
+    """Buffers broadcasts and sends them to the channel layer in batches."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._queue = None
+        self._thread = None
+        self._pid = None
+
+    def put(self, group, events):
+        """Queue ``events`` for ``group`` without waiting on the channel layer."""
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((group, events, get_request_id()))
+        except queue.Full:
+            logger.warning("Broadcast queue is full, dropping events for %s", group)
+
+    def flush(self):
+        """Send everything currently queued from the calling thread."""
+        asyncio.run(self.flush_async(get_channel_layer(AVAILABILITY_CHANNEL_LAYER)))
+
+    async def flush_async(self, channel_layer):
+        """Send everything currently queued from the running event loop."""
+        if self._queue is None:
+            return
+        items = []
+        while True:
+            try:
+                items.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if items:
+            await self._send(channel_layer, items)
+
+    def _ensure_started(self):
+        if self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._pid == os.getpid() and self._thread.is_alive():
+                return
+            # Fresh state after a fork: the parent's thread doesn't exist here.
+            if self._pid != os.getpid():
+                self._queue = queue.Queue(
+                    maxsize=settings.BOOK_AVAILABILITY_BROADCAST_QUEUE_SIZE
+                )
+            self._thread = threading.Thread(
+                target=self._run, name="book-availability-broadcaster", daemon=True
+            )
+            self._thread.start()
+            self._pid = os.getpid()
+
+    def _run(self):
+        loop = asyncio.new_event_loop()
+        channel_layer = get_channel_layer(AVAILABILITY_CHANNEL_LAYER)
+        while True:
+            items = self._collect()
+            try:
+                loop.run_until_complete(self._send(channel_layer, items))
+            except Exception:
+                logger.exception("Failed to flush book availability broadcasts")
+
+    def _collect(self):
+        """Block for the first message, then gather more for one interval."""
+        items = [self._queue.get()]
+        deadline = time.monotonic() + settings.BOOK_AVAILABILITY_BROADCAST_INTERVAL
+        while (remaining := deadline - time.monotonic()) > 0:
+            try:
+                items.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return items
+
+    async def _send(self, channel_layer, items):
+        grouped = defaultdict(list)
+        request_ids = defaultdict(set)
+        for group, events, request_id in items:
+            grouped[group].extend(events)
+            if request_id:
+                request_ids[group].add(request_id)
+        # The same event is usually queued for its book, library and author.
+        unique = list(
+            {id(e): e for events in grouped.values() for e in events}.values()
+        )
+        with span(
+            "broadcast.book_available",
+            **{
+                "broadcast.events": len(unique),
+                "broadcast.groups": len(grouped),
+                "request.ids": sorted(set().union(*request_ids.values())),
+            },
+        ):
+            try:
+                availability_stream.append(unique)
+            except Exception:
+                logger.exception("Failed to append availability events to the stream")
+            encoded = {id(event): encode_event(event) for event in unique}
+            for group, events in grouped.items():
+                message = {
+                    "type": "book_available",
+                    "events": [encoded[id(event)] for event in events],
+                    "request_ids": sorted(request_ids[group]),
+                }
+                try:
+                    await channel_layer.group_send(group, message)
+                except Exception:
+                    logger.exception("Failed to broadcast to %s", group)
+
+
+def encode_event(event):
+    """Serialize ``event`` once in both wire encodings."""
+    return {
+        "book_id": event["book_id"],
+        "text": json.dumps(event, separators=(",", ":")),
+        "bytes": msgpack.packb(event),
+    }
+
+
+def build_frame(encoded_events, binary=False):
+    """
+    Assemble a ``{"events": [...]}`` frame from pre-encoded events.
+    ``encoded_events`` are the ``text`` (or, with ``binary``, the ``bytes``)
+    parts of :func:`encode_event` results; they are concatenated, not decoded.
+    """
+    if binary:
+        packer = msgpack.Packer()
+        return (
+            packer.pack_map_header(1)
+            + packer.pack("events")
+            + packer.pack_array_header(len(encoded_events))
+            + b"".join(encoded_events)
+        )
+    return '{"events":[' + ",".join(encoded_events) + "]}"
+
+
+broadcaster = BroadcastQueue()
+
+
+def available_counts(library_ids):
+    """Books of each library in ``library_ids`` that aren't on loan."""
+    if not library_ids:
+        return {}
+    # Not at the top: the ASGI routing imports this module before django.setup().
+    from .models import Book, BorrowedBook  # noqa: PLC0415
+
+    on_loan = BorrowedBook.objects.filter(book=OuterRef("pk"), returned_at__isnull=True)
+    rows = (
+        # The primary: a replica may not have replayed the commit yet.
+        Book.objects.using(router.db_for_write(Book))
+        .filter(library_id__in=library_ids)
+        .exclude(Exists(on_loan))
+        .values_list("library_id")
+        .annotate(Count("id"))
+        .order_by()
+    )
+    return {**dict.fromkeys(library_ids, 0), **dict(rows)}
+
+
+@side_effect(BOOK_AVAILABLE)
+def broadcast_book_availability(payloads):
+    """
+    Queue the availability events of a transaction for their topics.
+    Payloads without an ``available_count`` get their library's count.
+    """
+    counts = available_counts(
+        {p["library_id"] for p in payloads if "available_count" not in p}
+    )
+    grouped = defaultdict(list)
+    for payload in payloads:
+        event = {
+            "book_id": payload["book_id"],
+            "library_id": payload["library_id"],
+            "author_id": payload["author_id"],
+            "available_count": payload.get(
+                "available_count", counts.get(payload["library_id"])
+            ),
+            "ts": payload["ts"],
+        }
+        for kind in ("book", "library", "author"):
+            group = availability_group(kind, payload[f"{kind}_id"])
+            grouped[group].append(event)
+    for group, events in grouped.items():
+        broadcaster.put(group, events)
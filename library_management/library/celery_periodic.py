@@ -7,4 +7,12 @@ CELERY_BEAT_SCHEDULE = {
         "task": "library_management.library.tasks.send_due_soon_reminders",
         "schedule": crontab(minute=35, hour=21),  # 8:00 AM daily
     },
+    "purge-catalogue-tombstones-every-day": {
+        "task": "library_management.library.tasks.purge_catalogue_tombstones",
+        "schedule": crontab(minute=15, hour=3),
+    },
+    "send-outbox-emails-every-30-seconds": {
+        "task": "library_management.users.tasks.send_outbox_emails",
+        "schedule": 30.0,
+    },
 }
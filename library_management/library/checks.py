@@ -0,0 +1,159 @@
+"""
+System checks for the channel-layer topology.
+
+Run by ``manage.py check`` and on ``runserver``/``migrate``; the production
+start script runs them before serving so a bad ``CHANNEL_LAYERS`` fails the
+deploy instead of the first websocket connection.
+"""
+
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.checks import Error, Tags, Warning, register
+from django.utils.module_loading import import_string
+
+from .broadcasts import AVAILABILITY_CHANNEL_LAYER
+
+REDIS_SCHEMES = {"redis", "rediss", "unix"}
+# Options RedisPubSubChannelLayer accepts and silently ignores
+CORE_ONLY_OPTIONS = {"capacity", "channel_capacity", "expiry", "group_expiry"}
+POSITIVE_OPTIONS = ("capacity", "expiry", "group_expiry")
+
+
+def _is_pubsub(backend):
+    return backend.endswith(".RedisPubSubChannelLayer")
+
+
+def _is_redis(backend):
+    return backend.startswith("channels_redis.")
+
+
+def _host_urls(hosts):
+    for host in hosts:
+        if isinstance(host, str):
+            yield host
+        elif isinstance(host, dict) and "address" in host:
+            yield host["address"]
+
+
+@register(Tags.compatibility)
+def check_channel_layers(app_configs, **kwargs):
+    errors = []
+    layers = getattr(settings, "CHANNEL_LAYERS", {})
+    if AVAILABILITY_CHANNEL_LAYER not in layers:
+        errors.append(
+            Error(
+                f"CHANNEL_LAYERS has no {AVAILABILITY_CHANNEL_LAYER!r} layer.",
+                hint="Book availability websockets and broadcasts use it.",
+                id="library.E001",
+            )
+        )
+    for alias, layer in layers.items():
+        errors.extend(_check_layer(alias, layer))
+    return errors
+
+
+def _check_layer(alias, layer):
+    backend = layer.get("BACKEND", "")
+    try:
+        import_string(backend)
+    except ImportError:
+        return [
+            Error(
+                f"Channel layer {alias!r} has an unknown BACKEND {backend!r}.",
+                hint="Use one of: " + ", ".join(settings.CHANNEL_LAYER_BACKENDS),
+                id="library.E002",
+            )
+        ]
+    if not _is_redis(backend):
+        return []
+
+    errors = []
+    config = layer.get("CONFIG", {})
+    hosts = config.get("hosts")
+    if not hosts or isinstance(hosts, str | bytes):
+        errors.append(
+            Error(
+                f"Channel layer {alias!r} needs a non-empty list of hosts.",
+                hint="Set CHANNEL_REDIS_URLS, comma-separated.",
+                id="library.E003",
+            )
+        )
+        hosts = []
+    errors.extend(
+        Error(
+            f"Channel layer {alias!r} has an invalid Redis URL {url!r}.",
+            hint="Use redis://, rediss:// or unix:// URLs.",
+            id="library.E004",
+        )
+        for url in _host_urls(hosts)
+        if urlsplit(url).scheme not in REDIS_SCHEMES
+    )
+    errors.extend(
+        Error(
+            f"Channel layer {alias!r} option {option!r} must be a positive integer.",
+            id="library.E005",
+        )
+        for option in POSITIVE_OPTIONS
+        if option in config
+        and (not isinstance(config[option], int) or config[option] <= 0)
+    )
+    if _is_pubsub(backend) and (ignored := CORE_ONLY_OPTIONS & config.keys()):
+        errors.append(
+            Warning(
+                f"Channel layer {alias!r} is pub/sub and ignores "
+                f"{', '.join(sorted(ignored))}.",
+                id="library.W001",
+            )
+        )
+    # Anything but an int is already reported as library.E005.
+    group_expiry = config.get("group_expiry", 86400)
+    if (
+        not _is_pubsub(backend)
+        and isinstance(group_expiry, int)
+        and group_expiry < settings.WEBSOCKET_IDLE_TIMEOUT
+    ):
+        errors.append(
+            Warning(
+                f"Channel layer {alias!r} group_expiry is shorter than "
+                "WEBSOCKET_IDLE_TIMEOUT, connections will drop out of their "
+                "groups while still open.",
+                id="library.W002",
+            )
+        )
+    return errors
+
+
+@register(Tags.compatibility, deploy=True)
+def check_channel_layer_isolation(app_configs, **kwargs):
+    """Warn when channel layers share a Redis with Celery or the cache."""
+    shared = {getattr(settings, "CELERY_BROKER_URL", None)}
+    shared.update(
+        cache.get("LOCATION")
+        for cache in getattr(settings, "CACHES", {}).values()
+        if isinstance(cache.get("LOCATION"), str)
+    )
+    warnings = []
+    for alias, layer in getattr(settings, "CHANNEL_LAYERS", {}).items():
+        hosts = layer.get("CONFIG", {}).get("hosts") or []
+        if isinstance(hosts, str | bytes):
+            continue
+        overlap = {_server(url) for url in _host_urls(hosts)} & {
+            _server(url) for url in shared if url
+        }
+        if overlap:
+            warnings.append(
+                Warning(
+                    f"Channel layer {alias!r} shares Redis "
+                    f"{', '.join(sorted(overlap))} with Celery or the cache.",
+                    hint="Point CHANNEL_REDIS_URLS at a dedicated Redis.",
+                    id="library.W003",
+                )
+            )
+    return warnings
+
+
+def _server(url):
+    """``host:port`` of a Redis URL, ignoring the database number."""
+    parts = urlsplit(url)
+    return parts.path if parts.scheme == "unix" else parts.netloc.rpartition("@")[2]
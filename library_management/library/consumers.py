@@ -1,15 +1,277 @@
+import asyncio
 import json
+import logging
+import re
+import time
 
+import msgpack
 from channels.generic.websocket import AsyncWebsocketConsumer
+from django.conf import settings
+
+from library_management.core.metrics import Counter, Histogram
+
+from .broadcasts import AVAILABILITY_CHANNEL_LAYER, availability_group, build_frame
+from .streams import availability_stream
+
+logger = logging.getLogger(__name__)
+
+TOPIC_PATTERN = re.compile(r"^(book|library|author):(\d+)$")
+MAX_SUBSCRIPTIONS = 100
+MSGPACK_SUBPROTOCOL = "msgpack"
+# https://www.iana.org/assignments/websocket/websocket.xml#close-code-number
+CLOSE_CODE_TOO_SLOW = 4008
+CLOSE_CODE_IDLE = 4000
+
+OUTBOUND_QUEUE_DEPTH = Histogram(
+    "websocket_outbound_queue_depth",
+    "Pending availability events per connection when an event is queued.",
+    buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500, 1000),
+)
+EVENTS_COALESCED = Counter(
+    "websocket_events_coalesced_total",
+    "Availability events replaced by a newer event for the same book.",
+)
+RESYNCS = Counter(
+    "websocket_resyncs_total",
+    "Outbound queues discarded in favour of a resync notice.",
+)
+SLOW_CLIENTS_CLOSED = Counter(
+    "websocket_slow_clients_closed_total",
+    "Connections closed for not keeping up with availability events.",
+    ["reason"],
+)
+IDLE_CLIENTS_CLOSED = Counter(
+    "websocket_idle_clients_closed_total",
+    "Connections closed after WEBSOCKET_IDLE_TIMEOUT without client traffic.",
+)
 
 
 class BookAvailabilityConsumer(AsyncWebsocketConsumer):
+    """
+    Streams availability events for the topics a client subscribes to.
+
+    Clients send ``{"action": "subscribe", "topics": ["book:1", "library:2"]}``
+    (or ``"unsubscribe"``) and only receive events published to those topics.
+    Clients that offer the ``msgpack`` subprotocol get msgpack binary frames
+    instead of JSON text.
+
+    Events are not sent from the channel-layer handler. They go to a
+    per-connection outbound queue that keeps only the latest event per book,
+    and a sender task drains it, so a slow client never holds up the channel
+    layer. When the queue outgrows ``WEBSOCKET_MAX_QUEUE_DEPTH`` it is
+    replaced by a single ``{"resync": true}`` notice; clients that overflow it
+    more than ``WEBSOCKET_MAX_RESYNCS`` times before catching up, or block a
+    send past ``WEBSOCKET_SEND_TIMEOUT``, are closed.
+
+    The server sends ``{"action": "ping"}`` every ``WEBSOCKET_HEARTBEAT_INTERVAL``
+    seconds and expects some traffic back (``{"action": "pong"}`` will do).
+    Connections silent for ``WEBSOCKET_IDLE_TIMEOUT`` are closed and removed
+    from their groups right away rather than at channel-layer group expiry.
+    Clients may also send ``{"action": "ping"}`` and get a pong back.
+
+    After (re)subscribing, clients send ``{"action": "resume", "since": <seq>}``
+    with the last ``seq`` they saw. They get back either
+    ``{"action": "delta", "seq": ..., "events": [...]}`` with the latest event
+    per book of their topics since then, or ``{"action": "snapshot", "seq": ...}``
+    telling them to reload from the REST API and resume from ``seq``.
+    """
+
+    channel_layer_alias = AVAILABILITY_CHANNEL_LAYER
+
     async def connect(self):
-        await self.channel_layer.group_add("book_availability", self.channel_name)
-        await self.accept()
+        self.subscriptions = {}  # group name -> topic
+        self.use_msgpack = MSGPACK_SUBPROTOCOL in self.scope.get("subprotocols", [])
+        self.pending = {}  # book id -> latest pre-encoded event
+        self.pending_ready = asyncio.Event()
+        self.resync_required = False
+        self.resyncs = 0
+        self.closing = False
+        self.last_seen = time.monotonic()
+        await self.accept(subprotocol=MSGPACK_SUBPROTOCOL if self.use_msgpack else None)
+        self.tasks = [
+            asyncio.create_task(self.send_pending()),
+            asyncio.create_task(self.send_heartbeats()),
+        ]
 
     async def disconnect(self, close_code):
-        await self.channel_layer.group_discard("book_availability", self.channel_name)
+        for task in getattr(self, "tasks", []):
+            task.cancel()
+        await self.discard_groups()
+
+    async def discard_groups(self):
+        subscriptions, self.subscriptions = self.subscriptions, {}
+        for group in subscriptions:
+            await self.channel_layer.group_discard(group, self.channel_name)
+
+    async def receive(self, text_data=None, bytes_data=None):
+        self.last_seen = time.monotonic()
+        try:
+            data = msgpack.unpackb(bytes_data) if bytes_data else json.loads(text_data)
+            action = data["action"]
+        except (ValueError, TypeError, KeyError, msgpack.UnpackException):
+            await self.send_error("Expected an object with an 'action'.")
+            return
+
+        if action == "ping":
+            await self.send_data({"action": "pong"})
+            return
+        if action == "pong":
+            return
+        if action == "resume":
+            await self.resume(data.get("since"))
+            return
+
+        topics = data.get("topics")
+        if action not in ("subscribe", "unsubscribe") or not isinstance(topics, list):
+            await self.send_error("Unsupported action or malformed topics.")
+            return
+
+        groups = {}
+        for topic in topics:
+            match = TOPIC_PATTERN.match(str(topic))
+            if not match:
+                await self.send_error(f"Invalid topic: {topic}")
+                return
+            groups[availability_group(*match.groups())] = topic
+
+        if action == "subscribe":
+            await self.subscribe(groups)
+        else:
+            await self.unsubscribe(groups)
+
+    async def subscribe(self, groups):
+        new_groups = {g: t for g, t in groups.items() if g not in self.subscriptions}
+        if len(self.subscriptions) + len(new_groups) > MAX_SUBSCRIPTIONS:
+            await self.send_error(
+                f"A connection can't subscribe to more than {MAX_SUBSCRIPTIONS} topics."
+            )
+            return
+        for group, topic in new_groups.items():
+            await self.channel_layer.group_add(group, self.channel_name)
+            self.subscriptions[group] = topic
+        await self.send_subscriptions()
+
+    async def unsubscribe(self, groups):
+        for group in groups:
+            if self.subscriptions.pop(group, None) is not None:
+                await self.channel_layer.group_discard(group, self.channel_name)
+        await self.send_subscriptions()
+
+    async def resume(self, since):
+        try:
+            events, latest = await availability_stream.since(since)
+        except Exception:
+            logger.exception("Failed to read the availability stream")
+            events, latest = None, None
+        if events is None:
+            await self.send_data({"action": "snapshot", "seq": latest})
+            return
+
+        delta = {}
+        for event in events:
+            if self.is_subscribed(event):
+                delta.pop(event["book_id"], None)
+                delta[event["book_id"]] = event
+        await self.send_data(
+            {"action": "delta", "seq": latest, "events": list(delta.values())}
+        )
+
+    def is_subscribed(self, event):
+        return any(
+            availability_group(kind, event[f"{kind}_id"]) in self.subscriptions
+            for kind in ("book", "library", "author")
+        )
+
+    async def send_subscriptions(self):
+        await self.send_data({"subscriptions": sorted(self.subscriptions.values())})
+
+    async def send_error(self, error):
+        await self.send_data({"error": error})
+
+    async def send_data(self, data):
+        if self.use_msgpack:
+            await self.send(bytes_data=msgpack.packb(data))
+        else:
+            await self.send(text_data=json.dumps(data))
 
     async def book_available(self, event):
-        await self.send(text_data=json.dumps({"message": event["message"]}))
+        if self.closing:
+            return
+        encoding = "bytes" if self.use_msgpack else "text"
+        for item in event["events"]:
+            # Keep only the latest state per book, ordered by recency.
+            if self.pending.pop(item["book_id"], None) is not None:
+                EVENTS_COALESCED.inc()
+            self.pending[item["book_id"]] = item[encoding]
+
+        if len(self.pending) > settings.WEBSOCKET_MAX_QUEUE_DEPTH:
+            self.pending.clear()
+            self.resync_required = True
+            self.resyncs += 1
+            RESYNCS.inc()
+            if self.resyncs > settings.WEBSOCKET_MAX_RESYNCS:
+                await self.close_slow_client(reason="resyncs")
+                return
+
+        OUTBOUND_QUEUE_DEPTH.observe(len(self.pending))
+        self.pending_ready.set()
+
+    async def send_pending(self):
+        """Drain the outbound queue, one frame per wake-up."""
+        while True:
+            await self.pending_ready.wait()
+            self.pending_ready.clear()
+            try:
+                if self.resync_required:
+                    self.resync_required = False
+                    await self.send_with_timeout(self.encode({"resync": True}))
+                if self.pending:
+                    events, self.pending = list(self.pending.values()), {}
+                    await self.send_with_timeout(
+                        build_frame(events, binary=self.use_msgpack)
+                    )
+                if not self.resync_required:
+                    # Caught up: later overflows start counting afresh.
+                    self.resyncs = 0
+            except TimeoutError:
+                await self.close_slow_client(reason="send_timeout")
+                return
+
+    async def send_heartbeats(self):
+        """Ping the client and close the connection once it has gone idle."""
+        while True:
+            await asyncio.sleep(settings.WEBSOCKET_HEARTBEAT_INTERVAL)
+            if time.monotonic() - self.last_seen > settings.WEBSOCKET_IDLE_TIMEOUT:
+                logger.info("Closing idle websocket %s", self.channel_name)
+                IDLE_CLIENTS_CLOSED.inc()
+                await self.close_eagerly(code=CLOSE_CODE_IDLE)
+                return
+            try:
+                await self.send_with_timeout(self.encode({"action": "ping"}))
+            except TimeoutError:
+                await self.close_slow_client(reason="send_timeout")
+                return
+
+    async def send_with_timeout(self, frame):
+        if isinstance(frame, bytes):
+            send = self.send(bytes_data=frame)
+        else:
+            send = self.send(text_data=frame)
+        await asyncio.wait_for(send, timeout=settings.WEBSOCKET_SEND_TIMEOUT)
+
+    async def close_slow_client(self, reason):
+        logger.info("Closing slow websocket %s (%s)", self.channel_name, reason)
+        SLOW_CLIENTS_CLOSED.inc(reason=reason)
+        await self.close_eagerly(code=CLOSE_CODE_TOO_SLOW)
+
+    async def close_eagerly(self, code):
+        """Close and leave all groups now, without waiting for the disconnect."""
+        self.closing = True
+        self.pending.clear()
+        await self.discard_groups()
+        await self.close(code=code)
+
+    def encode(self, data):
+        if self.use_msgpack:
+            return msgpack.packb(data)
+        return json.dumps(data)
@@ -0,0 +1,83 @@
+"""
+Post-commit dispatch of side effects raised by the library services.
+
+Services call :func:`defer` instead of talking to Celery or the channel layer
+directly. Deferred effects run only once the surrounding transaction commits,
+and every effect of the same kind raised within one transaction is handed to
+its handler in a single call, so the handler can publish them together.
+Effects raised inside a savepoint form a batch of their own, which is
+dropped if the savepoint is rolled back.
+"""
+
+import logging
+import threading
+from collections import defaultdict
+
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+_handlers = {}
+_local = threading.local()
+
+
+class _Batch:
+    def __init__(self):
+        self.effects = defaultdict(list)
+
+    def add(self, name, payload):
+        self.effects[name].append(payload)
+
+    def flush(self):
+        _dispatch(self.effects)
+
+
+def side_effect(name):
+    """Register the decorated function as the handler of ``name`` effects."""
+
+    def decorator(func):
+        _handlers[name] = func
+        return func
+
+    return decorator
+
+
+def defer(name, **payload):
+    """
+    Run the ``name`` side effect with ``payload`` after the current commit.
+    Outside of a transaction the effect is dispatched immediately.
+    """
+    connection = transaction.get_connection()
+    if not connection.in_atomic_block:
+        _dispatch({name: [payload]})
+        return
+
+    # One batch per savepoint: rolling a savepoint back discards the on_commit
+    # callbacks registered inside it, and so the effects of its batch.
+    savepoint = next((sid for sid in reversed(connection.savepoint_ids) if sid), None)
+    batches = getattr(_local, "batches", {})
+    batch = batches.get(savepoint)
+    if batch is None or not _is_scheduled(connection, batch):
+        # Either the first effect at this level of the transaction, or the
+        # previous batch was discarded by a rollback or already flushed.
+        batches = {
+            sid: other
+            for sid, other in batches.items()
+            if _is_scheduled(connection, other)
+        }
+        batch = batches[savepoint] = _Batch()
+        _local.batches = batches
+        transaction.on_commit(batch.flush)
+    batch.add(name, payload)
+
+
+def _is_scheduled(connection, batch):
+    return any(func == batch.flush for _, func, _ in connection.run_on_commit)
+
+
+def _dispatch(effects):
+    for name, payloads in effects.items():
+        try:
+            _handlers[name](payloads)
+        except Exception:
+            logger.exception("Failed to dispatch %s side effect", name)
@@ -0,0 +1,134 @@
+"""
+Streaming exports of the book catalogue.
+
+Rows come from ``values_list(...).iterator()``, which reads through a
+server-side cursor on PostgreSQL, and are encoded and optionally gzipped
+chunk by chunk. Memory stays constant however large the catalogue is: no
+model instances, no full result list, no full file.
+"""
+
+import csv
+import json
+import zlib
+from datetime import datetime
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from .models import Book
+
+FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+# Output column -> Book lookup
+EXPORT_FIELDS = {
+    "id": "id",
+    "title": "title",
+    "description": "description",
+    "author": "author__name",
+    "category": "category__name",
+    "library": "library__name",
+    "modified": "modified",
+}
+
+# Encoded bytes gathered before a chunk is handed to the response
+BUFFER_SIZE = 64 * 1024
+
+
+def export_rows(modified_after=None):
+    """Tuples of ``EXPORT_FIELDS`` values for every book, in id order."""
+    queryset = Book.objects.order_by("id")
+    if modified_after is not None:
+        queryset = queryset.filter(modified__gt=modified_after)
+    return queryset.values_list(*EXPORT_FIELDS.values()).iterator(
+        chunk_size=settings.CATALOGUE_EXPORT_CHUNK_SIZE
+    )
+
+
+def encode(rows, file_format):
+    """Byte chunks of ``rows`` in ``file_format``."""
+    encoder = _encode_csv if file_format == "csv" else _encode_ndjson
+    return _buffered(encoder(rows))
+
+
+def gzip_chunks(chunks):
+    """Gzip ``chunks`` as they come, a complete ``.gz`` member in the end."""
+    compressor = zlib.compressobj(wbits=31)  # 16 + 15: gzip header and trailer
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+async def iterate_async(chunks):
+    """
+    Hand ``chunks`` to an ASGI response one at a time.
+
+    Each chunk is read in the thread-sensitive sync thread, where the
+    server-side cursor lives, so the export is never gathered in memory.
+    """
+    chunks = iter(chunks)
+    next_chunk = sync_to_async(next, thread_sensitive=True)
+    try:
+        while (chunk := await next_chunk(chunks, None)) is not None:
+            yield chunk
+    finally:
+        if hasattr(chunks, "close"):
+            await sync_to_async(chunks.close, thread_sensitive=True)()
+
+
+def accepts_gzip(accept_encoding):
+    """Whether an ``Accept-Encoding`` header value allows gzip, q-values included."""
+    weights = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.partition(";")
+        weight = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.lower() == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[coding.strip().lower()] = weight
+    return weights.get("gzip", weights.get("*", 0.0)) > 0
+
+
+def _encode_ndjson(rows):
+    keys = list(EXPORT_FIELDS)
+    for row in rows:
+        values = dict(zip(keys, _plain(row), strict=True))
+        yield json.dumps(values, ensure_ascii=False) + "\n"
+
+
+class _Echo:
+    """File-like object handing back what csv.writer writes to it."""
+
+    def write(self, value):
+        return value
+
+
+def _encode_csv(rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for row in rows:
+        yield writer.writerow(_plain(row))
+
+
+def _plain(row):
+    return [
+        value.isoformat() if isinstance(value, datetime) else value for value in row
+    ]
+
+
+def _buffered(lines):
+    buffer, size = [], 0
+    for line in lines:
+        encoded = line.encode()
+        buffer.append(encoded)
+        size += len(encoded)
+        if size >= BUFFER_SIZE:
+            yield b"".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield b"".join(buffer)
@@ -0,0 +1,80 @@
+"""
+Readers for catalogue files, each yielding one dict per book with ``title``,
+``author``, ``category`` and optionally ``description`` and ``external_id``,
+the record's id in the source catalogue.
+
+* ``csv``: a header row naming those columns.
+* ``jsonl``: one JSON object per line.
+* ``marc``: MARC-like text records separated by blank lines, one field per
+  line as ``<tag> <value>``. Tag 001 is the record id, 245 the title, 100
+  the author, 650 the category and 520 the description; other tags are
+  ignored. A leading ``$a`` subfield marker is dropped, as are indicators
+  like ``10``::
+
+      001 ocm00012345
+      245 10 $a The Dispossessed
+      100 1  $a Le Guin, Ursula K.
+      650  0 $a Science fiction
+"""
+
+import csv
+import json
+import re
+
+FORMATS = ("csv", "jsonl", "marc")
+
+MARC_FIELDS = {
+    "001": "external_id",
+    "245": "title",
+    "100": "author",
+    "650": "category",
+    "520": "description",
+}
+# Tag, optional indicators, optional $a, value
+MARC_LINE = re.compile(r"^(\d{3})\s+(?:[\d ]{1,2}\s+)?(?:\$a\s*)?(.*)$")
+# Control fields (00X) have no indicators or subfields: tag, value
+MARC_CONTROL_LINE = re.compile(r"^(00\d)\s+(.*)$")
+
+
+class IngestionError(ValueError):
+    pass
+
+
+def read_records(stream, file_format):
+    """Records of the text ``stream`` in ``file_format``."""
+    if file_format == "csv":
+        return csv.DictReader(stream)
+    if file_format == "jsonl":
+        return _read_jsonl(stream)
+    if file_format == "marc":
+        return _read_marc(stream)
+    msg = f"Unknown format {file_format!r}, expected one of {', '.join(FORMATS)}"
+    raise IngestionError(msg)
+
+
+def _read_jsonl(stream):
+    for number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as exc:
+            msg = f"Line {number} is not valid JSON: {exc}"
+            raise IngestionError(msg) from exc
+
+
+def _read_marc(stream):
+    record = {}
+    for line in stream:
+        if not line.strip():
+            if record:
+                yield record
+            record = {}
+            continue
+        line = line.rstrip("\r\n")
+        match = MARC_CONTROL_LINE.match(line) or MARC_LINE.match(line)
+        if match and match.group(1) in MARC_FIELDS:
+            # Repeated fields (more subjects, say) keep the first one.
+            record.setdefault(MARC_FIELDS[match.group(1)], match.group(2).strip())
+    if record:
+        yield record
@@ -0,0 +1,102 @@
+"""
+Load test the sync catalogue list endpoints against their async variants.
+
+Point it at a server running several uvicorn workers, e.g.::
+
+    gunicorn config.asgi:application -k uvicorn_worker.UvicornWorker -w 4
+    python manage.py benchmark_catalogue --base-url http://localhost:8000 \\
+        --email admin@example.com --concurrency 200 --requests 5000
+
+Every endpoint gets the same number of requests at the same concurrency and
+the command reports throughput, latency percentiles and status codes. The
+list views are throttled in the ``catalogue`` scope, 600 requests a minute
+per user, which answers most of a long run with 429s: raise
+``DEFAULT_THROTTLE_RATES["catalogue"]`` on the benchmark server first, or
+empty its ``DEFAULT_THROTTLE_CLASSES``.
+"""
+
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from library_management.core.benchmarking import percentile
+
+ENDPOINTS = {
+    "books": ("/api/books/", "/api/books/async/"),
+    "authors": ("/api/authors/", "/api/authors/async/"),
+    "libraries": (
+        "/api/libraries/?latitude=30.0444&longitude=31.2357",
+        "/api/libraries/async/?latitude=30.0444&longitude=31.2357",
+    ),
+}
+
+
+class Command(BaseCommand):
+    help = "Benchmark the sync catalogue list endpoints against the async ones."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--base-url", default="http://localhost:8000")
+        parser.add_argument(
+            "--email", required=True, help="User to mint an access token for."
+        )
+        parser.add_argument("--concurrency", type=int, default=50)
+        parser.add_argument(
+            "--requests", type=int, default=1000, help="Requests per endpoint."
+        )
+        parser.add_argument(
+            "--endpoint",
+            action="append",
+            choices=sorted(ENDPOINTS),
+            help="Endpoint to benchmark, repeatable. Defaults to all of them.",
+        )
+        parser.add_argument("--timeout", type=float, default=30)
+
+    def handle(self, *args, **options):
+        try:
+            user = get_user_model().objects.get(email=options["email"])
+        except get_user_model().DoesNotExist as exc:
+            raise CommandError(f"No user {options['email']!r}") from exc
+        token = str(RefreshToken.for_user(user).access_token)
+
+        for name in options["endpoint"] or sorted(ENDPOINTS):
+            for path in ENDPOINTS[name]:
+                url = options["base_url"].rstrip("/") + path
+                self.stdout.write(self.run(url, token, **options))
+
+    def run(self, url, token, concurrency, requests, timeout, **options):
+        headers = {"Authorization": f"Bearer {token}"}
+
+        def fetch(_):
+            request = urllib.request.Request(url, headers=headers)  # noqa: S310
+            started = time.perf_counter()
+            try:
+                with urllib.request.urlopen(request, timeout=timeout) as response:  # noqa: S310
+                    response.read()
+                    status = response.status
+            except urllib.error.HTTPError as exc:
+                status = exc.code
+            except OSError as exc:
+                status = type(exc).__name__
+            return status, (time.perf_counter() - started) * 1000
+
+        wall_start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(fetch, range(requests)))
+        wall = time.perf_counter() - wall_start
+
+        statuses = Counter(status for status, _ in results)
+        latencies = [latency for status, latency in results if status == 200]
+        return (
+            f"{url}\n"
+            f"  throughput:              {len(results) / wall:.1f} req/s\n"
+            f"  latency p50/p90/p99/max: {percentile(latencies, 50):.1f} / "
+            f"{percentile(latencies, 90):.1f} / {percentile(latencies, 99):.1f} / "
+            f"{max(latencies, default=float('nan')):.1f} ms\n"
+            f"  statuses:                {dict(statuses)}"
+        )
@@ -0,0 +1,138 @@
+"""
+Measure what connection setup costs a request, with and without the pool.
+
+Simulates requests from a number of threads against the ``default`` database.
+Each request runs a trivial query, wrapped in the connection handling that
+Django's request_started/request_finished signals do. The run is repeated
+for three strategies:
+
+* ``close``: ``CONN_MAX_AGE=0`` without a pool, one connection per request.
+* ``persistent``: ``CONN_MAX_AGE=60``, one long-lived connection per thread.
+* ``pool``: a psycopg pool sized by ``--pool-size``.
+
+Needs psycopg 3 and psycopg_pool, i.e. the production requirements::
+
+    python manage.py benchmark_db_connections --threads 32 --requests 5000
+"""
+
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.backends.postgresql.psycopg_any import is_psycopg3
+from django.db.backends.signals import connection_created
+
+from library_management.core.benchmarking import percentile
+
+STRATEGIES = ("close", "persistent", "pool")
+
+
+class Command(BaseCommand):
+    help = "Benchmark connection churn with and without the psycopg pool."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=16)
+        parser.add_argument(
+            "--requests", type=int, default=2000, help="Requests per strategy."
+        )
+        parser.add_argument(
+            "--pool-size", type=int, default=None, help="Defaults to --threads."
+        )
+        parser.add_argument(
+            "--strategy", action="append", choices=STRATEGIES, help="Repeatable."
+        )
+
+    def handle(self, *args, **options):
+        if connections["default"].vendor != "postgresql" or not is_psycopg3:
+            msg = "The connection pool needs PostgreSQL with psycopg 3."
+            raise CommandError(msg)
+        pool_size = options["pool_size"] or options["threads"]
+        for strategy in options["strategy"] or STRATEGIES:
+            alias = f"benchmark_{strategy}"
+            connections.settings[alias] = self.settings_for(strategy, pool_size)
+            try:
+                self.stdout.write(
+                    self.run(alias, strategy, options["threads"], options["requests"])
+                )
+            finally:
+                self.teardown(alias)
+
+    def settings_for(self, strategy, pool_size):
+        settings_dict = dict(connections["default"].settings_dict)
+        options = {
+            key: value
+            for key, value in settings_dict.get("OPTIONS", {}).items()
+            if key != "pool"
+        }
+        settings_dict["CONN_MAX_AGE"] = 60 if strategy == "persistent" else 0
+        settings_dict["ATOMIC_REQUESTS"] = False
+        if strategy == "pool":
+            options["pool"] = {"min_size": pool_size, "max_size": pool_size}
+        settings_dict["OPTIONS"] = options
+        return settings_dict
+
+    def run(self, alias, strategy, threads, requests):
+        opened = 0
+        opened_lock = threading.Lock()
+
+        def count_connection(sender, connection, **kwargs):
+            nonlocal opened
+            if connection.alias == alias:
+                with opened_lock:
+                    opened += 1
+
+        latencies = []
+        remaining = iter(range(requests))
+
+        def worker():
+            connection = connections[alias]
+            try:
+                while next(remaining, None) is not None:
+                    started = time.perf_counter()
+                    # What django.db.close_old_connections does around a request
+                    connection.close_if_unusable_or_obsolete()
+                    with connection.cursor() as cursor:
+                        cursor.execute("SELECT 1")
+                    connection.close_if_unusable_or_obsolete()
+                    latencies.append((time.perf_counter() - started) * 1000)
+            finally:
+                connection.close()
+
+        if strategy == "pool":
+            # Fill the pool up front, as a long-running worker would have.
+            connections[alias].pool.open(wait=True)
+        workers = [threading.Thread(target=worker) for _ in range(threads)]
+        connection_created.connect(count_connection)
+        wall_start = time.perf_counter()
+        try:
+            for thread in workers:
+                thread.start()
+            for thread in workers:
+                thread.join()
+        finally:
+            connection_created.disconnect(count_connection)
+        wall = time.perf_counter() - wall_start
+
+        if strategy == "pool":
+            stats = connections[alias].pool.get_stats()
+            opened_detail = (
+                f"{stats.get('connections_num', 0)} server connections, "
+                f"{opened} checkouts"
+            )
+        else:
+            opened_detail = f"{opened} server connections"
+        return (
+            f"{strategy}\n"
+            f"  throughput:              {requests / wall:.1f} req/s\n"
+            f"  latency p50/p90/p99/max: {percentile(latencies, 50):.2f} / "
+            f"{percentile(latencies, 90):.2f} / {percentile(latencies, 99):.2f} / "
+            f"{max(latencies, default=float('nan')):.2f} ms\n"
+            f"  connections:             {opened_detail}"
+        )
+
+    def teardown(self, alias):
+        connection = connections[alias]
+        connection.close_pool()
+        del connections[alias]
+        del connections.settings[alias]
@@ -0,0 +1,197 @@
+"""
+Load-generation harness for the ASGI websocket tier.
+
+Connects N in-process websocket clients to ``config.asgi.application``, has
+each of them subscribe to a library topic, and publishes availability events
+at a fixed rate through the same post-commit path ``return_a_book`` uses.
+Reports delivery latency percentiles, memory per connection and CPU usage.
+
+Example::
+
+    python manage.py benchmark_websockets --clients 2000 --rate 200 --duration 30
+"""
+
+import asyncio
+import json
+import random
+import time
+import tracemalloc
+
+from channels.layers import InMemoryChannelLayer, channel_layers
+from channels.testing import WebsocketCommunicator
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+from library_management.core.benchmarking import percentile
+from library_management.library import broadcasts, dispatch
+from library_management.library.broadcasts import (
+    AVAILABILITY_CHANNEL_LAYER,
+    BOOK_AVAILABLE,
+    BroadcastQueue,
+)
+
+
+class InlineBroadcastQueue(BroadcastQueue):
+    """Broadcast queue flushed from the benchmark's own event loop.
+
+    The in-memory channel layer isn't thread-safe, so the background sender
+    thread is replaced by :meth:`run` when benchmarking with it.
+    """
+
+    def __init__(self, maxsize):
+        super().__init__()
+        self._queue = asyncio.Queue(maxsize=maxsize)
+
+    def put(self, group, events):
+        try:
+            self._queue.put_nowait((group, events))
+        except asyncio.QueueFull:
+            broadcasts.logger.warning("Broadcast queue is full, dropping events")
+
+    async def flush_async(self, channel_layer):
+        items = []
+        while not self._queue.empty():
+            items.append(self._queue.get_nowait())
+        if items:
+            await self._send(channel_layer, items)
+
+    async def run(self, channel_layer, interval):
+        while True:
+            await asyncio.sleep(interval)
+            await self.flush_async(channel_layer)
+
+
+class Command(BaseCommand):
+    help = "Benchmark websocket fan-out of book availability events."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--clients", type=int, default=500)
+        parser.add_argument(
+            "--rate", type=float, default=50, help="Book returns per second."
+        )
+        parser.add_argument("--duration", type=float, default=10, help="Seconds.")
+        parser.add_argument(
+            "--libraries",
+            type=int,
+            default=10,
+            help="Clients are spread over this many library topics.",
+        )
+        parser.add_argument(
+            "--channel-layer",
+            choices=["memory", "settings"],
+            default="memory",
+            help="Use an in-memory layer, or the configured availability layer.",
+        )
+
+    def handle(self, *args, **options):
+        # Heartbeats would otherwise skew latency on short runs, and the
+        # availability stream needs Redis.
+        with override_settings(
+            WEBSOCKET_HEARTBEAT_INTERVAL=options["duration"] + 60,
+            BOOK_AVAILABILITY_STREAM_URL="",
+        ):
+            report = asyncio.run(self.run(**options))
+        for line in report:
+            self.stdout.write(line)
+
+    async def run(self, clients, rate, duration, libraries, channel_layer, **options):
+        from config.asgi import application  # noqa: PLC0415
+
+        flusher = None
+        original_broadcaster = broadcasts.broadcaster
+        if channel_layer == "memory":
+            layer = InMemoryChannelLayer(capacity=10_000)
+            previous_layer = channel_layers.set(AVAILABILITY_CHANNEL_LAYER, layer)
+            inline = InlineBroadcastQueue(maxsize=100_000)
+            broadcasts.broadcaster = inline
+            flusher = asyncio.create_task(
+                inline.run(layer, settings.BOOK_AVAILABILITY_BROADCAST_INTERVAL)
+            )
+
+        latencies = []
+        tracemalloc.start()
+        memory_before = tracemalloc.get_traced_memory()[0]
+        communicators = []
+        try:
+            for i in range(clients):
+                communicator = WebsocketCommunicator(
+                    application, "/ws/book-availability/"
+                )
+                connected, _ = await communicator.connect()
+                if not connected:
+                    self.stderr.write(f"Client {i} failed to connect")
+                    continue
+                await communicator.send_json_to(
+                    {"action": "subscribe", "topics": [f"library:{i % libraries}"]}
+                )
+                await communicator.receive_json_from()
+                communicators.append(communicator)
+            memory_per_connection = (
+                tracemalloc.get_traced_memory()[0] - memory_before
+            ) / max(len(communicators), 1)
+            tracemalloc.stop()
+
+            cpu_start, wall_start = time.process_time(), time.monotonic()
+            receivers = [
+                asyncio.create_task(self.receive(c, latencies)) for c in communicators
+            ]
+            published = await self.publish(rate, duration, libraries)
+            # Give in-flight events time to arrive before stopping.
+            await asyncio.sleep(1)
+            cpu = time.process_time() - cpu_start
+            wall = time.monotonic() - wall_start
+            for receiver in receivers:
+                receiver.cancel()
+            await asyncio.gather(*receivers, return_exceptions=True)
+        finally:
+            if tracemalloc.is_tracing():
+                tracemalloc.stop()
+            for communicator in communicators:
+                await communicator.disconnect()
+            if flusher is not None:
+                flusher.cancel()
+                channel_layers.set(AVAILABILITY_CHANNEL_LAYER, previous_layer)
+            broadcasts.broadcaster = original_broadcaster
+
+        expected = published * len(communicators) / libraries
+        return [
+            f"clients:                 {len(communicators)}",
+            f"events published:        {published}",
+            f"deliveries:              {len(latencies)} (~{expected:.0f} expected)",
+            f"latency p50/p90/p99/max: {percentile(latencies, 50):.1f} / "
+            f"{percentile(latencies, 90):.1f} / {percentile(latencies, 99):.1f} / "
+            f"{max(latencies, default=float('nan')):.1f} ms",
+            f"memory per connection:   {memory_per_connection / 1024:.1f} KiB",
+            f"cpu:                     {cpu:.2f}s over {wall:.2f}s "
+            f"({100 * cpu / wall:.0f}% of one core)",
+        ]
+
+    async def publish(self, rate, duration, libraries):
+        """Emit the availability events a stream of book returns would emit."""
+        published = 0
+        interval = 1 / rate
+        deadline = time.monotonic() + duration
+        next_at = time.monotonic()
+        while next_at < deadline:
+            # Outside a transaction, dispatch runs the post-commit handler
+            # right away, as return_a_book's commit would. The count is given,
+            # so the handler doesn't query the database from the event loop.
+            dispatch.defer(
+                BOOK_AVAILABLE,
+                book_id=random.randint(1, 100_000),  # noqa: S311
+                library_id=random.randrange(libraries),  # noqa: S311
+                author_id=random.randint(1, 10_000),  # noqa: S311
+                available_count=0,
+                ts=int(time.time() * 1000),
+            )
+            published += 1
+            next_at += interval
+            await asyncio.sleep(max(0, next_at - time.monotonic()))
+        return published
+
+    async def receive(self, communicator, latencies):
+        while True:
+            frame = json.loads(await communicator.receive_from(timeout=3600))
+            now = time.time() * 1000
+            latencies.extend(now - event["ts"] for event in frame.get("events", ()))
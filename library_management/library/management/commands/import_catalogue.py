@@ -0,0 +1,81 @@
+"""
+Load a catalogue file into a library.
+
+Reads CSV, JSONL or MARC-like records (see ``library.ingestion``) and
+upserts the books in chunks, one transaction each. Books are matched on
+the record id (``external_id``, MARC 001), so running the same file again
+updates them in place and an interrupted import can be resumed by running
+it again. Records without an id are added as new copies every time::
+
+    python manage.py import_catalogue branch.marc --library "New Branch"
+"""
+
+import sys
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from library_management.library.ingestion import FORMATS, IngestionError, read_records
+from library_management.library.models import Library
+from library_management.library.services import CatalogueIngestionService
+
+
+class Command(BaseCommand):
+    help = "Import books, authors and categories into a library's catalogue."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to import, - for stdin.")
+        parser.add_argument("--library", required=True, help="Library id or name.")
+        parser.add_argument(
+            "--format", choices=FORMATS, help="Defaults to the file extension."
+        )
+        parser.add_argument("--chunk-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        file_format = options["format"] or Path(options["path"]).suffix.lstrip(".")
+        if file_format not in FORMATS:
+            msg = f"Pass --format, one of {', '.join(FORMATS)}."
+            raise CommandError(msg)
+        library = self.get_library(options["library"])
+
+        service = CatalogueIngestionService(library)
+        started = time.monotonic()
+
+        def progress(counts):
+            rate = (counts["books"] + counts["rejected"]) / (time.monotonic() - started)
+            self.stdout.write(
+                f"{counts['books']} books, {counts['authors']} new authors, "
+                f"{counts['categories']} new categories, {counts['rejected']} "
+                f"rejected ({rate:.0f} records/s)"
+            )
+
+        stream = (
+            sys.stdin
+            if options["path"] == "-"
+            else Path(options["path"]).open(newline="", encoding="utf-8")
+        )
+        try:
+            records = read_records(stream, file_format)
+            for record, reason in service.ingest(
+                records, chunk_size=options["chunk_size"], progress=progress
+            ):
+                self.stderr.write(f"Rejected {record!r}: {reason}")
+        except IngestionError as exc:
+            raise CommandError(exc) from exc
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {service.counts['books']} books into {library}."
+            )
+        )
+
+    def get_library(self, value):
+        lookup = {"pk": value} if value.isdigit() else {"name": value}
+        try:
+            return Library.objects.get(**lookup)
+        except Library.DoesNotExist as exc:
+            msg = f"No library {value!r}"
+            raise CommandError(msg) from exc
@@ -0,0 +1,42 @@
+# Generated by Django 5.1.11 on 2026-10-19 11:03
+
+import django.utils.timezone
+import model_utils.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0008_book_external_id'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogueTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', model_utils.fields.AutoCreatedField(default=django.utils.timezone.now, editable=False, verbose_name='created')),
+                ('modified', model_utils.fields.AutoLastModifiedField(default=django.utils.timezone.now, editable=False, verbose_name='modified')),
+                ('kind', models.CharField(choices=[('library', 'Library'), ('author', 'Author'), ('book', 'Book')], max_length=16)),
+                ('object_id', models.BigIntegerField()),
+            ],
+            options={
+                'verbose_name': 'Catalogue Tombstone',
+                'verbose_name_plural': 'Catalogue Tombstones',
+                'indexes': [models.Index(fields=['modified', 'id'], name='tombstone_changes_idx')],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='author',
+            index=models.Index(fields=['modified', 'id'], name='author_changes_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['modified', 'id'], name='book_changes_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='library',
+            index=models.Index(fields=['modified', 'id'], name='library_changes_idx'),
+        ),
+    ]
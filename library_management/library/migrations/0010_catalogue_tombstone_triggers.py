@@ -0,0 +1,47 @@
+# Generated by Django 5.1.11 on 2026-10-19 14:20
+
+from django.db import migrations
+
+TABLES = {
+    'library_library': 'library',
+    'library_author': 'author',
+    'library_book': 'book',
+}
+
+CREATE_FUNCTION = """
+CREATE FUNCTION library_record_tombstones() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO library_cataloguetombstone (created, modified, kind, object_id)
+    SELECT clock_timestamp(), clock_timestamp(), TG_ARGV[0], id FROM deleted;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+CREATE_TRIGGER = """
+CREATE TRIGGER {table}_tombstones
+AFTER DELETE ON {table}
+REFERENCING OLD TABLE AS deleted
+FOR EACH STATEMENT EXECUTE FUNCTION library_record_tombstones('{kind}');
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0009_cataloguetombstone_and_change_indexes'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            CREATE_FUNCTION,
+            reverse_sql='DROP FUNCTION library_record_tombstones();',
+        ),
+        *[
+            migrations.RunSQL(
+                CREATE_TRIGGER.format(table=table, kind=kind),
+                reverse_sql=f'DROP TRIGGER {table}_tombstones ON {table};',
+            )
+            for table, kind in TABLES.items()
+        ],
+    ]
@@ -23,6 +23,7 @@ class Library(TimeStampedModel):
     class Meta:
         verbose_name = "Library"
         verbose_name_plural = "Libraries"
+        indexes = [models.Index(fields=["modified", "id"], name="library_changes_idx")]
 
 
 class Author(TimeStampedModel):
@@ -34,6 +35,9 @@ class Author(TimeStampedModel):
     def __str__(self):
         return self.name
 
+    class Meta:
+        indexes = [models.Index(fields=["modified", "id"], name="author_changes_idx")]
+
 
 class Category(models.Model):
     """Model representing a Category in the system."""
@@ -61,10 +65,88 @@ class Book(TimeStampedModel):
         related_name="books",
     )
     library = models.ForeignKey(Library, on_delete=models.CASCADE, related_name="books")
+    # Id of the catalogue record the copy was imported from, e.g. MARC 001
+    external_id = models.CharField(max_length=64, null=True, blank=True)
 
     def __str__(self):
         return self.title
 
+    class Meta:
+        constraints = [
+            # Key the catalogue ingestion upserts on. A row is one copy, so
+            # a library may hold the same title many times.
+            UniqueConstraint(
+                fields=["library", "external_id"],
+                name="unique_book_external_id_per_library",
+            )
+        ]
+        indexes = [models.Index(fields=["modified", "id"], name="book_changes_idx")]
+
+
+class CatalogueTombstone(TimeStampedModel):
+    """
+    Marks a deleted book, author or library for the change feed.
+    Rows are written by statement-level triggers on the three tables (see
+    migration 0010). Without delete signals on those models, cascades only
+    load primary keys and delete in batches, and each DELETE statement adds
+    its tombstones in one insert.
+    """
+
+    class Kind(models.TextChoices):
+        LIBRARY = "library", "Library"
+        AUTHOR = "author", "Author"
+        BOOK = "book", "Book"
+
+    kind = models.CharField(max_length=16, choices=Kind.choices)
+    object_id = models.BigIntegerField()
+
+    def __str__(self):
+        return f"{self.kind} {self.object_id}"
+
+    class Meta:
+        verbose_name = "Catalogue Tombstone"
+        verbose_name_plural = "Catalogue Tombstones"
+        indexes = [
+            models.Index(fields=["modified", "id"], name="tombstone_changes_idx")
+        ]
+
+
+class CatalogueImport(TimeStampedModel):
+    """
+    A catalogue file uploaded through the API, loaded by the
+    ``ingest_catalogue`` task. The file is deleted once the import finishes.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = "pending", "Pending"
+        RUNNING = "running", "Running"
+        SUCCEEDED = "succeeded", "Succeeded"
+        FAILED = "failed", "Failed"
+
+    library = models.ForeignKey(
+        Library, on_delete=models.CASCADE, related_name="catalogue_imports"
+    )
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True
+    )
+    file = models.FileField(upload_to="catalogue-imports/", blank=True)
+    format = models.CharField(max_length=8)
+    status = models.CharField(
+        max_length=16, choices=Status.choices, default=Status.PENDING
+    )
+    # CatalogueIngestionService.counts, updated after every chunk
+    counts = models.JSONField(default=dict)
+    # The first rejected records with the reason
+    rejections = models.JSONField(default=list)
+    error = models.TextField(blank=True)
+
+    def __str__(self):
+        return f"{self.library} import {self.pk} ({self.status})"
+
+    class Meta:
+        verbose_name = "Catalogue Import"
+        verbose_name_plural = "Catalogue Imports"
+
 
 class BorrowTransaction(TimeStampedModel):
     user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
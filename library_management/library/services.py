@@ -1,18 +1,30 @@
+import io
 from datetime import date
 
-from asgiref.sync import async_to_sync
-from channels.layers import get_channel_layer
 from django.contrib.gis.db.models.functions import Distance
 from django.contrib.gis.geos import Point
-from django.db import transaction
+from django.db import router, transaction
 from django.db.models import Count, F, Prefetch, Q
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from rest_framework.serializers import ValidationError
 
+from library_management.core.routers import pin_to_primary
+from library_management.core.tracing import span
 from library_management.users.tasks import async_send_email
 
-from .models import Author, Book, BorrowedBook, BorrowTransaction, Library
+from . import dispatch
+from .broadcasts import BOOK_AVAILABLE
+from .ingestion import IngestionError, read_records
+from .models import (
+    Author,
+    Book,
+    BorrowedBook,
+    BorrowTransaction,
+    CatalogueImport,
+    Category,
+    Library,
+)
 
 
 class LibraryService:
@@ -75,6 +87,7 @@ class BookService:
         ).all()  # Replace with actual logic to fetch books
 
     @staticmethod
+    @span("library.borrow_a_book")
     @transaction.atomic
     def borrow_a_book(user, book_id, return_due):
         if not book_id:
@@ -96,13 +109,17 @@ class BookService:
         )
         borrowed_book.save()
 
-        async_send_email.delay(
+        async_send_email(
             subject="Book Borrowed",
             message=f"You have successfully borrowed the book with ID {book.id} and Name {book.title}.",  # noqa: E501
             receivers=[user.email],
+            idempotency_key=f"book-borrowed:{borrowed_book.pk}",
         )
+        # Let the borrower read their own write until replicas catch up
+        pin_to_primary()
 
     @staticmethod
+    @span("library.return_a_book")
     @transaction.atomic
     def return_a_book(user, book_id):
         if not book_id:
@@ -122,13 +139,180 @@ class BookService:
 
         borrowed_book.save()
 
-        # Notify the user about the book return
-        channel_layer = get_channel_layer()
-        async_to_sync(channel_layer.group_send)(
-            "book_availability",
-            {
-                "type": "book_available",
-                "message": f"The book '{borrowed_book.book.title}' was returned and is now available.",  # noqa: E501
-            },
+        # Notify the book's subscribers once the return is committed
+        book = borrowed_book.book
+        dispatch.defer(
+            BOOK_AVAILABLE,
+            book_id=book.id,
+            library_id=book.library_id,
+            author_id=book.author_id,
+            ts=int(borrowed_book.returned_at.timestamp() * 1000),
         )
+        pin_to_primary()
         return borrowed_book.penalty
+
+
+class CatalogueIngestionService:
+    """
+    Loads books into a library's catalogue in chunks.
+
+    Authors and categories are matched by exact name through name -> id maps
+    loaded once, and created in bulk when missing. A book row is one copy,
+    so records are upserted on their ``external_id`` (the record's id in the
+    source catalogue) within the library: ingesting the same file twice
+    updates those books instead of duplicating them. Records without an id
+    are always added as new copies.
+    """
+
+    fields = {"title": 200, "author": 100, "category": 100}
+    external_id_max_length = 64
+
+    def __init__(self, library):
+        self.library = library
+        self.authors = None
+        self.categories = None
+        self.counts = {"authors": 0, "categories": 0, "books": 0, "rejected": 0}
+
+    def ingest(self, records, chunk_size=5000, progress=None):
+        """
+        Ingest ``records``, committing every ``chunk_size`` books.
+        Args:
+            progress (callable, optional): Called with ``counts`` after every
+                chunk.
+        Yields:
+            tuple[dict, str]: Rejected records with the reason.
+        """
+        chunk = []
+        for record in records:
+            error = self.validate(record)
+            if error:
+                self.counts["rejected"] += 1
+                yield record, error
+                continue
+            chunk.append(record)
+            if len(chunk) >= chunk_size:
+                self.ingest_chunk(chunk)
+                chunk = []
+                if progress:
+                    progress(self.counts)
+        if chunk:
+            self.ingest_chunk(chunk)
+            if progress:
+                progress(self.counts)
+
+    @classmethod
+    def run_import(cls, catalogue_import, max_rejections=100):
+        """
+        Load the file of a :class:`CatalogueImport`, recording progress,
+        the first ``max_rejections`` rejections and the outcome on it.
+        """
+        service = cls(catalogue_import.library)
+        catalogue_import.status = CatalogueImport.Status.RUNNING
+        catalogue_import.save(update_fields=["status", "modified"])
+
+        def progress(counts):
+            catalogue_import.counts = counts
+            catalogue_import.save(update_fields=["counts", "modified"])
+
+        try:
+            with catalogue_import.file.open("rb") as upload:
+                stream = io.TextIOWrapper(upload, encoding="utf-8", newline="")
+                records = read_records(stream, catalogue_import.format)
+                for record, reason in service.ingest(records, progress=progress):
+                    if len(catalogue_import.rejections) < max_rejections:
+                        catalogue_import.rejections.append(
+                            {"record": record, "reason": reason}
+                        )
+        except (IngestionError, UnicodeDecodeError) as exc:
+            catalogue_import.status = CatalogueImport.Status.FAILED
+            catalogue_import.error = str(exc)
+        except Exception:
+            catalogue_import.status = CatalogueImport.Status.FAILED
+            catalogue_import.error = "Unexpected error, see the worker logs."
+            catalogue_import.counts = service.counts
+            catalogue_import.save()
+            raise
+        else:
+            catalogue_import.status = CatalogueImport.Status.SUCCEEDED
+        catalogue_import.counts = service.counts
+        catalogue_import.file.delete(save=False)
+        catalogue_import.save()
+        return catalogue_import
+
+    def validate(self, record):
+        for field, max_length in self.fields.items():
+            value = record.get(field)
+            if not isinstance(value, str) or not value.strip():
+                return f"missing {field}"
+            if len(value.strip()) > max_length:
+                return f"{field} longer than {max_length} characters"
+        external_id = record.get("external_id")
+        if external_id is not None and not isinstance(external_id, str | int):
+            return "external_id must be a string"
+        if len(str(external_id or "").strip()) > self.external_id_max_length:
+            return f"external_id longer than {self.external_id_max_length} characters"
+        return None
+
+    def ingest_chunk(self, records):
+        try:
+            self._ingest_chunk(records)
+        except Exception:
+            # Names created by the rolled back chunk are gone again.
+            self.authors = self.categories = None
+            raise
+
+    @transaction.atomic
+    def _ingest_chunk(self, records):
+        if self.authors is None:
+            self.authors = self._load_names(Author)
+            self.categories = self._load_names(Category)
+        self.counts["authors"] += self._create_missing(
+            Author, self.authors, {record["author"].strip() for record in records}
+        )
+        self.counts["categories"] += self._create_missing(
+            Category,
+            self.categories,
+            {record["category"].strip() for record in records},
+        )
+
+        # Later records win over earlier ones with the same external id.
+        books, copies = {}, []
+        for record in records:
+            book = Book(
+                library=self.library,
+                author_id=self.authors[record["author"].strip()],
+                category_id=self.categories[record["category"].strip()],
+                title=record["title"].strip(),
+                description=(record.get("description") or "").strip(),
+                external_id=str(record.get("external_id") or "").strip() or None,
+            )
+            if book.external_id is None:
+                copies.append(book)
+            else:
+                books[book.external_id] = book
+        Book.objects.bulk_create(
+            books.values(),
+            update_conflicts=True,
+            unique_fields=["library", "external_id"],
+            update_fields=["title", "author", "category", "description", "modified"],
+        )
+        Book.objects.bulk_create(copies)
+        self.counts["books"] += len(books) + len(copies)
+
+    @staticmethod
+    def _load_names(model):
+        # Read from the primary: a lagging replica would miss new names.
+        rows = (
+            model.objects.using(router.db_for_write(model))
+            .order_by("-id")
+            .values_list("name", "id")
+        )
+        # Duplicate names resolve to the oldest row.
+        return dict(rows.iterator(chunk_size=10_000))
+
+    @staticmethod
+    def _create_missing(model, ids, names):
+        missing = [model(name=name) for name in sorted(names - ids.keys())]
+        for obj in model.objects.bulk_create(missing):
+            ids[obj.name] = obj.id
+        return len(missing)
@@ -0,0 +1,118 @@
+"""
+Bounded Redis stream of availability events.
+
+Every broadcast event is also appended to a capped Redis stream, and its
+stream id becomes the event's ``seq``. A reconnecting client sends the last
+``seq`` it saw and gets back the events it missed, or a snapshot marker when
+the stream no longer reaches that far back. Both sides give up on Redis
+after ``BOOK_AVAILABILITY_STREAM_TIMEOUT`` seconds: a slow Redis delays a
+broadcast or a resume by that much at most, and the event goes out without
+a ``seq`` or the client gets a snapshot.
+"""
+
+import asyncio
+import re
+import weakref
+
+import msgpack
+import redis
+import redis.asyncio as aioredis
+from django.conf import settings
+
+STREAM_ID_PATTERN = re.compile(r"^(\d+)-(\d+)$")
+
+
+def parse_stream_id(value):
+    """Turn a ``<ms>-<seq>`` stream id into a comparable tuple, or ``None``."""
+    match = STREAM_ID_PATTERN.match(str(value))
+    if not match:
+        return None
+    return int(match.group(1)), int(match.group(2))
+
+
+class AvailabilityStream:
+    key = "book_availability:events"
+
+    def __init__(self):
+        self._client = None
+        self._async_clients = weakref.WeakKeyDictionary()
+
+    @property
+    def enabled(self):
+        return bool(settings.BOOK_AVAILABILITY_STREAM_URL)
+
+    def append(self, events):
+        """Append ``events`` to the stream and set their ``seq`` in place."""
+        if not self.enabled or not events:
+            return
+        if self._client is None:
+            self._client = redis.Redis.from_url(
+                settings.BOOK_AVAILABILITY_STREAM_URL,
+                socket_timeout=settings.BOOK_AVAILABILITY_STREAM_TIMEOUT,
+                socket_connect_timeout=settings.BOOK_AVAILABILITY_STREAM_TIMEOUT,
+            )
+        pipeline = self._client.pipeline(transaction=False)
+        for event in events:
+            pipeline.xadd(
+                self.key,
+                {"event": msgpack.packb(event)},
+                maxlen=settings.BOOK_AVAILABILITY_STREAM_MAXLEN,
+                approximate=True,
+            )
+        for event, seq in zip(events, pipeline.execute(), strict=True):
+            event["seq"] = seq.decode()
+
+    async def since(self, cursor):
+        """
+        Get the events appended after ``cursor``.
+        Returns:
+            tuple: ``(events, latest_seq)``, where ``events`` is ``None`` when
+            the client has to reload a snapshot: the cursor is missing or
+            invalid, older than the retained stream or the stream is empty,
+            or too far behind.
+        """
+        if not self.enabled:
+            return None, None
+        client = self._get_async_client()
+        last = await client.xrevrange(self.key, count=1)
+        latest = last[0][0].decode() if last else None
+        start = parse_stream_id(cursor)
+        if start is None:
+            return None, latest
+        if latest is None:
+            # The stream was emptied, e.g. by a Redis restart, so whatever
+            # followed the cursor is gone.
+            return None, latest
+        if start >= parse_stream_id(latest):
+            return [], latest
+
+        first = await client.xrange(self.key, count=1)
+        if parse_stream_id(first[0][0].decode()) > start:
+            # Entries between the cursor and the oldest retained one may have
+            # been trimmed.
+            return None, latest
+
+        max_delta = settings.BOOK_AVAILABILITY_STREAM_MAX_DELTA
+        entries = await client.xrange(self.key, min=f"({cursor}", count=max_delta + 1)
+        if len(entries) > max_delta:
+            return None, latest
+        events = []
+        for seq, fields in entries:
+            event = msgpack.unpackb(fields[b"event"])
+            event["seq"] = seq.decode()
+            events.append(event)
+        return events, latest
+
+    def _get_async_client(self):
+        # asyncio clients are bound to the event loop they were created in.
+        loop = asyncio.get_running_loop()
+        if loop not in self._async_clients:
+            self._async_clients[loop] = aioredis.Redis.from_url(
+                settings.BOOK_AVAILABILITY_STREAM_URL,
+                socket_timeout=settings.BOOK_AVAILABILITY_STREAM_TIMEOUT,
+                socket_connect_timeout=settings.BOOK_AVAILABILITY_STREAM_TIMEOUT,
+            )
+        return self._async_clients[loop]
+
+
+availability_stream = AvailabilityStream()
@@ -1,12 +1,16 @@
-import logging
 from datetime import timedelta
 
 from celery import shared_task
 from django.conf import settings
-from django.core.mail import send_mail
 from django.utils import timezone
 
-from library_management.library.models import BorrowedBook
+from library_management.library.models import (
+    BorrowedBook,
+    CatalogueImport,
+    CatalogueTombstone,
+)
+from library_management.library.services import CatalogueIngestionService
+from library_management.users.tasks import async_send_email
 
 
 @shared_task
@@ -34,12 +38,27 @@ def send_due_soon_reminders():
             "Library Management Team"
         )
 
-        try:
-            send_mail(
-                subject=subject,
-                message=message,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[user.email],
-            )
-        except Exception:
-            logging.exception("Failed to send email")
+        async_send_email(
+            subject=subject,
+            message=message,
+            receivers=[user.email],
+            idempotency_key=f"due-soon-reminder:{item.pk}:{now.date()}",
+        )
+
+
+@shared_task
+def purge_catalogue_tombstones():
+    """Delete tombstones older than the change feed keeps cursors valid."""
+    cutoff = timezone.now() - timedelta(days=settings.CHANGE_FEED_RETENTION_DAYS)
+    deleted, _ = CatalogueTombstone.objects.filter(modified__lt=cutoff).delete()
+    return deleted
+
+
+@shared_task
+def ingest_catalogue(catalogue_import_id):
+    """Load an uploaded catalogue file, see ``CatalogueImport``."""
+    catalogue_import = CatalogueImport.objects.select_related("library").get(
+        pk=catalogue_import_id
+    )
+    CatalogueIngestionService.run_import(catalogue_import)
+    return catalogue_import.counts
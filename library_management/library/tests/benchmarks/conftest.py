@@ -0,0 +1,210 @@
+"""
+Query-count and latency regression benchmarks for the library API.
+
+The benchmarks are skipped unless a catalogue size is given. They seed that
+catalogue once per session (see ``factories.seed_catalogue``), then time
+each service method and endpoint over ``--bench-rounds`` rounds, after a
+warm-up round and a round that counts the SQL queries::
+
+    pytest library_management/library/tests/benchmarks --bench-scale=10k
+
+Results are compared with ``baselines.json``, keyed by scale and by
+``<module>::<test>``. A benchmark fails when it runs more queries than its
+baseline; benchmarks without a baseline only report their numbers. Query
+counts don't depend on the machine, so the baselines are committed and CI
+fails on a query regression. After changing the queries on purpose, record
+them again from a checkout mounted into the container, as ``just benchmark``
+does, and commit the file::
+
+    just benchmark --bench-scale=10k --bench-update
+
+Latencies are only compared with ``--bench-latency``: a benchmark then also
+fails when its median is more than ``--bench-threshold`` (25% by default)
+above the recorded one. They depend on the machine, so record them with
+``--bench-update --bench-latency`` on the runner that compares them.
+"""
+
+import json
+import statistics
+import time
+from contextlib import ExitStack, nullcontext
+from pathlib import Path
+
+import pytest
+from django.db import connections, transaction
+from django.test.utils import CaptureQueriesContext
+
+from library_management.core.api.throttling import TokenBucketThrottle
+from library_management.library.tests.factories import SCALES, seed_catalogue
+
+BASELINES = Path(__file__).with_name("baselines.json")
+results_key = pytest.StashKey[dict]()
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("bench", "library API benchmarks")
+    group.addoption(
+        "--bench-scale",
+        choices=sorted(SCALES),
+        help="Catalogue size to seed and benchmark against.",
+    )
+    group.addoption("--bench-rounds", type=int, default=5, help="Timed rounds.")
+    group.addoption(
+        "--bench-threshold",
+        type=float,
+        default=0.25,
+        help="Allowed median latency increase over the baseline, as a fraction.",
+    )
+    group.addoption(
+        "--bench-latency",
+        action="store_true",
+        help="Compare median latencies with the baselines too, not only queries.",
+    )
+    group.addoption(
+        "--bench-update",
+        action="store_true",
+        help="Record the results as the new baselines instead of comparing.",
+    )
+
+
+def pytest_configure(config):
+    config.stash[results_key] = {}
+
+
+class Bench:
+    def __init__(self, config, name, baseline):
+        self.name = name
+        self.baseline = baseline
+        self.rounds = config.getoption("bench_rounds")
+        self.threshold = config.getoption("bench_threshold")
+        self.latency = config.getoption("bench_latency")
+        self.update = config.getoption("bench_update")
+        self.results = config.stash[results_key]
+
+    def __call__(self, func, *args, setup=None, rollback=False, **kwargs):
+        """
+        Measure ``func(*args, **kwargs)``. ``setup`` runs untimed before every
+        round; with ``rollback`` each round, setup included, runs in a
+        savepoint that is rolled back, so writes can be repeated.
+        """
+        call = (func, args, kwargs, setup, rollback)
+        self._round(*call)
+        queries = self._round(*call, count_queries=True)
+        timings = [self._round(*call) for _ in range(self.rounds)]
+        result = {
+            "median_ms": round(statistics.median(timings), 3),
+            "queries": queries,
+        }
+        self.results[self.name] = {**result, "baseline": self.baseline}
+        if not self.update and self.baseline:
+            self.check(result)
+        return result
+
+    def _round(self, func, args, kwargs, setup, rollback, count_queries=False):
+        """Milliseconds ``func`` took, or with ``count_queries`` its queries."""
+        with transaction.atomic() if rollback else nullcontext():
+            if setup is not None:
+                setup()
+            with ExitStack() as stack:
+                captured = [
+                    stack.enter_context(CaptureQueriesContext(connection))
+                    for connection in (connections.all() if count_queries else ())
+                ]
+                started = time.perf_counter()
+                func(*args, **kwargs)
+                elapsed = (time.perf_counter() - started) * 1000
+            if rollback:
+                transaction.set_rollback(True)
+        if count_queries:
+            return sum(len(context) for context in captured)
+        return elapsed
+
+    def check(self, result):
+        baseline = self.baseline
+        assert result["queries"] <= baseline["queries"], (
+            f"{self.name} ran {result['queries']} queries, "
+            f"the baseline is {baseline['queries']}"
+        )
+        if not self.latency or "median_ms" not in baseline:
+            return
+        limit = baseline["median_ms"] * (1 + self.threshold)
+        assert result["median_ms"] <= limit, (
+            f"{self.name} took {result['median_ms']:.2f}ms, "
+            f"over {limit:.2f}ms ({baseline['median_ms']:.2f}ms "
+            f"+ {self.threshold:.0%})"
+        )
+
+
+@pytest.fixture(scope="session")
+def bench_scale(request):
+    scale = request.config.getoption("bench_scale", default=None)
+    if scale is None:
+        pytest.skip("Benchmarks only run with --bench-scale")
+    return scale
+
+
+@pytest.fixture(scope="session")
+def seeded_catalogue(bench_scale, django_db_setup, django_db_blocker):
+    with django_db_blocker.unblock():
+        libraries = seed_catalogue(SCALES[bench_scale])
+    yield libraries
+    with django_db_blocker.unblock(), connections["default"].cursor() as cursor:
+        # Committed rows outlive the test transactions; drop them for --reuse-db.
+        cursor.execute(
+            "TRUNCATE library_borrowedbook, library_borrowtransaction, "
+            "library_book, library_author, library_category, library_library, "
+            "users_user RESTART IDENTITY CASCADE"
+        )
+
+
+@pytest.fixture
+def bench(request, bench_scale, settings, monkeypatch):
+    # Keep the replica lag check, a query of its own, out of the counted round.
+    settings.REPLICA_LAG_CHECK_INTERVAL = 3600
+    # Every round would count against the rate limits otherwise. Views bind
+    # their throttle classes when they are defined, so patch the throttle
+    # itself rather than DEFAULT_THROTTLE_CLASSES.
+    monkeypatch.setattr(TokenBucketThrottle, "allow_request", lambda *args: True)
+    baselines = json.loads(BASELINES.read_text())
+    # Modules share test names, e.g. test_get_authors_by_category.
+    name = f"{request.node.module.__name__.rpartition('.')[2]}::{request.node.name}"
+    return Bench(request.config, name, baselines.get(bench_scale, {}).get(name))
+
+
+def pytest_sessionfinish(session, exitstatus):
+    config = session.config
+    results = config.stash.get(results_key, {})
+    scale = config.getoption("bench_scale", default=None)
+    if not results or not config.getoption("bench_update", default=False):
+        return
+    baselines = json.loads(BASELINES.read_text())
+    recorded = baselines.setdefault(scale, {})
+    latency = config.getoption("bench_latency")
+    for name, result in results.items():
+        # Keep latencies recorded elsewhere unless these are to replace them.
+        recorded[name] = {**recorded.get(name, {}), "queries": result["queries"]}
+        if latency:
+            recorded[name]["median_ms"] = result["median_ms"]
+    baselines[scale] = dict(sorted(recorded.items()))
+    BASELINES.write_text(json.dumps(baselines, indent=2) + "\n")
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    results = config.stash.get(results_key, {})
+    if not results:
+        return
+    terminalreporter.section(f"benchmarks ({config.getoption('bench_scale')} books)")
+    for name, result in sorted(results.items()):
+        baseline = result["baseline"]
+        if not baseline:
+            compared = "no baseline"
+        elif "median_ms" in baseline:
+            compared = (
+                f"baseline {baseline['median_ms']:>10.2f}ms {baseline['queries']:>4}q"
+            )
+        else:
+            compared = f"baseline {'':>12} {baseline['queries']:>4}q"
+        terminalreporter.write_line(
+            f"{name:<72} {result['median_ms']:>10.2f}ms {result['queries']:>4}q"
+            f"   {compared}"
+        )
@@ -0,0 +1,91 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from library_management.library.models import Book, Category
+from library_management.library.services import BookService
+from library_management.library.tests.factories import CENTRE
+
+pytestmark = pytest.mark.django_db(databases="__all__")
+
+
+@pytest.fixture
+def client(user):
+    token = RefreshToken.for_user(user).access_token
+    return APIClient(headers={"Authorization": f"Bearer {token}"})
+
+
+@pytest.fixture
+def available_book(seeded_catalogue):
+    return (
+        Book.objects.exclude(borrowedbook__returned_at__isnull=True)
+        .order_by("id")
+        .first()
+    )
+
+
+@pytest.fixture
+def return_due():
+    return (timezone.now() + timedelta(days=14)).date().isoformat()
+
+
+def get(client, path):
+    response = client.get(path)
+    assert response.status_code == 200  # noqa: PLR2004
+    if response.streaming:
+        b"".join(response.streaming_content)
+
+
+def post(client, path, data=None):
+    response = client.post(path, data, format="json")
+    assert response.status_code == 200  # noqa: PLR2004
+
+
+@pytest.mark.parametrize(
+    "path",
+    [
+        f"/api/libraries/?longitude={CENTRE[0]}&latitude={CENTRE[1]}",
+        "/api/authors/",
+        "/api/books/",
+        "/api/books/export.ndjson",
+        "/api/books/export.csv",
+    ],
+)
+def test_get(bench, client, seeded_catalogue, path):
+    bench(get, client, path)
+
+
+def test_get_authors_by_category(bench, client, seeded_catalogue):
+    category = Category.objects.order_by("id").first()
+
+    bench(get, client, f"/api/authors/?book_category={category.name}")
+
+
+def test_get_changes(bench, client, seeded_catalogue, settings):
+    # Serve the freshly seeded rows instead of waiting for them to settle.
+    settings.CHANGE_FEED_SETTLE_SECONDS = 0
+
+    bench(get, client, "/api/changes/?limit=500")
+
+
+def test_borrow(bench, client, available_book, return_due):
+    bench(
+        post,
+        client,
+        f"/api/borrow/{available_book.id}",
+        {"return_due": return_due},
+        rollback=True,
+    )
+
+
+def test_return(bench, client, user, available_book, return_due):
+    bench(
+        post,
+        client,
+        f"/api/return/{available_book.id}",
+        setup=lambda: BookService.borrow_a_book(user, available_book.id, return_due),
+        rollback=True,
+    )
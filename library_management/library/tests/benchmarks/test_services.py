@@ -0,0 +1,62 @@
+from datetime import timedelta
+
+import pytest
+from django.db.models import Q
+from django.utils import timezone
+
+from library_management.library.models import Book, Category
+from library_management.library.services import (
+    AuthorService,
+    BookService,
+    LibraryService,
+)
+from library_management.library.tests.factories import CENTRE
+
+pytestmark = pytest.mark.django_db(databases="__all__")
+
+
+@pytest.fixture
+def available_book(seeded_catalogue):
+    return (
+        Book.objects.exclude(borrowedbook__returned_at__isnull=True)
+        .order_by("id")
+        .first()
+    )
+
+
+@pytest.fixture
+def return_due():
+    return (timezone.now() + timedelta(days=14)).date().isoformat()
+
+
+def test_get_nearby_libraries(bench, seeded_catalogue):
+    bench(lambda: list(LibraryService.get_nearby_libraries(*CENTRE)))
+
+
+def test_get_authors(bench, seeded_catalogue):
+    bench(lambda: list(AuthorService.get_authors()))
+
+
+def test_get_authors_by_category(bench, seeded_catalogue):
+    category = Category.objects.order_by("id").first()
+    filters = Q(books__category__name__iexact=category.name)
+
+    bench(lambda: list(AuthorService.get_authors(filters=filters)))
+
+
+def test_get_books(bench, seeded_catalogue):
+    bench(lambda: list(BookService.get_books()))
+
+
+def test_borrow_a_book(bench, user, available_book, return_due):
+    bench(BookService.borrow_a_book, user, available_book.id, return_due, rollback=True)
+
+
+def test_return_a_book(bench, user, available_book, return_due):
+    bench(
+        BookService.return_a_book,
+        user,
+        available_book.id,
+        setup=lambda: BookService.borrow_a_book(user, available_book.id, return_due),
+        rollback=True,
+    )
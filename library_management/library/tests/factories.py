@@ -0,0 +1,135 @@
+import random
+from datetime import timedelta
+
+from django.contrib.gis.geos import Point
+from django.utils import timezone
+from factory import Faker, LazyFunction, Sequence, SubFactory
+from factory.django import DjangoModelFactory
+
+from library_management.library.models import (
+    Author,
+    Book,
+    BorrowedBook,
+    BorrowTransaction,
+    Category,
+    Library,
+)
+from library_management.users.models import User
+from library_management.users.tests.factories import UserFactory
+
+# Catalogue sizes the benchmarks seed, by name
+SCALES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+# Longitude and latitude the seeded libraries are scattered around
+CENTRE = (31.2357, 30.0444)
+
+
+def near_centre(rng=random):
+    # Within about 25km, so some libraries fall outside the 20km search.
+    return Point(
+        CENTRE[0] + rng.uniform(-0.25, 0.25),
+        CENTRE[1] + rng.uniform(-0.25, 0.25),
+        srid=4326,
+    )
+
+
+class LibraryFactory(DjangoModelFactory[Library]):
+    name = Sequence(lambda n: f"Library {n}")
+    address = Faker("street_address")
+    location = LazyFunction(near_centre)
+
+    class Meta:
+        model = Library
+        django_get_or_create = ["name"]
+
+
+class AuthorFactory(DjangoModelFactory[Author]):
+    name = Faker("name")
+    bio = Faker("paragraph")
+
+    class Meta:
+        model = Author
+
+
+class CategoryFactory(DjangoModelFactory[Category]):
+    name = Sequence(lambda n: f"Category {n}")
+    description = Faker("sentence")
+
+    class Meta:
+        model = Category
+
+
+class BookFactory(DjangoModelFactory[Book]):
+    title = Faker("sentence", nb_words=4)
+    description = Faker("paragraph")
+    author = SubFactory(AuthorFactory)
+    category = SubFactory(CategoryFactory)
+    library = SubFactory(LibraryFactory)
+
+    class Meta:
+        model = Book
+
+
+class BorrowTransactionFactory(DjangoModelFactory[BorrowTransaction]):
+    user = SubFactory(UserFactory)
+
+    class Meta:
+        model = BorrowTransaction
+
+
+class BorrowedBookFactory(DjangoModelFactory[BorrowedBook]):
+    transaction = SubFactory(BorrowTransactionFactory)
+    book = SubFactory(BookFactory)
+    return_due = LazyFunction(lambda: timezone.now() + timedelta(days=14))
+
+    class Meta:
+        model = BorrowedBook
+
+
+def seed_catalogue(books, batch_size=10_000, seed=0):
+    """
+    Bulk-create a catalogue of ``books`` books with proportionate libraries
+    (1 per 1,000 books), authors (1 per 20), categories (up to 200) and loans
+    (1 per 100 books, each by its own reader). Rows are built by the factories
+    above but inserted in batches of ``batch_size``, without ``full_clean``.
+    Returns the created libraries.
+    """
+    rng = random.Random(seed)
+    libraries = Library.objects.bulk_create(
+        LibraryFactory.build(location=near_centre(rng))
+        for _ in range(max(1, books // 1_000))
+    )
+    authors = Author.objects.bulk_create(
+        AuthorFactory.build_batch(max(1, books // 20)), batch_size=batch_size
+    )
+    categories = Category.objects.bulk_create(
+        CategoryFactory.build_batch(min(200, max(1, books // 50)))
+    )
+
+    for start in range(0, books, batch_size):
+        Book.objects.bulk_create(
+            BookFactory.build(
+                title=f"Book {n}",
+                author=rng.choice(authors),
+                category=rng.choice(categories),
+                library=rng.choice(libraries),
+            )
+            for n in range(start, min(books, start + batch_size))
+        )
+
+    loans = books // 100
+    readers = User.objects.bulk_create(
+        UserFactory.build(email=f"reader{n}@example.com") for n in range(loans)
+    )
+    transactions = BorrowTransaction.objects.bulk_create(
+        BorrowTransaction(user=reader) for reader in readers
+    )
+    book_ids = list(Book.objects.values_list("id", flat=True).order_by("?")[:loans])
+    due = timezone.now() + timedelta(days=14)
+    BorrowedBook.objects.bulk_create(
+        (
+            BorrowedBook(transaction=transaction, book_id=book_id, return_due=due)
+            for transaction, book_id in zip(transactions, book_ids, strict=True)
+        ),
+        batch_size=batch_size,
+    )
+    return libraries
@@ -0,0 +1,98 @@
+import json
+from unittest import mock
+
+import msgpack
+
+from library_management.core.tracing import bind_request_id
+from library_management.library.broadcasts import (
+    BroadcastQueue,
+    broadcast_book_availability,
+    build_frame,
+    encode_event,
+)
+
+
+def make_payload(book_id, library_id, author_id):
+    return {
+        "book_id": book_id,
+        "library_id": library_id,
+        "author_id": author_id,
+        "ts": 1_700_000_000_000,
+    }
+
+
+def make_event(book_id, library_id, author_id=1):
+    return {
+        "book_id": book_id,
+        "library_id": library_id,
+        "author_id": author_id,
+        "available_count": 3,
+        "ts": 1_700_000_000_000,
+    }
+
+
+def test_handler_only_queues_events():
+    with (
+        mock.patch("library_management.library.broadcasts.broadcaster.put") as put,
+        mock.patch(
+            "library_management.library.broadcasts.get_channel_layer"
+        ) as get_channel_layer,
+        mock.patch(
+            "library_management.library.broadcasts.available_counts",
+            return_value={1: 3},
+        ) as available_counts,
+    ):
+        broadcast_book_availability([make_payload(1, 1, 1), make_payload(2, 1, 3)])
+
+    available_counts.assert_called_once_with({1})
+
+    first, second = make_event(1, 1), make_event(2, 1, author_id=3)
+    put.assert_has_calls(
+        [
+            mock.call("book.1", [first]),
+            mock.call("library.1", [first, second]),
+            mock.call("author.1", [first]),
+            mock.call("book.2", [second]),
+            mock.call("author.3", [second]),
+        ],
+        any_order=True,
+    )
+    assert put.call_count == 5  # noqa: PLR2004
+    get_channel_layer.assert_not_called()
+
+
+def test_build_frame_from_encoded_events():
+    first, second = encode_event(make_event(1, 1)), encode_event(make_event(2, 1))
+    expected = {"events": [make_event(1, 1), make_event(2, 1)]}
+
+    text = build_frame([first["text"], second["text"]])
+    binary = build_frame([first["bytes"], second["bytes"]], binary=True)
+
+    assert json.loads(text) == expected
+    assert msgpack.unpackb(binary) == expected
+
+
+def test_flush_sends_one_message_per_group():
+    channel_layer = mock.Mock(group_send=mock.AsyncMock())
+    broadcaster = BroadcastQueue()
+
+    with (
+        mock.patch.object(broadcaster, "_run"),
+        mock.patch(
+            "library_management.library.broadcasts.get_channel_layer",
+            return_value=channel_layer,
+        ),
+    ):
+        with bind_request_id("borrow-1"):
+            broadcaster.put("book.1", [make_event(1, 1)])
+        broadcaster.put("book.1", [make_event(1, 2)])
+        broadcaster.flush()
+
+    channel_layer.group_send.assert_awaited_once_with(
+        "book.1",
+        {
+            "type": "book_available",
+            "events": [encode_event(make_event(1, 1)), encode_event(make_event(1, 2))],
+            "request_ids": ["borrow-1"],
+        },
+    )
@@ -0,0 +1,87 @@
+from library_management.library.checks import (
+    check_channel_layer_isolation,
+    check_channel_layers,
+)
+
+PUBSUB = "channels_redis.pubsub.RedisPubSubChannelLayer"
+CORE = "channels_redis.core.RedisChannelLayer"
+
+
+def error_ids(messages):
+    return [message.id for message in messages]
+
+
+def test_valid_sharded_topology_passes(settings):
+    hosts = ["redis://channels-1:6379/0", "redis://channels-2:6379/0"]
+    settings.CHANNEL_LAYERS = {
+        "default": {"BACKEND": CORE, "CONFIG": {"hosts": hosts, "capacity": 1500}},
+        "availability": {"BACKEND": PUBSUB, "CONFIG": {"hosts": hosts}},
+    }
+
+    assert check_channel_layers(None) == []
+
+
+def test_missing_availability_layer(settings):
+    settings.CHANNEL_LAYERS = {
+        "default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}
+    }
+
+    assert error_ids(check_channel_layers(None)) == ["library.E001"]
+
+
+def test_invalid_topology_is_reported(settings):
+    settings.CHANNEL_LAYERS = {
+        "default": {
+            "BACKEND": CORE,
+            "CONFIG": {"hosts": "redis://redis:6379/0", "expiry": 0},
+        },
+        "availability": {
+            "BACKEND": PUBSUB,
+            "CONFIG": {"hosts": ["http://redis:6379"], "capacity": 100},
+        },
+    }
+
+    assert sorted(error_ids(check_channel_layers(None))) == [
+        "library.E003",
+        "library.E004",
+        "library.E005",
+        "library.W001",
+    ]
+
+
+def test_group_expiry_that_is_not_an_int_is_an_error(settings):
+    settings.CHANNEL_LAYERS = {
+        "default": {
+            "BACKEND": CORE,
+            "CONFIG": {"hosts": ["redis://redis:6379/0"], "group_expiry": "600"},
+        },
+        "availability": {"BACKEND": PUBSUB, "CONFIG": {"hosts": ["redis://redis"]}},
+    }
+
+    assert error_ids(check_channel_layers(None)) == ["library.E005"]
+
+
+def test_unknown_backend(settings):
+    settings.CHANNEL_LAYERS = {
+        "availability": {"BACKEND": "channels_redis.nope.Layer"},
+    }
+
+    assert error_ids(check_channel_layers(None)) == ["library.E002"]
+
+
+def test_sharing_redis_with_celery_is_a_deploy_warning(settings):
+    settings.CELERY_BROKER_URL = "redis://redis:6379/0"
+    settings.CACHES = {}
+    settings.CHANNEL_LAYERS = {
+        "availability": {
+            "BACKEND": PUBSUB,
+            "CONFIG": {"hosts": ["redis://redis:6379/3"]},
+        },
+    }
+
+    assert error_ids(check_channel_layer_isolation(None)) == ["library.W003"]
+
+    settings.CHANNEL_LAYERS["availability"]["CONFIG"]["hosts"] = [
+        "redis://channels:6379/0"
+    ]
+    assert check_channel_layer_isolation(None) == []
@@ -0,0 +1,267 @@
+import asyncio
+from unittest import mock
+
+import msgpack
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from channels.testing import WebsocketCommunicator
+
+from library_management.library.broadcasts import (
+    AVAILABILITY_CHANNEL_LAYER,
+    encode_event,
+)
+from library_management.library.consumers import BookAvailabilityConsumer
+from library_management.library.streams import AvailabilityStream
+
+EVENT = {
+    "book_id": 1,
+    "library_id": 1,
+    "author_id": 1,
+    "available_count": 2,
+    "ts": 1,
+    "seq": "1-0",
+}
+
+
+def availability_message(*events):
+    return {
+        "type": "book_available",
+        "events": [encode_event(event) for event in events],
+    }
+
+
+def make_consumer():
+    consumer = BookAvailabilityConsumer()
+    consumer.use_msgpack = False
+    consumer.pending = {}
+    consumer.pending_ready = asyncio.Event()
+    consumer.resync_required = False
+    consumer.resyncs = 0
+    consumer.closing = False
+    return consumer
+
+
+def test_subscribed_client_only_receives_its_topics():
+    async_to_sync(_subscribed_client_only_receives_its_topics)()
+
+
+def test_msgpack_subprotocol():
+    async_to_sync(_msgpack_subprotocol)()
+
+
+def test_invalid_topic_is_rejected():
+    async_to_sync(_invalid_topic_is_rejected)()
+
+
+def test_client_ping_gets_pong():
+    async_to_sync(_client_ping_gets_pong)()
+
+
+def test_idle_client_is_closed(settings):
+    settings.WEBSOCKET_HEARTBEAT_INTERVAL = 0.05
+    settings.WEBSOCKET_IDLE_TIMEOUT = 0.12
+    async_to_sync(_idle_client_is_closed)()
+
+
+def test_resume_sends_delta_for_subscribed_topics():
+    async_to_sync(_resume_sends_delta_for_subscribed_topics)()
+
+
+def test_resume_without_stream_sends_snapshot():
+    async_to_sync(_resume_without_stream_sends_snapshot)()
+
+
+def test_resume_from_an_emptied_stream_requires_a_snapshot(settings):
+    settings.BOOK_AVAILABILITY_STREAM_URL = "redis://redis:6379/0"
+    stream = AvailabilityStream()
+    client = mock.Mock(xrevrange=mock.AsyncMock(return_value=[]))
+
+    with mock.patch.object(stream, "_get_async_client", return_value=client):
+        assert async_to_sync(stream.since)("5-0") == (None, None)
+
+
+def test_events_for_the_same_book_are_coalesced():
+    async_to_sync(_events_for_the_same_book_are_coalesced)()
+
+
+def test_overflowing_queue_is_replaced_by_resync(settings):
+    settings.WEBSOCKET_MAX_QUEUE_DEPTH = 1
+    async_to_sync(_overflowing_queue_is_replaced_by_resync)()
+
+
+def test_resyncs_are_counted_until_the_client_catches_up(settings):
+    settings.WEBSOCKET_MAX_QUEUE_DEPTH = 1
+    settings.WEBSOCKET_MAX_RESYNCS = 1
+    async_to_sync(_resyncs_are_counted_until_the_client_catches_up)()
+
+
+async def _subscribed_client_only_receives_its_topics():
+    communicator = WebsocketCommunicator(
+        BookAvailabilityConsumer.as_asgi(), "/ws/book-availability/"
+    )
+    connected, _ = await communicator.connect()
+    assert connected
+
+    await communicator.send_json_to({"action": "subscribe", "topics": ["book:1"]})
+    assert await communicator.receive_json_from() == {"subscriptions": ["book:1"]}
+
+    channel_layer = get_channel_layer(AVAILABILITY_CHANNEL_LAYER)
+    await channel_layer.group_send(
+        "book.2", availability_message({**EVENT, "book_id": 2})
+    )
+    await channel_layer.group_send("book.1", availability_message(EVENT))
+    assert await communicator.receive_json_from() == {"events": [EVENT]}
+    assert await communicator.receive_nothing()
+
+    await communicator.disconnect()
+
+
+async def _msgpack_subprotocol():
+    communicator = WebsocketCommunicator(
+        BookAvailabilityConsumer.as_asgi(),
+        "/ws/book-availability/",
+        subprotocols=["msgpack"],
+    )
+    connected, subprotocol = await communicator.connect()
+    assert connected
+    assert subprotocol == "msgpack"
+
+    await communicator.send_to(
+        bytes_data=msgpack.packb({"action": "subscribe", "topics": ["library:1"]})
+    )
+    response = await communicator.receive_from()
+    assert msgpack.unpackb(response) == {"subscriptions": ["library:1"]}
+
+    await get_channel_layer(AVAILABILITY_CHANNEL_LAYER).group_send(
+        "library.1", availability_message(EVENT)
+    )
+    assert msgpack.unpackb(await communicator.receive_from()) == {"events": [EVENT]}
+
+    await communicator.disconnect()
+
+
+async def _invalid_topic_is_rejected():
+    communicator = WebsocketCommunicator(
+        BookAvailabilityConsumer.as_asgi(), "/ws/book-availability/"
+    )
+    await communicator.connect()
+
+    await communicator.send_json_to({"action": "subscribe", "topics": ["shelf:1"]})
+    assert await communicator.receive_json_from() == {"error": "Invalid topic: shelf:1"}
+
+    await communicator.disconnect()
+
+
+async def _client_ping_gets_pong():
+    communicator = WebsocketCommunicator(
+        BookAvailabilityConsumer.as_asgi(), "/ws/book-availability/"
+    )
+    await communicator.connect()
+
+    await communicator.send_json_to({"action": "ping"})
+    assert await communicator.receive_json_from() == {"action": "pong"}
+
+    await communicator.disconnect()
+
+
+async def _idle_client_is_closed():
+    communicator = WebsocketCommunicator(
+        BookAvailabilityConsumer.as_asgi(), "/ws/book-availability/"
+    )
+    await communicator.connect()
+    await communicator.send_json_to({"action": "subscribe", "topics": ["book:1"]})
+    await communicator.receive_json_from()
+
+    assert await communicator.receive_json_from() == {"action": "ping"}
+    assert await communicator.receive_json_from() == {"action": "ping"}
+    assert await communicator.receive_output() == {
+        "type": "websocket.close",
+        "code": 4000,
+    }
+    # The channel left its groups without waiting for the disconnect.
+    channel_layer = get_channel_layer(AVAILABILITY_CHANNEL_LAYER)
+    assert not channel_layer.groups.get("book.1")
+
+    await communicator.disconnect()
+
+
+async def _resume_sends_delta_for_subscribed_topics():
+    communicator = WebsocketCommunicator(
+        BookAvailabilityConsumer.as_asgi(), "/ws/book-availability/"
+    )
+    await communicator.connect()
+    await communicator.send_json_to({"action": "subscribe", "topics": ["book:1"]})
+    await communicator.receive_json_from()
+
+    newer = {**EVENT, "available_count": 1, "seq": "3-0"}
+    other_book = {**EVENT, "book_id": 2, "library_id": 2, "author_id": 2}
+    with mock.patch(
+        "library_management.library.consumers.availability_stream.since",
+        mock.AsyncMock(return_value=([EVENT, other_book, newer], "3-0")),
+    ) as since:
+        await communicator.send_json_to({"action": "resume", "since": "0-1"})
+        response = await communicator.receive_json_from()
+
+    since.assert_awaited_once_with("0-1")
+    assert response == {"action": "delta", "seq": "3-0", "events": [newer]}
+
+    await communicator.disconnect()
+
+
+async def _resume_without_stream_sends_snapshot():
+    communicator = WebsocketCommunicator(
+        BookAvailabilityConsumer.as_asgi(), "/ws/book-availability/"
+    )
+    await communicator.connect()
+
+    await communicator.send_json_to({"action": "resume", "since": "1-0"})
+    assert await communicator.receive_json_from() == {
+        "action": "snapshot",
+        "seq": None,
+    }
+
+    await communicator.disconnect()
+
+
+async def _events_for_the_same_book_are_coalesced():
+    consumer = make_consumer()
+    newer = {**EVENT, "available_count": 1}
+
+    await consumer.book_available(availability_message(EVENT))
+    await consumer.book_available(availability_message({**EVENT, "book_id": 2}))
+    await consumer.book_available(availability_message(newer))
+
+    assert list(consumer.pending) == [2, 1]
+    assert consumer.pending[1] == encode_event(newer)["text"]
+
+
+async def _overflowing_queue_is_replaced_by_resync():
+    consumer = make_consumer()
+
+    await consumer.book_available(availability_message(EVENT, {**EVENT, "book_id": 2}))
+
+    assert consumer.pending == {}
+    assert consumer.resync_required
+    assert consumer.resyncs == 1
+
+
+async def _resyncs_are_counted_until_the_client_catches_up():
+    consumer = make_consumer()
+    consumer.send_with_timeout = mock.AsyncMock()
+    consumer.close_slow_client = mock.AsyncMock()
+    overflow = availability_message(EVENT, {**EVENT, "book_id": 2})
+    sender = asyncio.create_task(consumer.send_pending())
+    try:
+        await consumer.book_available(overflow)
+        await asyncio.sleep(0.01)  # the resync notice goes out
+        assert consumer.resyncs == 0
+
+        await consumer.book_available(overflow)
+        assert consumer.resyncs == 1
+        consumer.close_slow_client.assert_not_awaited()
+
+        # Overflowing again before the notice is sent is one too many.
+        await consumer.book_available(overflow)
+        consumer.close_slow_client.assert_awaited_once_with(reason="resyncs")
+    finally:
+        sender.cancel()
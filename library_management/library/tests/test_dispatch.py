@@ -0,0 +1,68 @@
+import pytest
+from django.db import transaction
+
+from library_management.library import dispatch
+
+pytestmark = pytest.mark.django_db
+
+calls = []
+
+
+@dispatch.side_effect("test_effect")
+def record(payloads):
+    calls.append(payloads)
+
+
+@pytest.fixture(autouse=True)
+def _reset_calls():
+    calls.clear()
+
+
+def test_effects_of_a_transaction_are_coalesced(django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True) as callbacks:
+        dispatch.defer("test_effect", value=1)
+        dispatch.defer("test_effect", value=2)
+
+    assert len(callbacks) == 1
+    assert calls == [[{"value": 1}, {"value": 2}]]
+
+
+def test_effects_are_dropped_on_rollback(django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True) as callbacks:
+        try:
+            with transaction.atomic():
+                dispatch.defer("test_effect", value=1)
+                raise RuntimeError  # noqa: TRY301
+        except RuntimeError:
+            pass
+        dispatch.defer("test_effect", value=2)
+
+    assert len(callbacks) == 1
+    assert calls == [[{"value": 2}]]
+
+
+def test_effects_of_a_rolled_back_savepoint_are_dropped(
+    django_capture_on_commit_callbacks,
+):
+    with django_capture_on_commit_callbacks(execute=True):
+        dispatch.defer("test_effect", value=1)
+        try:
+            with transaction.atomic():
+                dispatch.defer("test_effect", value=2)
+                raise RuntimeError  # noqa: TRY301
+        except RuntimeError:
+            pass
+
+    assert calls == [[{"value": 1}]]
+
+
+def test_effects_of_a_released_savepoint_are_dispatched(
+    django_capture_on_commit_callbacks,
+):
+    with django_capture_on_commit_callbacks(execute=True):
+        dispatch.defer("test_effect", value=1)
+        with transaction.atomic():
+            dispatch.defer("test_effect", value=2)
+        dispatch.defer("test_effect", value=3)
+
+    assert calls == [[{"value": 1}, {"value": 3}], [{"value": 2}]]
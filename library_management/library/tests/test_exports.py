@@ -0,0 +1,135 @@
+import gzip
+import json
+from datetime import timedelta
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.management import call_command
+from django.test import AsyncClient
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from library_management.library import exports
+from library_management.library.models import Author, Book, Category, Library
+
+# Catalogue reads go to the stand-in replica, which only sees committed rows.
+pytestmark = pytest.mark.django_db(transaction=True, databases="__all__")
+
+
+@pytest.fixture
+def books():
+    library = Library.objects.create(name="Central", address="1 Main St")
+    author = Author.objects.create(name="Ursula K. Le Guin")
+    category = Category.objects.create(name="Fiction")
+    return [
+        Book.objects.create(
+            title=title, author=author, category=category, library=library
+        )
+        for title in ("The Dispossessed", "The Lathe of Heaven")
+    ]
+
+
+@pytest.fixture
+def client(user):
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+def content(response):
+    return b"".join(response.streaming_content)
+
+
+def test_ndjson_export(client, books):
+    response = client.get("/api/books/export.ndjson")
+
+    assert response.status_code == 200  # noqa: PLR2004
+    rows = [json.loads(line) for line in content(response).splitlines()]
+    assert [row["title"] for row in rows] == [book.title for book in books]
+    assert rows[0]["author"] == "Ursula K. Le Guin"
+    assert rows[0]["library"] == "Central"
+
+
+def test_csv_export_is_gzipped_on_request(client, books):
+    response = client.get("/api/books/export.csv", HTTP_ACCEPT_ENCODING="gzip")
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    lines = gzip.decompress(content(response)).decode().splitlines()
+    assert lines[0] == "id,title,description,author,category,library,modified"
+    assert len(lines) == 3  # noqa: PLR2004
+
+
+@pytest.mark.parametrize(
+    ("accept_encoding", "gzipped"),
+    [
+        ("gzip, deflate", True),
+        ("br;q=1.0, gzip;q=0.5", True),
+        ("*", True),
+        ("gzip;q=0, identity", False),
+        ("*;q=0", False),
+        ("deflate", False),
+    ],
+)
+def test_gzip_follows_accept_encoding_weights(client, books, accept_encoding, gzipped):
+    response = client.get("/api/books/export.csv", HTTP_ACCEPT_ENCODING=accept_encoding)
+
+    assert ("Content-Encoding" in response.headers) is gzipped
+
+
+def test_asgi_export_is_streamed_asynchronously(user, books, monkeypatch):
+    monkeypatch.setattr(exports, "BUFFER_SIZE", 1)  # one chunk per row
+    token = RefreshToken.for_user(user).access_token
+    client = AsyncClient(headers={"Authorization": f"Bearer {token}"})
+
+    async def export():
+        response = await client.get("/api/books/export.ndjson")
+        assert response.is_async
+        return [chunk async for chunk in response.streaming_content]
+
+    chunks = async_to_sync(export)()
+
+    assert [json.loads(chunk)["title"] for chunk in chunks] == [
+        book.title for book in books
+    ]
+
+
+def test_async_iteration_reads_one_chunk_at_a_time():
+    read = []
+
+    def chunks():
+        for number in range(3):
+            read.append(number)
+            yield str(number).encode()
+
+    async def first_chunk():
+        iterator = exports.iterate_async(chunks())
+        chunk = await iterator.__anext__()
+        await iterator.aclose()
+        return chunk
+
+    assert async_to_sync(first_chunk)() == b"0"
+    assert read == [0]
+
+
+def test_incremental_export(client, books):
+    since = books[0].modified
+    Book.objects.filter(pk=books[1].pk).update(modified=since + timedelta(seconds=1))
+
+    response = client.get(
+        "/api/books/export.ndjson", {"modified_after": since.isoformat()}
+    )
+
+    rows = [json.loads(line) for line in content(response).splitlines()]
+    assert [row["id"] for row in rows] == [books[1].pk]
+
+
+def test_unknown_format_is_not_found(client):
+    assert client.get("/api/books/export.xml").status_code == 404  # noqa: PLR2004
+
+
+def test_export_catalogue_command(books, tmp_path):
+    path = tmp_path / "books.ndjson.gz"
+
+    call_command("export_catalogue", str(path))
+
+    assert len(gzip.decompress(path.read_bytes()).splitlines()) == len(books)
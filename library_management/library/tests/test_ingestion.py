@@ -0,0 +1,166 @@
+import io
+from unittest import mock
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from rest_framework.test import APIClient
+
+from library_management.library.ingestion import IngestionError, read_records
+from library_management.library.models import (
+    Author,
+    Book,
+    CatalogueImport,
+    Category,
+    Library,
+)
+from library_management.library.services import CatalogueIngestionService
+
+MARC = """\
+001 ocm0001
+245 10 $a The Dispossessed
+100 1  $a Ursula K. Le Guin
+650  0 $a Science fiction
+520    $a An ambiguous utopia.
+
+001 ocm0002
+245 10 $a The Lathe of Heaven
+100 1  $a Ursula K. Le Guin
+650  0 $a Science fiction
+"""
+
+
+def test_reads_marc_records():
+    records = list(read_records(io.StringIO(MARC), "marc"))
+
+    assert records == [
+        {
+            "external_id": "ocm0001",
+            "title": "The Dispossessed",
+            "author": "Ursula K. Le Guin",
+            "category": "Science fiction",
+            "description": "An ambiguous utopia.",
+        },
+        {
+            "external_id": "ocm0002",
+            "title": "The Lathe of Heaven",
+            "author": "Ursula K. Le Guin",
+            "category": "Science fiction",
+        },
+    ]
+
+
+def test_invalid_jsonl_names_the_line():
+    with pytest.raises(IngestionError, match="Line 2"):
+        list(read_records(io.StringIO('{"title": "A"}\n{oops\n'), "jsonl"))
+
+
+@pytest.mark.django_db
+class TestCatalogueIngestionService:
+    @pytest.fixture
+    def library(self):
+        return Library.objects.create(name="Central", address="1 Main St")
+
+    def test_creates_names_once_and_upserts_books(self, library):
+        existing = Author.objects.create(name="Ursula K. Le Guin")
+        records = list(read_records(io.StringIO(MARC), "marc"))
+
+        service = CatalogueIngestionService(library)
+        list(service.ingest(records, chunk_size=1))
+        records[0]["description"] = "Revised."
+        list(CatalogueIngestionService(library).ingest(records))
+
+        assert Author.objects.get() == existing
+        assert Category.objects.count() == 1
+        assert Book.objects.count() == 2  # noqa: PLR2004
+        assert Book.objects.get(title="The Dispossessed").description == "Revised."
+        assert service.counts == {
+            "authors": 0,
+            "categories": 1,
+            "books": 2,
+            "rejected": 0,
+        }
+
+    def test_records_without_an_id_are_new_copies(self, library):
+        record = {"title": "Foundation", "author": "Isaac Asimov", "category": "SF"}
+
+        list(CatalogueIngestionService(library).ingest([record, record]))
+        list(CatalogueIngestionService(library).ingest([record]))
+
+        assert Book.objects.filter(library=library, title="Foundation").count() == 3  # noqa: PLR2004
+
+    def test_rejects_incomplete_records(self, library):
+        service = CatalogueIngestionService(library)
+
+        rejected = list(service.ingest([{"title": "Untitled", "author": "Anon"}]))
+
+        assert rejected == [
+            ({"title": "Untitled", "author": "Anon"}, "missing category")
+        ]
+        assert not Book.objects.exists()
+
+    def test_import_catalogue_command(self, library, tmp_path):
+        path = tmp_path / "branch.csv"
+        path.write_text(
+            "title,author,category\nFoundation,Isaac Asimov,Science fiction\n"
+        )
+
+        call_command("import_catalogue", str(path), "--library", library.name)
+
+        assert Book.objects.get().author.name == "Isaac Asimov"
+
+    def test_ingest_api_is_for_admins(  # noqa: PLR0913
+        self,
+        library,
+        admin_user,
+        user,
+        settings,
+        tmp_path,
+        django_capture_on_commit_callbacks,
+    ):
+        settings.MEDIA_ROOT = str(tmp_path)
+        client = APIClient()
+        upload = SimpleUploadedFile("branch.marc", MARC.encode())
+        url = f"/api/libraries/{library.pk}/catalogue/"
+
+        client.force_authenticate(user)
+        assert client.post(url, {"file": upload}).status_code == 403  # noqa: PLR2004
+
+        upload.seek(0)
+        client.force_authenticate(admin_user)
+        with (
+            mock.patch(
+                "library_management.library.tasks.ingest_catalogue.delay"
+            ) as delay,
+            django_capture_on_commit_callbacks(execute=True),
+        ):
+            response = client.post(url, {"file": upload})
+
+        assert response.status_code == 202  # noqa: PLR2004
+        job = CatalogueImport.objects.get()
+        delay.assert_called_once_with(job.pk)
+        assert job.status == CatalogueImport.Status.PENDING
+        assert not Book.objects.exists()
+
+        CatalogueIngestionService.run_import(job)
+
+        status_url = f"{url}{job.pk}/"
+        data = client.get(status_url).json()["results"]
+        assert data["status"] == CatalogueImport.Status.SUCCEEDED
+        assert data["counts"]["books"] == 2  # noqa: PLR2004
+        assert Book.objects.filter(library=library).count() == 2  # noqa: PLR2004
+        assert not job.file
+
+    def test_failed_imports_report_the_error(self, library, settings, tmp_path):
+        settings.MEDIA_ROOT = str(tmp_path)
+        job = CatalogueImport.objects.create(
+            library=library,
+            file=SimpleUploadedFile("branch.jsonl", b'{"title": "Dune"}\nnot json\n'),
+            format="jsonl",
+        )
+
+        CatalogueIngestionService.run_import(job)
+
+        job.refresh_from_db()
+        assert job.status == CatalogueImport.Status.FAILED
+        assert "Line 2" in job.error
@@ -0,0 +1,89 @@
+import pytest
+from asgiref.sync import async_to_sync
+from django.db import connections
+from django.test import AsyncClient
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from library_management.library.api.views import (
+    AuthorListView,
+    BookListView,
+    BorrowBookView,
+    LibraryListView,
+    ReturnBookView,
+)
+from library_management.library.models import Author, Book, Category, Library
+from library_management.users.models import User
+
+# Catalogue reads go to the stand-in replica, which only sees committed rows.
+pytestmark = pytest.mark.django_db(transaction=True, databases="__all__")
+
+
+@pytest.fixture
+def catalogue():
+    library = Library.objects.create(name="Central", address="1 Main St")
+    author = Author.objects.create(name="Ursula K. Le Guin")
+    category = Category.objects.create(name="Fiction")
+    for title in ("The Dispossessed", "The Lathe of Heaven"):
+        Book.objects.create(
+            title=title, author=author, category=category, library=library
+        )
+
+
+def async_get(user, path):
+    token = RefreshToken.for_user(user).access_token
+    client = AsyncClient(headers={"Authorization": f"Bearer {token}"})
+    return async_to_sync(client.get)(path)
+
+
+@pytest.mark.parametrize("path", ["/api/books/", "/api/authors/"])
+def test_async_list_matches_sync_list(user, catalogue, path):
+    client = APIClient()
+    client.force_authenticate(user)
+    sync_results = client.get(path).json()["results"]
+
+    response = async_get(user, f"{path}async/")
+
+    assert response.status_code == 200
+    assert response.json()["results"] == sync_results
+    assert len(sync_results) > 0
+
+
+def test_async_list_applies_filters(user, catalogue):
+    response = async_get(user, "/api/books/async/?author=nobody")
+
+    assert response.status_code == 200
+    assert response.json()["results"] == []
+
+
+def test_async_list_requires_authentication(catalogue):
+    response = async_to_sync(AsyncClient().get)("/api/books/async/")
+
+    assert response.status_code == 401
+
+
+@pytest.mark.parametrize("view", [BookListView, AuthorListView, LibraryListView])
+def test_read_views_are_not_atomic(view):
+    assert "default" in getattr(view.as_view(), "_non_atomic_requests", set())
+
+
+@pytest.mark.parametrize("view", [BorrowBookView, ReturnBookView])
+def test_write_views_are_atomic(view):
+    assert "default" not in getattr(view.as_view(), "_non_atomic_requests", set())
+
+
+def test_catalogue_lists_trust_token_claims(user, catalogue):
+    token = RefreshToken.for_user(user).access_token
+    client = APIClient(headers={"Authorization": f"Bearer {token}"})
+
+    with (
+        CaptureQueriesContext(connections["replica"]) as replica,
+        CaptureQueriesContext(connections["default"]) as default,
+    ):
+        response = client.get("/api/authors/")
+
+    assert response.status_code == 200
+    queried = [query["sql"] for query in replica.captured_queries]
+    queried += [query["sql"] for query in default.captured_queries]
+    assert not [sql for sql in queried if User._meta.db_table in sql]
@@ -37,6 +37,10 @@ class RegisterSerializer(serializers.ModelSerializer):
         validated_data.pop("confirm_password")
         return User.objects.create_user(**validated_data)
 
+    async def acreate(self, validated_data):
+        validated_data.pop("confirm_password")
+        return await User.objects.acreate_user(**validated_data)
+
 
 class PasswordResetRequestSerializer(serializers.Serializer):
     email = serializers.EmailField()
@@ -0,0 +1,25 @@
+import hashlib
+
+from library_management.core.api.throttling import TokenBucketThrottle
+
+
+class PasswordResetEmailThrottle(TokenBucketThrottle):
+    """
+    Throttles password reset requests per email address, from whichever
+    client they come, so the address isn't flooded with reset emails.
+    """
+
+    scope = "password_reset"
+
+    def get_scope(self, request, view):
+        return self.scope
+
+    def get_cache_key(self, request, view):
+        if request.method != "POST" or not hasattr(request.data, "get"):
+            return None
+        email = request.data.get("email")
+        if not isinstance(email, str) or not email.strip():
+            return None
+        # Keep addresses out of Redis.
+        ident = hashlib.sha256(email.strip().lower().encode()).hexdigest()
+        return self.cache_format % {"scope": self.scope, "ident": ident}
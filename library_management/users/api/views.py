@@ -1,12 +1,15 @@
+from asgiref.sync import sync_to_async
 from rest_framework import status
 from rest_framework.decorators import action
 from rest_framework.exceptions import NotAcceptable
 from rest_framework.mixins import ListModelMixin, RetrieveModelMixin, UpdateModelMixin
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework.views import APIView
 from rest_framework.viewsets import GenericViewSet
 
+from library_management.core.api.views import AsyncAPIView
 from library_management.users.models import User
 from library_management.users.services import UserService
 from library_management.users.tasks import async_send_email
@@ -17,6 +20,7 @@ from .serializers import (
     RegisterSerializer,
     UserSerializer,
 )
+from .throttling import PasswordResetEmailThrottle
 
 
 class UserViewSet(RetrieveModelMixin, ListModelMixin, UpdateModelMixin, GenericViewSet):
@@ -48,15 +52,36 @@ class RegisterView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+class AsyncRegisterView(AsyncAPIView):
+    """RegisterView for ASGI: the password is hashed off the event loop."""
+
+    permission_classes = (AllowAny,)
+
+    async def post(self, request, *args, **kwargs):
+        serializer = RegisterSerializer(data=request.data)
+        # Validation checks the email is unique.
+        if await sync_to_async(serializer.is_valid)():
+            _ = await serializer.acreate(dict(serializer.validated_data))
+            return Response(
+                {"detail": "User registered successfully."},
+                status=status.HTTP_201_CREATED,
+            )
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
 class PasswordResetView(APIView):
     permission_classes = (AllowAny,)
+    throttle_classes = [
+        *api_settings.DEFAULT_THROTTLE_CLASSES,
+        PasswordResetEmailThrottle,
+    ]
     service = UserService()
 
     def post(self, request):
         serializer = PasswordResetRequestSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         email = serializer.validated_data["email"]
-        user = User.objects.filter(email=email).first()
+        user = self.service.get_user_for_password_reset(email)
         if not user:
             raise NotAcceptable("Email does not exist, please signup")  # noqa: EM101, TRY003
 
@@ -65,7 +90,8 @@ class PasswordResetView(APIView):
             user,
             f"{domain}/api/users/reset-password/",
         )
-        async_send_email.delay(
+        # Goes out through the outbox once the request's transaction commits.
+        async_send_email(
             subject="Password Reset Request",
             message=f"Please click the link to reset your password: {reset_link}",
             receivers=[user.email],
@@ -86,14 +112,9 @@ class PasswordResetView(APIView):
 
         new_password = serializer.validated_data["new_password"]
 
-        user = self.service.get_user_by_uid(uid)
-
-        if not self.service.validate_password_reset_token(user, token):
+        if not self.service.reset_password(uid, token, new_password):
             return Response(
                 {"error": "Invalid or expired token."},
                 status=status.HTTP_400_BAD_REQUEST,
             )
-
-        user.set_password(new_password)
-        user.save()
         return Response(status=status.HTTP_202_ACCEPTED)
@@ -0,0 +1,134 @@
+"""
+JWT authentication without a user query per request.
+
+:class:`CachedJWTAuthentication` validates the token as usual but serves the
+user from :data:`user_cache`: a small in-process LRU in front of the default
+cache. Saving or deleting a user drops it from both (see ``signals``). Other
+processes may serve their local copy for up to ``USER_CACHE_LOCAL_TTL``
+seconds after that, so keep it short.
+
+Only what authentication checks is cached, never the row itself: the fields
+in :attr:`UserCache.fields` and a fingerprint of the password hash for
+simplejwt's revoke check. The user handed to the view is rebuilt from them
+with every other field deferred, so e.g. ``email`` costs a query the first
+time it's read.
+
+Views that only need the user's id can use simplejwt's
+``JWTStatelessUserAuthentication`` instead, which builds a ``TokenUser`` from
+the token claims and never touches the database or the cache.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import router
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+
+class UserCache:
+    key_format = "auth:user:{}"
+    # Cached besides the primary key
+    fields = ("is_active", "is_staff", "is_superuser")
+
+    def __init__(self):
+        self._local = OrderedDict()  # user id -> (expires at, entry)
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        """
+        A new user with the cached fields loaded and its password
+        fingerprint, or ``(None, None)``.
+        """
+        now = time.monotonic()
+        with self._lock:
+            expires_at, entry = self._local.get(user_id, (0, None))
+            if expires_at > now:
+                self._local.move_to_end(user_id)
+            else:
+                entry = None
+        if entry is None:
+            entry = cache.get(self.key_format.format(user_id))
+            if entry is None:
+                return None, None
+            self._remember(user_id, entry)
+        values, fingerprint = entry
+        return self._build(values), fingerprint
+
+    def set(self, user_id, user):
+        model = type(user)
+        values = {
+            model._meta.pk.attname: user.pk,
+            **{field: getattr(user, field) for field in self.fields},
+        }
+        entry = (values, get_md5_hash_password(user.password))
+        cache.set(self.key_format.format(user_id), entry, settings.USER_CACHE_TTL)
+        self._remember(user_id, entry)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._local.pop(user_id, None)
+        cache.delete(self.key_format.format(user_id))
+
+    def clear_local(self):
+        with self._lock:
+            self._local.clear()
+
+    def _build(self, values):
+        model = get_user_model()
+        # from_db() takes the loaded fields in the model's field order.
+        names = [
+            field.attname
+            for field in model._meta.concrete_fields
+            if field.attname in values
+        ]
+        return model.from_db(
+            router.db_for_read(model), names, [values[name] for name in names]
+        )
+
+    def _remember(self, user_id, entry):
+        with self._lock:
+            expires_at = time.monotonic() + settings.USER_CACHE_LOCAL_TTL
+            self._local[user_id] = (expires_at, entry)
+            self._local.move_to_end(user_id)
+            if len(self._local) > settings.USER_CACHE_LOCAL_SIZE:
+                self._local.popitem(last=False)
+
+
+user_cache = UserCache()
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication that loads users through :data:`user_cache`."""
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as exc:
+            msg = _("Token contained no recognizable user identification")
+            raise InvalidToken(msg) from exc
+
+        user, fingerprint = user_cache.get(user_id)
+        if user is None:
+            # Loads the user and runs every check; only valid users are cached.
+            user = super().get_user(validated_token)
+            user_cache.set(user_id, user)
+            return user
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if (
+            api_settings.CHECK_REVOKE_TOKEN
+            and validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != fingerprint
+        ):
+            raise AuthenticationFailed(
+                _("The user's password has been changed."), code="password_changed"
+            )
+        return user
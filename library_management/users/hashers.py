@@ -0,0 +1,54 @@
+"""
+Password hashing with a cost set per environment.
+
+Argon2 takes its time cost, memory cost and parallelism from the ``ARGON2_*``
+settings. Hashes made with other parameters keep verifying and are rehashed
+with the current ones when their users next log in.
+
+:func:`amake_password` hashes on a bounded pool of ``PASSWORD_HASH_WORKERS``
+threads. argon2 releases the GIL while hashing, so async views stay
+responsive and at most that many hashes compete for the CPU at once; the
+rest wait in the pool's queue.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.contrib.auth.hashers import make_password
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+class Argon2PasswordHasher(hashers.Argon2PasswordHasher):
+    @property
+    def time_cost(self):
+        return settings.ARGON2_TIME_COST
+
+    @property
+    def memory_cost(self):
+        return settings.ARGON2_MEMORY_COST
+
+    @property
+    def parallelism(self):
+        return settings.ARGON2_PARALLELISM
+
+
+def get_executor():
+    global _executor  # noqa: PLW0603
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.PASSWORD_HASH_WORKERS,
+                thread_name_prefix="password-hash",
+            )
+        return _executor
+
+
+async def amake_password(password):
+    """:func:`make_password` on the hashing pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), make_password, password)
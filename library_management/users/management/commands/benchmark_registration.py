@@ -0,0 +1,127 @@
+"""
+Measure what password hashing costs a registration.
+
+By default the command hashes passwords in-process with the configured
+hasher on ``--threads`` threads and reports hashes per second of wall time
+and per CPU-second, i.e. per core. Override the Argon2 cost to compare
+settings before changing them::
+
+    python manage.py benchmark_registration --threads 4 --time-cost 1 \\
+        --memory-cost 65536
+
+With ``--base-url`` it registers users through the sync and async endpoints
+of a running server instead. The anon throttle answers most of a long run
+with 429s, raise ``DEFAULT_THROTTLE_RATES["anon"]`` on the server first, and
+delete the ``benchmark-*@example.com`` users afterwards.
+"""
+
+import json
+import os
+import secrets
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+
+from library_management.core.benchmarking import percentile
+
+ENDPOINTS = ("/api/users/register/", "/api/users/register/async/")
+
+
+class Command(BaseCommand):
+    help = "Benchmark password hashing and registration throughput."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=os.cpu_count() or 1)
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument("--time-cost", type=int)
+        parser.add_argument("--memory-cost", type=int, help="In KiB.")
+        parser.add_argument("--parallelism", type=int)
+        parser.add_argument(
+            "--base-url", help="Register through this server instead of hashing."
+        )
+        parser.add_argument("--timeout", type=float, default=30)
+
+    def handle(self, *args, **options):
+        if options["base_url"]:
+            for path in ENDPOINTS:
+                url = options["base_url"].rstrip("/") + path
+                self.stdout.write(self.register(url, **options))
+            return
+
+        overrides = {
+            f"ARGON2_{name.upper()}": options[name]
+            for name in ("time_cost", "memory_cost", "parallelism")
+            if options[name] is not None
+        }
+        with override_settings(**overrides):
+            self.stdout.write(self.hash(options["threads"], options["requests"]))
+
+    def hash(self, threads, requests):
+        def timed(_):
+            started = time.perf_counter()
+            make_password(secrets.token_urlsafe(12))
+            return (time.perf_counter() - started) * 1000
+
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            latencies = list(executor.map(timed, range(requests)))
+        wall = time.perf_counter() - wall_start
+        cpu = time.process_time() - cpu_start
+
+        return (
+            f"{make_password('x').rsplit('$', 2)[0]} on {threads} threads\n"
+            f"  throughput:              {requests / wall:.1f} hashes/s\n"
+            f"  per core:                {requests / cpu:.1f} hashes/CPU-second\n"
+            f"  latency p50/p90/p99/max: {percentile(latencies, 50):.1f} / "
+            f"{percentile(latencies, 90):.1f} / {percentile(latencies, 99):.1f} / "
+            f"{max(latencies, default=float('nan')):.1f} ms"
+        )
+
+    def register(self, url, threads, requests, timeout, **options):
+        run = secrets.token_hex(4)
+
+        def post(i):
+            password = secrets.token_urlsafe(12)
+            body = json.dumps(
+                {
+                    "email": f"benchmark-{run}-{i}@example.com",
+                    "name": "Benchmark",
+                    "password": password,
+                    "confirm_password": password,
+                },
+            ).encode()
+            request = urllib.request.Request(  # noqa: S310
+                url, data=body, headers={"Content-Type": "application/json"}
+            )
+            started = time.perf_counter()
+            try:
+                with urllib.request.urlopen(request, timeout=timeout) as response:  # noqa: S310
+                    response.read()
+                    status = response.status
+            except urllib.error.HTTPError as exc:
+                status = exc.code
+            except OSError as exc:
+                status = type(exc).__name__
+            return status, (time.perf_counter() - started) * 1000
+
+        wall_start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            results = list(executor.map(post, range(requests)))
+        wall = time.perf_counter() - wall_start
+
+        statuses = Counter(status for status, _ in results)
+        latencies = [latency for status, latency in results if status == 201]  # noqa: PLR2004
+        return (
+            f"{url}\n"
+            f"  throughput:              {len(results) / wall:.1f} req/s\n"
+            f"  latency p50/p90/p99/max: {percentile(latencies, 50):.1f} / "
+            f"{percentile(latencies, 90):.1f} / {percentile(latencies, 99):.1f} / "
+            f"{max(latencies, default=float('nan')):.1f} ms\n"
+            f"  statuses:                {dict(statuses)}"
+        )
@@ -3,6 +3,8 @@ from typing import TYPE_CHECKING
 from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import UserManager as DjangoUserManager
 
+from .hashers import amake_password
+
 if TYPE_CHECKING:
     from .models import User  # noqa: F401
 
@@ -14,20 +16,40 @@ class UserManager(DjangoUserManager["User"]):
         """
         Create and save a user with the given email and password.
         """
+        user = self._build_user(email, **extra_fields)
+        user.password = make_password(password)
+        user.save(using=self._db)
+        return user
+
+    def _build_user(self, email: str, **extra_fields):
         if not email:
             msg = "The given email must be set"
             raise ValueError(msg)
         email = self.normalize_email(email)
-        user = self.model(email=email, **extra_fields)
-        user.password = make_password(password)
-        user.save(using=self._db)
-        return user
+        return self.model(email=email, **extra_fields)
 
     def create_user(self, email: str, password: str | None = None, **extra_fields):  # type: ignore[override]
         extra_fields.setdefault("is_staff", False)
         extra_fields.setdefault("is_superuser", False)
         return self._create_user(email, password, **extra_fields)
 
+    async def acreate_user(
+        self,
+        email: str,
+        password: str | None = None,
+        **extra_fields,
+    ):
+        """
+        Like create_user, but hashes the password on the hashing pool instead
+        of blocking the event loop.
+        """
+        extra_fields.setdefault("is_staff", False)
+        extra_fields.setdefault("is_superuser", False)
+        user = self._build_user(email, **extra_fields)
+        user.password = await amake_password(password)
+        await user.asave(using=self._db)
+        return user
+
     def create_superuser(self, email: str, password: str | None = None, **extra_fields):  # type: ignore[override]
         extra_fields.setdefault("is_staff", True)
         extra_fields.setdefault("is_superuser", True)
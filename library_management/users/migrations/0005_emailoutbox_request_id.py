@@ -0,0 +1,18 @@
+# Generated by Django 5.1.11 on 2026-10-19 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_emailoutbox'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='emailoutbox',
+            name='request_id',
+            field=models.CharField(blank=True, max_length=128, verbose_name='request id'),
+        ),
+    ]
@@ -1,9 +1,20 @@
 from typing import ClassVar
 
 from django.contrib.auth.models import AbstractUser
-from django.db.models import CharField, EmailField
+from django.db.models import (
+    CharField,
+    DateTimeField,
+    EmailField,
+    Index,
+    JSONField,
+    PositiveSmallIntegerField,
+    TextChoices,
+    TextField,
+)
 from django.urls import reverse
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
+from model_utils.models import TimeStampedModel
 
 from .managers import UserManager
 
@@ -35,3 +46,42 @@ class User(AbstractUser):
 
         """
         return reverse("users:detail", kwargs={"pk": self.id})
+
+
+class EmailOutbox(TimeStampedModel):
+    """
+    Durable queue of outgoing emails.
+    Rows are drained in batches by the ``send_outbox_emails`` task.
+    """
+
+    class Status(TextChoices):
+        PENDING = "pending", _("Pending")
+        SENT = "sent", _("Sent")
+        FAILED = "failed", _("Failed")
+
+    idempotency_key = CharField(_("idempotency key"), max_length=255, unique=True)
+    subject = CharField(_("subject"), max_length=255)
+    message = TextField(_("message"))
+    receivers = JSONField(_("receivers"), default=list)
+    status = CharField(
+        _("status"),
+        max_length=16,
+        choices=Status.choices,
+        default=Status.PENDING,
+    )
+    attempts = PositiveSmallIntegerField(_("attempts"), default=0)
+    next_attempt_at = DateTimeField(_("next attempt at"), default=timezone.now)
+    last_error = TextField(_("last error"), blank=True)
+    sent_at = DateTimeField(_("sent at"), null=True, blank=True)
+    # Request or task that queued the email, restored while it is sent
+    request_id = CharField(_("request id"), max_length=128, blank=True)
+
+    class Meta:
+        verbose_name = _("Email Outbox")
+        verbose_name_plural = _("Email Outbox")
+        indexes = [
+            Index(fields=["status", "next_attempt_at"], name="email_outbox_due_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.receivers)}"
@@ -1,20 +1,327 @@
-from django.contrib.auth.tokens import default_token_generator
-from django.shortcuts import get_object_or_404
+import hashlib
+import logging
+import secrets
+from datetime import timedelta
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.mail import EmailMessage, get_connection
+from django.core.validators import EmailValidator
+from django.db import transaction
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare, salted_hmac
 from django.utils.encoding import force_bytes, force_str
 from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
 
-from library_management.users.models import User
+from library_management.core.tracing import bind_request_id, get_request_id, span
+from library_management.users.models import EmailOutbox, User
+
+logger = logging.getLogger(__name__)
+
+
+class PasswordResetTokenStore:
+    """
+    Single-use password reset tokens kept in the default cache.
+
+    Only a digest of the token is stored, mapped to the user's id and a
+    fingerprint of their password hash. Unknown or expired tokens are
+    rejected without a query, and a password changed by other means voids
+    the tokens issued before.
+    """
+
+    key_format = "password-reset:{}"
+
+    def issue(self, user):
+        return self.issue_many([user])[0]
+
+    def issue_many(self, users):
+        """Tokens for ``users``, in order, stored in one cache round trip."""
+        tokens = [secrets.token_urlsafe(32) for _ in users]
+        cache.set_many(
+            {
+                self._key(token): (user.pk, self.fingerprint(user.password))
+                for token, user in zip(tokens, users, strict=True)
+            },
+            settings.PASSWORD_RESET_TIMEOUT,
+        )
+        return tokens
+
+    def get(self, token):
+        """The ``(user id, password fingerprint)`` the token was issued for."""
+        return cache.get(self._key(token))
+
+    def consume(self, token):
+        """Void the token; only one caller gets ``True`` for it."""
+        return bool(cache.delete(self._key(token)))
+
+    def fingerprint(self, password):
+        return salted_hmac(self.key_format, password).hexdigest()
+
+    def _key(self, token):
+        return self.key_format.format(hashlib.sha256(token.encode()).hexdigest())
 
 
 class UserService:
+    tokens = PasswordResetTokenStore()
+
+    def get_user_for_password_reset(self, email):
+        return User.objects.only("pk", "email", "password").filter(email=email).first()
+
     def generate_password_reset_link(self, user, base_url):
-        token = default_token_generator.make_token(user)
-        uid = urlsafe_base64_encode(force_bytes(user.pk))
-        return f"{base_url}?uid={uid}&token={token}"
+        return self.generate_password_reset_links([user], base_url)[0]
+
+    def generate_password_reset_links(self, users, base_url):
+        return [
+            f"{base_url}?uid={urlsafe_base64_encode(force_bytes(user.pk))}"
+            f"&token={token}"
+            for user, token in zip(users, self.tokens.issue_many(users), strict=True)
+        ]
+
+    def reset_password(self, uid, token, new_password):
+        """
+        Set ``new_password`` for the user the token was issued to.
+        Returns:
+            bool: False if the token is invalid, expired or already used.
+        """
+        issued = self.tokens.get(token)
+        if issued is None:
+            return False
+        user_id, fingerprint = issued
+        try:
+            if force_str(urlsafe_base64_decode(uid)) != str(user_id):
+                return False
+        except (TypeError, ValueError):
+            return False
+
+        user = User.objects.only("pk", "password").filter(pk=user_id).first()
+        if user is None or not constant_time_compare(
+            fingerprint, self.tokens.fingerprint(user.password)
+        ):
+            return False
+        if not self.tokens.consume(token):
+            return False
+
+        user.set_password(new_password)
+        user.save(update_fields=["password"])
+        return True
+
+
+class UserImportService:
+    """
+    Creates users in bulk, e.g. a university's students from its registry.
+    Rows are trusted: only the email is checked, the password validators
+    don't run.
+    """
+
+    reset_subject = "Your Library Management account"
+    reset_message = (
+        "An account has been created for you. "
+        "Please click the link to set your password: {link}"
+    )
+
+    def __init__(self, reset_url=None):
+        self.reset_url = reset_url
+        self.validate_email = EmailValidator()
+
+    def build_users(self, rows):
+        """
+        Unsaved users for ``rows``, keyed by their normalized email, without
+        a password yet. Later rows repeating an email are rejected.
+        Returns:
+            tuple: The users, the rows' plain passwords by email (for rows
+            that have one), and the rejected rows with the reason.
+        """
+        users, passwords, rejected = {}, {}, []
+        for row in rows:
+            if not isinstance(row, dict):
+                rejected.append((row, "not an object"))
+                continue
+            email = User.objects.normalize_email((row.get("email") or "").strip())
+            try:
+                self.validate_email(email)
+            except ValidationError:
+                rejected.append((row, "invalid email"))
+                continue
+            if email in users:
+                rejected.append((row, "duplicate email"))
+                continue
+            users[email] = User(email=email, name=(row.get("name") or "").strip())
+            if row.get("password"):
+                passwords[email] = row["password"]
+        return users, passwords, rejected
+
+    def create_users(self, users):
+        """
+        Insert ``users``, whose passwords are already hashed or unusable,
+        skipping emails that are taken. With a ``reset_url``, new users
+        without a usable password get a password reset email.
+        Args:
+            users (dict[str, User]): Users keyed by email, from ``build_users``.
+        Returns:
+            int: Number of users created.
+        """
+        with transaction.atomic():
+            taken = set(
+                User.objects.filter(email__in=users).values_list("email", flat=True)
+            )
+            new = {email: user for email, user in users.items() if email not in taken}
+            # A user registering meanwhile wins over the imported row.
+            User.objects.bulk_create(new.values(), ignore_conflicts=True)
+            # Rows skipped by the insert belong to someone else; every password
+            # built here, hashed or unusable, is salted and so only in our rows.
+            created = [
+                user
+                for user in User.objects.only("pk", "email", "password").filter(
+                    email__in=new
+                )
+                if user.password == new[user.email].password
+            ]
+            if self.reset_url:
+                self._queue_reset_emails(
+                    [user for user in created if not user.has_usable_password()]
+                )
+        return len(created)
+
+    def _queue_reset_emails(self, users):
+        if not users:
+            return
+        links = UserService().generate_password_reset_links(users, self.reset_url)
+        EmailOutboxService.enqueue_many(
+            {
+                "idempotency_key": f"user-import:{user.pk}",
+                "subject": self.reset_subject,
+                "message": self.reset_message.format(link=link),
+                "receivers": [user.email],
+            }
+            for user, link in zip(users, links, strict=True)
+        )
+
+
+class EmailOutboxService:
+    @staticmethod
+    def enqueue(subject, message, receivers, idempotency_key=None):
+        """
+        Store an email in the outbox.
+        Enqueuing twice with the same idempotency key is a no-op.
+        Args:
+            subject (str): Email subject.
+            message (str): Plain text body.
+            receivers (list[str]): Recipient addresses.
+            idempotency_key (str, optional): Deduplication key, random if omitted.
+        Returns:
+            EmailOutbox: The stored (or already existing) outbox row.
+        """
+        email, _ = EmailOutbox.objects.get_or_create(
+            idempotency_key=idempotency_key or uuid4().hex,
+            defaults={
+                "subject": subject,
+                "message": message,
+                "receivers": list(receivers),
+                "request_id": get_request_id() or "",
+            },
+        )
+        return email
+
+    @staticmethod
+    def enqueue_many(emails):
+        """
+        Store many emails in the outbox with a single insert.
+        Emails whose idempotency key is already stored are skipped.
+        Args:
+            emails (Iterable[dict]): ``enqueue`` keyword arguments, each with
+                an ``idempotency_key``.
+        """
+        request_id = get_request_id() or ""
+        EmailOutbox.objects.bulk_create(
+            [
+                EmailOutbox(
+                    idempotency_key=email["idempotency_key"],
+                    subject=email["subject"],
+                    message=email["message"],
+                    receivers=list(email["receivers"]),
+                    request_id=request_id,
+                )
+                for email in emails
+            ],
+            ignore_conflicts=True,
+        )
+
+    @staticmethod
+    def send_due(batch_size):
+        """
+        Send up to ``batch_size`` due emails over a single SMTP connection.
+        Rows are locked with SKIP LOCKED so concurrent drainers never pick
+        the same email. Failed sends are rescheduled with exponential backoff
+        until ``EMAIL_OUTBOX_MAX_ATTEMPTS`` is reached.
+        Returns:
+            int: Number of outbox rows processed.
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            batch = list(
+                EmailOutbox.objects.select_for_update(skip_locked=True)
+                .filter(status=EmailOutbox.Status.PENDING, next_attempt_at__lte=now)
+                .order_by("next_attempt_at", "id")[:batch_size]
+            )
+            if not batch:
+                return 0
+
+            connection = get_connection()
+            try:
+                connection.open()
+            except Exception as exc:
+                logger.exception("Failed to open email connection")
+                for email in batch:
+                    EmailOutboxService._mark_failed(email, exc, now)
+            else:
+                try:
+                    for email in batch:
+                        EmailOutboxService._send(connection, email, now)
+                finally:
+                    connection.close()
+
+            EmailOutbox.objects.bulk_update(
+                batch,
+                ["status", "attempts", "next_attempt_at", "last_error", "sent_at"],
+            )
+        return len(batch)
+
+    @staticmethod
+    def _send(connection, email, now):
+        # Logged and traced under the request that queued the email
+        with (
+            bind_request_id(email.request_id),
+            span("email.send", **{"email.idempotency_key": email.idempotency_key}),
+        ):
+            EmailOutboxService._deliver(connection, email, now)
 
-    def get_user_by_uid(self, uid):
-        user_id = force_str(urlsafe_base64_decode(uid))
-        return get_object_or_404(User, pk=user_id)
+    @staticmethod
+    def _deliver(connection, email, now):
+        message = EmailMessage(
+            subject=email.subject,
+            body=email.message,
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            to=email.receivers,
+            connection=connection,
+        )
+        try:
+            message.send()
+        except Exception as exc:
+            logger.exception("Failed to send email %s", email.idempotency_key)
+            EmailOutboxService._mark_failed(email, exc, now)
+        else:
+            email.status = EmailOutbox.Status.SENT
+            email.sent_at = now
+            email.last_error = ""
 
-    def validate_password_reset_token(self, user, token):
-        return default_token_generator.check_token(user, token)
+    @staticmethod
+    def _mark_failed(email, exc, now):
+        email.attempts += 1
+        email.last_error = f"{exc.__class__.__name__}: {exc}"
+        if email.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+            email.status = EmailOutbox.Status.FAILED
+            return
+        backoff = settings.EMAIL_OUTBOX_RETRY_BACKOFF * 2 ** (email.attempts - 1)
+        email.next_attempt_at = now + timedelta(seconds=backoff)
@@ -0,0 +1,16 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework_simplejwt.settings import api_settings
+
+from .authentication import user_cache
+
+
+@receiver([post_save, post_delete], sender=settings.AUTH_USER_MODEL)
+def invalidate_cached_user(sender, instance, **kwargs):
+    """Drop a saved or deleted user, e.g. on a password change, from the cache."""
+    user_id = getattr(instance, api_settings.USER_ID_FIELD)
+    user_cache.invalidate(user_id)
+    # Again once committed, in case a concurrent request cached the old row.
+    transaction.on_commit(lambda: user_cache.invalidate(user_id))
@@ -1,19 +1,30 @@
-import logging
-
 from celery import shared_task
 from django.conf import settings
-from django.core.mail import send_mail
+
+from library_management.users.services import EmailOutboxService
+
+
+def async_send_email(subject, message, receivers, idempotency_key=None):
+    """
+    Queue an email for delivery.
+    The email is written to the outbox (inside the caller's transaction, if
+    any) and sent later in batches by ``send_outbox_emails``.
+    """
+    return EmailOutboxService.enqueue(
+        subject=subject,
+        message=message,
+        receivers=receivers,
+        idempotency_key=idempotency_key,
+    )
 
 
 @shared_task
-def async_send_email(subject, message, receivers):
-    try:
-        send_mail(
-            subject=subject,
-            message=message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=receivers,
-        )
-    except Exception:
-        logging.exception("Failed to send email")
-        # Optionally, re-raise or handle as needed
+def send_outbox_emails():
+    """Drain the email outbox, one SMTP connection per batch."""
+    batch_size = settings.EMAIL_OUTBOX_BATCH_SIZE
+    processed = 0
+    while True:
+        count = EmailOutboxService.send_due(batch_size=batch_size)
+        processed += count
+        if count < batch_size:
+            return processed
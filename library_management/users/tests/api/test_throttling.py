@@ -0,0 +1,53 @@
+from unittest import mock
+
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from rest_framework.parsers import JSONParser
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from library_management.core.api import throttling
+from library_management.core.api.throttling import LocalBuckets
+from library_management.users.api.throttling import PasswordResetEmailThrottle
+
+
+@pytest.fixture(autouse=True)
+def _fresh_buckets(settings):
+    settings.THROTTLE_REDIS_URL = ""
+    settings.REST_FRAMEWORK = {
+        **settings.REST_FRAMEWORK,
+        "DEFAULT_THROTTLE_RATES": {"password_reset": "2/hour"},
+    }
+    with (
+        mock.patch.object(throttling, "local_buckets", LocalBuckets()),
+        mock.patch.object(throttling, "rejections", throttling.Rejections()),
+    ):
+        yield
+
+
+def reset(email, method="post", ip="10.0.0.1"):
+    factory = getattr(APIRequestFactory(), method)
+    request = Request(
+        factory("/", {"email": email}, format="json", REMOTE_ADDR=ip),
+        parsers=[JSONParser()],
+    )
+    request.user = AnonymousUser()
+    return PasswordResetEmailThrottle().allow_request(request, view=None)
+
+
+def test_reset_requests_are_throttled_per_email_across_clients():
+    results = [reset("john@example.com", ip=f"10.0.0.{i}") for i in range(3)]
+
+    assert results == [True, True, False]
+
+
+def test_email_case_and_whitespace_do_not_evade_the_limit():
+    reset("john@example.com")
+    reset(" John@Example.com")
+
+    assert not reset("JOHN@EXAMPLE.COM")
+    assert reset("jane@example.com")
+
+
+def test_only_reset_requests_are_throttled():
+    assert all(reset("john@example.com", method="put") for _ in range(5))
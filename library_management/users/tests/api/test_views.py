@@ -1,8 +1,14 @@
+from urllib.parse import parse_qs, urlsplit
+
 import pytest
-from rest_framework.test import APIRequestFactory
+from asgiref.sync import async_to_sync
+from django.db import connection
+from django.test import AsyncClient
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient, APIRequestFactory
 
 from library_management.users.api.views import UserViewSet
-from library_management.users.models import User
+from library_management.users.models import EmailOutbox, User
 
 
 class TestUserViewSet:
@@ -32,3 +38,78 @@ class TestUserViewSet:
             "url": f"http://testserver/api/users/{user.pk}/",
             "name": user.name,
         }
+
+
+@pytest.mark.django_db
+class TestPasswordResetView:
+    url = "/api/users/reset-password/"
+
+    @pytest.fixture
+    def client(self) -> APIClient:
+        return APIClient()
+
+    def request_reset(self, client: APIClient, user: User):
+        response = client.post(self.url, {"email": user.email}, format="json")
+        assert response.status_code == 202  # noqa: PLR2004
+        message = EmailOutbox.objects.get(receivers=[user.email]).message
+        query = parse_qs(urlsplit(message.rsplit(" ", 1)[-1]).query)
+        return f"{self.url}?uid={query['uid'][0]}&token={query['token'][0]}"
+
+    def confirm(self, client: APIClient, link: str, password: str = "n3w-Secret!"):
+        data = {"new_password": password, "confirm_password": password}
+        return client.put(link, data, format="json")
+
+    def test_reset_sets_the_password_once(self, client: APIClient, user: User):
+        link = self.request_reset(client, user)
+
+        assert self.confirm(client, link).status_code == 202  # noqa: PLR2004
+        user.refresh_from_db()
+        assert user.check_password("n3w-Secret!")
+        assert self.confirm(client, link).status_code == 400  # noqa: PLR2004
+
+    def test_unknown_tokens_do_not_query_users(self, client: APIClient, user: User):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.confirm(client, f"{self.url}?uid=MQ&token=forged")
+
+        assert response.status_code == 400  # noqa: PLR2004
+        sql = [query["sql"] for query in queries.captured_queries]
+        assert not [query for query in sql if User._meta.db_table in query]
+
+    def test_changing_the_password_voids_the_token(
+        self,
+        client: APIClient,
+        user: User,
+    ):
+        link = self.request_reset(client, user)
+        user.set_password("changed-Elsewhere1")
+        user.save()
+
+        assert self.confirm(client, link).status_code == 400  # noqa: PLR2004
+
+
+@pytest.mark.django_db(transaction=True)
+class TestAsyncRegisterView:
+    url = "/api/users/register/async/"
+
+    def register(self, email: str, password: str = "something-r@nd0m!"):
+        data = {
+            "email": email,
+            "name": "John",
+            "password": password,
+            "confirm_password": password,
+        }
+        return async_to_sync(AsyncClient().post)(
+            self.url, data, content_type="application/json"
+        )
+
+    def test_registers_user(self):
+        response = self.register("john@example.com")
+
+        assert response.status_code == 201  # noqa: PLR2004
+        user = User.objects.get(email="john@example.com")
+        assert user.check_password("something-r@nd0m!")
+
+    def test_rejects_taken_email(self, user: User):
+        response = self.register(user.email)
+
+        assert response.status_code == 400  # noqa: PLR2004
@@ -0,0 +1,78 @@
+import pytest
+from django.core.cache import cache
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import AccessToken
+
+from library_management.users.authentication import (
+    CachedJWTAuthentication,
+    user_cache,
+)
+from library_management.users.models import User
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def _empty_cache():
+    user_cache.clear_local()
+    yield
+    user_cache.clear_local()
+
+
+def authenticate(user):
+    authentication = CachedJWTAuthentication()
+    token = authentication.get_validated_token(str(AccessToken.for_user(user)))
+    return authentication.get_user(token)
+
+
+def test_user_is_loaded_once(user: User, django_assert_num_queries):
+    with django_assert_num_queries(1):
+        assert authenticate(user) == user
+    with django_assert_num_queries(0):
+        assert authenticate(user) == user
+
+
+def test_shared_cache_serves_other_processes(user: User, django_assert_num_queries):
+    authenticate(user)
+    user_cache.clear_local()
+
+    with django_assert_num_queries(0):
+        assert authenticate(user) == user
+
+
+def test_cached_users_are_private_copies(user: User):
+    authenticate(user).name = "Changed"
+
+    assert authenticate(user).name == user.name
+
+
+def test_saving_a_user_invalidates_it(user: User):
+    authenticate(user)
+    user.is_active = False
+    user.save()
+
+    with pytest.raises(AuthenticationFailed):
+        authenticate(user)
+
+
+def test_cache_holds_no_password_hash(user: User):
+    authenticate(user)
+
+    values, fingerprint = cache.get(user_cache.key_format.format(user.pk))
+    assert values == {
+        "id": user.pk,
+        "is_active": True,
+        "is_staff": False,
+        "is_superuser": False,
+    }
+    assert user.password not in fingerprint
+
+
+def test_other_fields_of_a_cached_user_are_loaded_on_access(
+    user: User, django_assert_num_queries
+):
+    authenticate(user)
+
+    cached = authenticate(user)
+    with django_assert_num_queries(1):
+        assert cached.email == user.email
@@ -0,0 +1,34 @@
+import asyncio
+
+import pytest
+from django.contrib.auth.hashers import check_password, identify_hasher, make_password
+
+from library_management.users.hashers import amake_password
+
+
+@pytest.fixture(autouse=True)
+def _argon2(settings):
+    settings.PASSWORD_HASHERS = [
+        "library_management.users.hashers.Argon2PasswordHasher"
+    ]
+    settings.ARGON2_TIME_COST = 1
+    settings.ARGON2_MEMORY_COST = 8192
+    settings.ARGON2_PARALLELISM = 1
+
+
+def test_cost_comes_from_settings():
+    assert "$m=8192,t=1,p=1$" in make_password("something-r@nd0m!")
+
+
+def test_hashes_with_other_costs_are_upgraded(settings):
+    encoded = make_password("something-r@nd0m!")
+    settings.ARGON2_TIME_COST = 2
+
+    assert check_password("something-r@nd0m!", encoded)
+    assert identify_hasher(encoded).must_update(encoded)
+
+
+def test_amake_password_hashes_on_the_pool():
+    encoded = asyncio.run(amake_password("something-r@nd0m!"))
+
+    assert check_password("something-r@nd0m!", encoded)
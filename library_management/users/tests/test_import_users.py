@@ -0,0 +1,97 @@
+import json
+from unittest import mock
+
+import pytest
+from django.core.management import call_command
+
+from library_management.users.models import EmailOutbox, User
+from library_management.users.services import UserImportService
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def csv_file(tmp_path):
+    path = tmp_path / "students.csv"
+    path.write_text(
+        "email,name,password\n"
+        "ada@Example.com,Ada,something-r@nd0m!\n"
+        "grace@example.com,Grace,\n"
+        "not-an-email,Nobody,\n"
+        "ada@example.com,Ada again,\n",
+    )
+    return path
+
+
+def test_imports_csv(csv_file):
+    call_command("import_users", str(csv_file), "--workers", "1", "--batch-size", "2")
+
+    ada = User.objects.get(email="ada@example.com")
+    assert ada.name == "Ada"
+    assert ada.check_password("something-r@nd0m!")
+    assert not User.objects.get(email="grace@example.com").has_usable_password()
+    assert User.objects.count() == 2  # noqa: PLR2004
+
+
+def test_existing_users_are_skipped(user: User, tmp_path):
+    path = tmp_path / "students.jsonl"
+    path.write_text(
+        json.dumps({"email": user.email, "name": "Replaced"})
+        + "\n"
+        + json.dumps({"email": "new@example.com"})
+        + "\n",
+    )
+
+    call_command("import_users", str(path), "--no-passwords")
+
+    user.refresh_from_db()
+    assert user.name != "Replaced"
+    assert User.objects.filter(email="new@example.com").exists()
+
+
+def test_users_without_password_get_a_reset_email(csv_file):
+    call_command(
+        "import_users",
+        str(csv_file),
+        "--no-passwords",
+        "--reset-url",
+        "http://testserver/api/users/reset-password/",
+    )
+
+    receivers = sorted(
+        EmailOutbox.objects.values_list("receivers", flat=True),
+    )
+    assert receivers == [["ada@example.com"], ["grace@example.com"]]
+
+
+def test_rows_that_are_not_objects_are_rejected():
+    users, _, rejected = UserImportService().build_users(
+        [["ada@example.com"], "grace@example.com", {"email": "alan@example.com"}]
+    )
+
+    assert list(users) == ["alan@example.com"]
+    assert rejected == [
+        (["ada@example.com"], "not an object"),
+        ("grace@example.com", "not an object"),
+    ]
+
+
+def test_emails_registered_during_the_import_are_not_counted():
+    service = UserImportService(reset_url="http://testserver/api/users/reset-password/")
+    users, _, _ = service.build_users(
+        [{"email": "grace@example.com"}, {"email": "alan@example.com"}]
+    )
+    for user in users.values():
+        user.set_unusable_password()
+    bulk_create = User.objects.bulk_create
+
+    def register_first(objs, **kwargs):
+        User.objects.create_user(email="grace@example.com", password="registered")
+        return bulk_create(objs, **kwargs)
+
+    with mock.patch.object(User.objects, "bulk_create", side_effect=register_first):
+        assert service.create_users(users) == 1
+
+    assert User.objects.get(email="grace@example.com").check_password("registered")
+    receivers = list(EmailOutbox.objects.values_list("receivers", flat=True))
+    assert receivers == [["alan@example.com"]]
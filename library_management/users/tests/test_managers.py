@@ -1,6 +1,7 @@
 from io import StringIO
 
 import pytest
+from asgiref.sync import async_to_sync
 from django.core.management import call_command
 
 from library_management.users.models import User
@@ -19,6 +20,15 @@ class TestUserManager:
         assert user.check_password("something-r@nd0m!")
         assert user.username is None
 
+    def test_acreate_user(self):
+        user = async_to_sync(User.objects.acreate_user)(
+            email="john@example.com",
+            password="something-r@nd0m!",  # noqa: S106
+        )
+        user.refresh_from_db()
+        assert not user.is_staff
+        assert user.check_password("something-r@nd0m!")
+
     def test_create_superuser(self):
         user = User.objects.create_superuser(
             email="admin@example.com",
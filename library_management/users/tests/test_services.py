@@ -0,0 +1,59 @@
+from unittest import mock
+
+import pytest
+from django.utils import timezone
+
+from library_management.core.tracing import bind_request_id
+from library_management.users.models import EmailOutbox
+from library_management.users.services import EmailOutboxService
+
+pytestmark = pytest.mark.django_db
+
+
+class TestEmailOutboxService:
+    def test_enqueue_is_idempotent(self):
+        first = EmailOutboxService.enqueue(
+            "Subject", "Body", ["john@example.com"], idempotency_key="key-1"
+        )
+        second = EmailOutboxService.enqueue(
+            "Other", "Other", ["jane@example.com"], idempotency_key="key-1"
+        )
+
+        assert first.pk == second.pk
+        assert EmailOutbox.objects.count() == 1
+
+    def test_enqueue_keeps_request_id(self):
+        with bind_request_id("borrow-1"):
+            email = EmailOutboxService.enqueue("Subject", "Body", ["john@example.com"])
+
+        assert email.request_id == "borrow-1"
+
+    def test_send_due_delivers_batch(self, mailoutbox):
+        for i in range(3):
+            EmailOutboxService.enqueue("Subject", f"Body {i}", ["john@example.com"])
+
+        processed = EmailOutboxService.send_due(batch_size=2)
+
+        sent = EmailOutbox.objects.filter(status=EmailOutbox.Status.SENT)
+        assert processed == len(mailoutbox) == sent.count() == 2  # noqa: PLR2004
+
+    def test_send_due_backs_off_on_failure(self, settings):
+        settings.EMAIL_OUTBOX_MAX_ATTEMPTS = 2
+        email = EmailOutboxService.enqueue("Subject", "Body", ["john@example.com"])
+
+        with mock.patch(
+            "library_management.users.services.EmailMessage.send",
+            side_effect=OSError("smtp down"),
+        ):
+            EmailOutboxService.send_due(batch_size=10)
+            email.refresh_from_db()
+            assert email.status == EmailOutbox.Status.PENDING
+            assert email.attempts == 1
+            assert email.next_attempt_at > timezone.now()
+            assert "smtp down" in email.last_error
+
+            email.next_attempt_at = timezone.now()
+            email.save()
+            EmailOutboxService.send_due(batch_size=10)
+            email.refresh_from_db()
+            assert email.status == EmailOutbox.Status.FAILED